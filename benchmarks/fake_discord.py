@@ -0,0 +1,363 @@
+"""In-process fake of the parts of discord.py used by the `Help`, to run
+benchmarks without connecting to Discord.
+
+Every REST call (sending, editing, deleting a message, adding or removing a
+reaction, creating a DM channel) is counted, takes a configurable latency,
+and follows a per-channel rate limit, like on Discord. When the rate limit is
+exceeded, the call either waits (like discord.py does) or raises a 429
+`HTTPException` (to exercise the `RequestScheduler`).
+"""
+
+import asyncio
+import itertools
+import random
+import types
+from collections import Counter
+
+import discord
+
+
+_ids = itertools.count(1)
+
+
+class FakeHTTP:
+    """Fake of the HTTP layer : latency, rate limits and statistics.
+
+    Attributes:
+        latency (float): Average latency of a REST call, in seconds.
+        jitter (float): Maximum random latency added to each call, in seconds.
+        rate (int): Number of calls allowed per channel, every `per` seconds.
+        per (float): Period of the per-channel rate limit, in seconds.
+        raise_429 (bool): If `True`, calls over the rate limit raise a 429
+            `HTTPException`. If `False`, they wait like discord.py does.
+        calls (Counter): Number of REST calls, by type.
+        rate_limited (int): Number of calls that hit the rate limit.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate=5, per=1.0, raise_429=False):
+        """FakeHTTP constructor.
+
+        Args:
+            latency (float, optional): Average latency of a REST call, in
+                seconds. Defaults to `0`.
+            jitter (float, optional): Maximum random latency added to each call,
+                in seconds. Defaults to `0`.
+            rate (int, optional): Number of calls allowed per channel, every
+                `per` seconds. Defaults to `5`.
+            per (float, optional): Period of the per-channel rate limit, in
+                seconds. Defaults to `1`.
+            raise_429 (bool, optional): If `True`, calls over the rate limit
+                raise a 429 `HTTPException`. Defaults to `False`.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate = rate
+        self.per = per
+        self.raise_429 = raise_429
+        self.calls = Counter()
+        self.rate_limited = 0
+        self._windows = {}
+
+    async def request(self, kind, channel_id):
+        """Simulate a REST call.
+
+        Args:
+            kind (str): Type of the call, for the statistics.
+            channel_id (hashable): ID of the channel targeted by the call (or
+                any key identifying the rate limit bucket).
+
+        Throws:
+            HTTPException: If the rate limit is exceeded and `raise_429` is set.
+        """
+        self.calls[kind] += 1
+
+        while True:
+            retry_after = self._retry_after(channel_id)
+            if retry_after == 0:
+                break
+            self.rate_limited += 1
+            if self.raise_429:
+                response = types.SimpleNamespace(
+                    status=429, reason="Too Many Requests", headers={"Retry-After": str(retry_after)}
+                )
+                raise discord.HTTPException(response, "You are being rate limited.")
+            await asyncio.sleep(retry_after)
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _retry_after(self, channel_id):
+        """Private function.
+
+        Fixed window rate limit : count the calls of the current window.
+
+        Args:
+            channel_id (int): ID of the channel targeted by the call.
+
+        Returns:
+            float: `0` if the call is allowed, the time to wait otherwise.
+        """
+        now = asyncio.get_running_loop().time()
+        start, count = self._windows.get(channel_id, (now, 0))
+        if now - start >= self.per:
+            start, count = now, 0
+        if count >= self.rate:
+            return start + self.per - now
+        self._windows[channel_id] = (start, count + 1)
+        return 0
+
+
+class FakeMessage:
+    """Fake of `discord.Message`."""
+
+    def __init__(self, channel, content=None, embed=None, view=None, author=None, message_id=None):
+        self.id = next(_ids) if message_id is None else message_id
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.author = author
+        self.reactions = []
+        self.deleted = False
+
+    async def edit(self, content=None, embed=None, view=None):
+        """Edit the message, displaying a new page."""
+        await self.channel.http.request("edit", self.channel.id)
+        self.content, self.embed, self.view = content, embed, view
+        self.channel.page_shown()
+
+    async def delete(self):
+        """Delete the message."""
+        await self.channel.http.request("delete", self.channel.id)
+        self.deleted = True
+
+    async def add_reaction(self, emoji):
+        """Add a reaction of the bot to the message."""
+        await self.channel.http.request("add_reaction", self.channel.id)
+        self.reactions.append(emoji)
+        self.channel.reacted.set()
+
+    async def remove_reaction(self, emoji, member):
+        """Remove a reaction from the message."""
+        await self.channel.http.request("remove_reaction", self.channel.id)
+        if emoji in self.reactions:
+            self.reactions.remove(emoji)
+
+
+class FakeDMChannel:
+    """Fake of `discord.DMChannel`. It also keeps track of the last message
+    sent, and notifies the simulated user when the bot displays a new page or
+    adds a reaction.
+
+    Attributes:
+        last_message (FakeMessage): Last message sent in the channel.
+        pages (int): Number of pages displayed so far in the channel.
+        page_changed (asyncio.Event): Set when a page is displayed.
+        reacted (asyncio.Event): Set when a reaction is added.
+    """
+
+    def __init__(self, http):
+        self.id = next(_ids)
+        self.http = http
+        self.last_message = None
+        self.pages = 0
+        self.page_changed = asyncio.Event()
+        self.reacted = asyncio.Event()
+
+    async def send(self, content=None, embed=None, view=None):
+        """Send a new message in the channel, displaying a new page."""
+        await self.http.request("send", self.id)
+        self.last_message = FakeMessage(self, content, embed, view)
+        self.page_shown()
+        return self.last_message
+
+    def get_partial_message(self, message_id):
+        """Retrieve a message by ID, without fetching it : only its ID is
+        known, like after a restart.
+        """
+        return FakeMessage(self, message_id=message_id)
+
+    def page_shown(self):
+        """Notify the simulated user that a new page is displayed."""
+        self.pages += 1
+        self.page_changed.set()
+
+
+class FakeInteractionResponse:
+    """Fake of `discord.InteractionResponse`."""
+
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def edit_message(self, content=None, embed=None, view=None):
+        """Respond to the interaction by editing its message."""
+        message = self.interaction.message
+        await message.channel.http.request("interaction_response", ("interaction", id(self.interaction)))
+        message.content, message.embed, message.view = content, embed, view
+        message.channel.page_shown()
+
+    async def defer(self):
+        """Acknowledge the interaction without changing the message."""
+        message = self.interaction.message
+        await message.channel.http.request("interaction_response", ("interaction", id(self.interaction)))
+
+    async def send_message(self, content=None, embed=None, view=None, ephemeral=False):
+        """Respond to the interaction with a new message, only seen by the
+        member when ephemeral (it's sent in their `ephemeral_channel`).
+        """
+        member = self.interaction.user
+        channel = member.ephemeral_channel if ephemeral else self.interaction.message.channel
+        await channel.http.request("interaction_response", ("interaction", id(self.interaction)))
+        channel.last_message = FakeMessage(channel, content, embed, view)
+        channel.page_shown()
+
+
+class FakeFollowup:
+    """Fake of the `discord.Webhook` sending the followup messages of an
+    interaction.
+    """
+
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, embed=None, view=None, ephemeral=False):
+        """Send a new message, only seen by the member when ephemeral (it's
+        sent in their `ephemeral_channel`).
+        """
+        member = self.interaction.user
+        channel = member.ephemeral_channel if ephemeral else self.interaction.message.channel
+        await channel.http.request("followup", ("interaction", id(self.interaction)))
+        channel.last_message = FakeMessage(channel, content, embed, view)
+        channel.page_shown()
+
+
+class FakeInteraction(discord.Interaction):
+    """Fake of `discord.Interaction`, for a click on a component."""
+
+    type = discord.InteractionType.component
+    user = None
+    message = None
+    data = None
+    response = None
+    followup = None
+
+    def __init__(self, user, message, data):
+        self.user = user
+        self.message = message
+        self.data = data
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+
+    async def edit_original_response(self, content=None, embed=None, view=None):
+        """Edit the message of the interaction, after it was deferred."""
+        message = self.message
+        await message.channel.http.request("edit_original_response", ("interaction", id(self)))
+        message.content, message.embed, message.view = content, embed, view
+        message.channel.page_shown()
+
+    async def delete_original_response(self):
+        """Delete the message of the interaction."""
+        await self.message.channel.http.request("delete_original_response", ("interaction", id(self)))
+        self.message.deleted = True
+        self.message.channel.page_shown()
+
+
+class FakeMember:
+    """Fake of `discord.Member`. The ephemeral messages sent to the member
+    are in their `ephemeral_channel`.
+    """
+
+    def __init__(self, http):
+        self.id = next(_ids)
+        self.http = http
+        self.dm_channel = None
+        self.ephemeral_channel = FakeDMChannel(http)
+        self.guild = None
+
+    async def create_dm(self):
+        """Create the DM channel of the member."""
+        await self.http.request("create_dm", ("user", self.id))
+        self.dm_channel = FakeDMChannel(self.http)
+        return self.dm_channel
+
+
+class FakeClient:
+    """Fake of `discord.Client` : it dispatches events to the listeners
+    registered with `wait_for()`, and counts them.
+
+    Attributes:
+        http (FakeHTTP): Fake HTTP layer.
+        user (object): The bot user.
+        dispatched (int): Number of events dispatched.
+        checks (int): Number of listener checks run.
+        users (dict): Users known by the client, by ID.
+        channels (dict): Channels known by the client, by ID.
+    """
+
+    def __init__(self, http):
+        self.http = http
+        self.user = types.SimpleNamespace(id=0)
+        self.dispatched = 0
+        self.checks = 0
+        self.users = {}
+        self.channels = {}
+        self._listeners = {}
+
+    def get_user(self, user_id):
+        """Retrieve a user from the cache, like `discord.Client.get_user()`."""
+        return self.users.get(user_id)
+
+    def get_partial_messageable(self, channel_id, type=None):
+        """Retrieve a channel by ID, like `discord.Client.get_partial_messageable()`."""
+        return self.channels[channel_id]
+
+    async def wait_for(self, event, check=None, timeout=None):
+        """Wait for an event, like `discord.Client.wait_for()`."""
+        future = asyncio.get_running_loop().create_future()
+        self._listeners.setdefault(event, []).append((future, check))
+        return await asyncio.wait_for(future, timeout)
+
+    def dispatch(self, event, *args):
+        """Dispatch an event to the listeners, like discord.py does."""
+        self.dispatched += 1
+        listeners = self._listeners.get(event, [])
+        kept = []
+        for future, check in listeners:
+            if future.cancelled():
+                continue
+            self.checks += 1
+            if check is None or check(*args):
+                future.set_result(args[0] if len(args) == 1 else args)
+            else:
+                kept.append((future, check))
+        self._listeners[event] = kept
+
+    def react(self, member, emoji):
+        """Simulate a member reacting to the last message of their DM channel.
+        Messages are never cached by this client, so only the raw event is
+        dispatched (like discord.py does for the messages not in its cache).
+        """
+        message = member.dm_channel.last_message
+        payload = types.SimpleNamespace(
+            emoji=discord.PartialEmoji(name=emoji),
+            user_id=member.id,
+            message_id=message.id,
+            channel_id=message.channel.id,
+            guild_id=None,
+        )
+        self.dispatch("raw_reaction_add", payload)
+
+    def click(self, member, custom_id, select=False, message=None, prefix=""):
+        """Simulate a member clicking a button (or choosing an option of the
+        select menu) of a message, by default the last message of their DM
+        channel.
+        """
+        message = member.dm_channel.last_message if message is None else message
+        data = {"custom_id": prefix + "select", "values": [custom_id]} if select else {"custom_id": prefix + custom_id}
+        self.dispatch("interaction", FakeInteraction(member, message, data))
+
+    def say(self, member, content):
+        """Simulate a member sending a message in their DM channel."""
+        message = FakeMessage(member.dm_channel, content=content, author=member)
+        self.dispatch("message", message)
@@ -0,0 +1,261 @@
+"""Benchmark of the `Help` : drive `Help.display()` with simulated users,
+against a fake Discord client, and report the cost of each hop.
+
+Each simulated user opens the help, follows a scripted navigation, and quits.
+The benchmark reports :
+
+* The number of REST calls per hop (by type).
+* The latency of a hop (time between the user input and the next page being
+  displayed), as percentiles.
+* The number of events dispatched per second.
+* The peak memory used.
+* The average time of each phase of a session (with `--metrics`).
+
+With `--board`, all simulated users share a single help message posted in a
+channel, and navigate through ephemeral messages.
+
+Run it with :
+
+    PYTHONPATH=. python benchmarks/navigation.py --sessions 1 100 10000
+
+Reference numbers (one session, reaction controls), in REST calls for the
+whole session (`create_dm` included) :
+
+* Default : 34 calls (6.80 per hop). Each hop deletes the message, sends a new
+  one and adds all its reactions (`🔙` from page 1.1 to page 1 : 8 calls).
+* `--edit-in-place` : 21 calls (4.20 per hop). Each hop edits the message,
+  removes the reactions the next page doesn't use, and adds the missing ones
+  (`🔙` from page 1.1 to page 1 : 4 calls, as `🔙 🔝 ❌` are kept). If this
+  costs more than sending a new message, a new message is sent instead.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.fake_discord import FakeClient, FakeDMChannel, FakeHTTP, FakeMember
+from discord_interactive import Controls, Help, InMemoryMetrics, Page, RequestScheduler
+
+
+# Navigation of each simulated user : root -> page 1 -> page 1.1 -> back -> root -> quit
+SCRIPT = ["1⃣", "1⃣", "🔙", "🔝", "❌"]
+
+
+def build_tree():
+    """Build a small help tree, similar to the one in `main.py`.
+
+    Returns:
+        Page: Root of the tree.
+    """
+    root = Page("Welcome to the help !", title="Help")
+    pages = [Page("Page {}".format(i)) for i in range(3)]
+    for i, page in enumerate(pages):
+        root.link(page, description="Go to page {}".format(i))
+        sub_pages = [Page("Page {}.{}".format(i, j)) for j in range(3)]
+        for j, sub_page in enumerate(sub_pages):
+            page.link(sub_page, description="Go to page {}.{}".format(i, j))
+        root.root_of(sub_pages)
+    root.root_of(pages)
+    return root
+
+
+async def simulated_user(client, help, member, controls, hops, retry=0.5):
+    """Simulate a user navigating the help, following `SCRIPT`.
+
+    The user waits for the page to be displayed (and the reaction to be there,
+    with reaction controls) before clicking. If the page doesn't change after a
+    while, the click was lost (the help was not waiting yet), so the user clicks
+    again.
+
+    Args:
+        client (FakeClient): Fake Discord client.
+        help (Help): Help to navigate.
+        member (FakeMember): Simulated user.
+        controls (Controls): Controls used by the help.
+        hops (list of float): List where the latency of each hop is appended.
+        retry (float, optional): Number of seconds before clicking again.
+            Defaults to `0.5`.
+    """
+    session = asyncio.ensure_future(help.display(member))
+    while member.dm_channel is None or member.dm_channel.last_message is None:
+        await asyncio.sleep(0.01)
+    channel = member.dm_channel
+
+    for emoji in SCRIPT:
+        if controls == Controls.REACTIONS:
+            while emoji not in channel.last_message.reactions:
+                channel.reacted.clear()
+                await channel.reacted.wait()
+
+        start = time.perf_counter()
+        seen = channel.pages
+        while True:
+            if controls == Controls.REACTIONS:
+                client.react(member, emoji)
+            else:
+                client.click(member, emoji, select=controls == Controls.SELECT and emoji != help.quit_react)
+
+            if emoji == help.quit_react:
+                done, _ = await asyncio.wait([session], timeout=retry)
+                if done:
+                    break
+            elif await _page_shown(channel, seen, retry):
+                break
+        hops.append(time.perf_counter() - start)
+
+    await session
+
+
+async def simulated_board_user(client, board, member, hops, retry=0.5):
+    """Simulate a user navigating a board, following `SCRIPT` : the first
+    click is on the message of the board, the next ones on the ephemeral
+    message of the user.
+
+    Args:
+        client (FakeClient): Fake Discord client.
+        board (Board): Board to navigate.
+        member (FakeMember): Simulated user.
+        hops (list of float): List where the latency of each hop is appended.
+        retry (float, optional): Number of seconds before clicking again.
+            Defaults to `0.5`.
+    """
+    channel = member.ephemeral_channel
+    select = board.controls == Controls.SELECT
+    for i, emoji in enumerate(SCRIPT):
+        message = board.message if i == 0 else channel.last_message
+        start = time.perf_counter()
+        seen = channel.pages
+        while True:
+            is_quit = emoji == board.help.quit_react
+            client.click(member, emoji, select=select and not is_quit, message=message, prefix=board.prefix)
+            if await _page_shown(channel, seen, retry):
+                break
+        hops.append(time.perf_counter() - start)
+
+
+async def _page_shown(channel, seen, timeout):
+    """Private function.
+
+    Wait until a new page is displayed in the channel.
+
+    Args:
+        channel (FakeDMChannel): Channel of the simulated user.
+        seen (int): Number of pages displayed before the user input.
+        timeout (float): Number of seconds to wait.
+
+    Returns:
+        bool: `True` if a new page was displayed, `False` on timeout.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while channel.pages == seen:
+        channel.page_changed.clear()
+        try:
+            await asyncio.wait_for(channel.page_changed.wait(), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            return channel.pages != seen
+    return True
+
+
+async def run(n_sessions, args):
+    """Run the benchmark for a given number of concurrent sessions.
+
+    Args:
+        n_sessions (int): Number of concurrent sessions.
+        args (argparse.Namespace): Options of the benchmark.
+
+    Returns:
+        dict: Results of the benchmark.
+    """
+    http = FakeHTTP(latency=args.latency, jitter=args.jitter, rate=args.rate, per=args.per, raise_429=args.raise_429)
+    client = FakeClient(http)
+    controls = Controls[args.controls.upper()]
+    scheduler = RequestScheduler(channel_rate=args.rate, channel_per=args.per) if args.scheduler else None
+    metrics = InMemoryMetrics() if args.metrics else None
+    help = Help(
+        client,
+        build_tree(),
+        edit_in_place=args.edit_in_place,
+        scheduler=scheduler,
+        controls=controls,
+        metrics=metrics,
+        prerender=args.prerender,
+    )
+
+    hops = []
+    members = [FakeMember(http) for _ in range(n_sessions)]
+
+    if args.warm_up:
+        # Create the DM channels before the users open the help
+        await help.warm_up(members)
+        http.calls.clear()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if args.board:
+        board = await help.post(FakeDMChannel(http))
+        await asyncio.gather(*[simulated_board_user(client, board, m, hops) for m in members])
+        await board.close()
+    else:
+        await asyncio.gather(*[simulated_user(client, help, m, controls, hops) for m in members])
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if scheduler is not None:
+        await scheduler.close()
+
+    quantiles = statistics.quantiles(hops, n=100) if len(hops) > 1 else hops * 99
+    return {
+        "sessions": n_sessions,
+        "hops": len(hops),
+        "calls_per_hop": sum(http.calls.values()) / len(hops),
+        "calls": dict(http.calls),
+        "rate_limited": http.rate_limited,
+        "p50": quantiles[49] * 1000,
+        "p95": quantiles[94] * 1000,
+        "p99": quantiles[98] * 1000,
+        "events_per_s": client.dispatched / elapsed,
+        "checks_per_event": client.checks / max(client.dispatched, 1),
+        "peak_mb": peak / 1024 / 1024,
+        "elapsed": elapsed,
+        "metrics": metrics,
+    }
+
+
+def main():
+    """Main. Parse the options, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description="Benchmark of the interactive help, with a fake Discord client.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 100, 10000], help="Concurrent sessions.")
+    parser.add_argument("--latency", type=float, default=0.01, help="Latency of a REST call, in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.005, help="Random latency added to each call.")
+    parser.add_argument("--rate", type=int, default=5, help="Calls allowed per channel, every `--per` seconds.")
+    parser.add_argument("--per", type=float, default=1.0, help="Period of the per-channel rate limit.")
+    parser.add_argument("--edit-in-place", action="store_true", help="Reuse the same message for a session.")
+    parser.add_argument("--scheduler", action="store_true", help="Send the requests through a RequestScheduler.")
+    parser.add_argument("--raise-429", action="store_true", help="Raise 429 errors when rate limited.")
+    parser.add_argument("--metrics", action="store_true", help="Report the average time of each phase.")
+    parser.add_argument("--controls", choices=["reactions", "buttons", "select"], default="reactions")
+    parser.add_argument("--warm-up", action="store_true", help="Create the DM channels before the sessions.")
+    parser.add_argument("--board", action="store_true", help="Share a single help message between all users.")
+    parser.add_argument("--prerender", type=int, default=0, help="Child pages rendered while waiting for the user.")
+    args = parser.parse_args()
+
+    columns = ["sessions", "hops", "calls/hop", "p50 (ms)", "p95 (ms)", "p99 (ms)", "events/s", "checks/event"]
+    print("{:>9} {:>7} {:>10} {:>9} {:>9} {:>9} {:>10} {:>12} {:>9} {:>8}".format(*columns, "peak MB", "time"))
+    for n in args.sessions:
+        r = asyncio.run(run(n, args))
+        print(
+            "{sessions:>9} {hops:>7} {calls_per_hop:>10.2f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {events_per_s:>10.0f} "
+            "{checks_per_event:>12.2f} {peak_mb:>9.1f} {elapsed:>7.1f}s".format(**r)
+        )
+        print("{:>9} calls : {} (rate limited : {})".format("", r["calls"], r["rate_limited"]))
+        if r["metrics"] is not None:
+            for (name, labels), histogram in sorted(r["metrics"].histograms.items()):
+                label = ",".join(v for _, v in labels)
+                print("{:>9} {}[{}] : {:.2f} ms".format("", name, label, histogram.mean() * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Regression benchmark for `Page` : visit the same page many times, like the
+`Help` does on each hop, and check that the links of the page don't grow and
+that the cost of a visit stays constant.
+
+Run it with :
+
+    PYTHONPATH=. python benchmarks/page_visits.py
+"""
+
+import time
+
+from discord_interactive import Page
+
+
+N_VISITS = 10_000
+
+
+def build_page():
+    """Build a page with the maximum number of default links, a parent and a
+    root.
+
+    Returns:
+        Page: Page to visit.
+    """
+    root = Page("Root")
+    page = Page("Page")
+    root.link(page)
+    for i in range(9):
+        page.link(Page("Child {}".format(i)), description="Child {}".format(i))
+    root.root_of(page)
+    return page
+
+
+def visit(page, n):
+    """Visit a page `n` times : retrieve its reactions and follow one of them.
+
+    Args:
+        page (Page): Page to visit.
+        n (int): Number of visits.
+
+    Returns:
+        float: Average duration of a visit, in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(n):
+        reactions = page.reactions()
+        page.next_link(reactions[-1])
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    """Main. Run the benchmark and check for regressions."""
+    page = build_page()
+    n_links = len(page.links)
+    n_reactions = len(page.reactions())
+
+    first = visit(page, N_VISITS // 10)
+    last = visit(page, N_VISITS)
+
+    print("{} visits : {:.2f} µs / visit (first visits : {:.2f} µs / visit)".format(N_VISITS, last, first))
+    assert len(page.links) == n_links, "Links grew from {} to {}".format(n_links, len(page.links))
+    assert len(page.reactions()) == n_reactions, "Reactions grew from {} to {}".format(
+        n_reactions, len(page.reactions())
+    )
+    assert last < first * 2, "Visits are getting slower"
+
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,24 @@ for your Discord bot.
 Two main classes are used to define the interactive help : `Help` and `Page`.
 """
 
+from discord_interactive.board import Board
+from discord_interactive.cache import LRUCache
+from discord_interactive.callback import Callback
+from discord_interactive.cluster import (
+    Cluster,
+    LocalDirectory,
+    LocalTransport,
+    SessionDirectory,
+    Transport,
+    UnixSocketTransport,
+)
+from discord_interactive.compiler import NavigationTables, TreeError, compile_pages, validate_tree
+from discord_interactive.content import ContentProvider, Scope
 from discord_interactive.help import Help
-from discord_interactive.page import Page
+from discord_interactive.loader import compile_tree, load_tree
+from discord_interactive.metrics import InMemoryMetrics, Metrics, prometheus_text
+from discord_interactive.page import Controls, FrozenPageError, LazyPage, ListPage, Page
+from discord_interactive.scheduler import RequestScheduler
+from discord_interactive.search import SearchIndex
+from discord_interactive.session import SessionLimitError
+from discord_interactive.store import SessionStore, SQLiteSessionStore
@@ -0,0 +1,47 @@
+"""Module containing the function running a coroutine in the background.
+Nobody waits for such a coroutine, so its error would be lost : it's logged
+instead.
+"""
+
+import asyncio
+import functools
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_background(awaitable, what):
+    """Run a coroutine (or wait for a future) in the background, and log its
+    error if it fails. Cancellation is not an error.
+
+    Args:
+        awaitable (coroutine or asyncio.Future): Coroutine to run, or future
+            to watch.
+        what (str): Description of what runs, used in the log message.
+
+    Returns:
+        asyncio.Future: Future of the coroutine (or the future given).
+    """
+    future = asyncio.ensure_future(awaitable)
+    future.add_done_callback(functools.partial(_log_error, what))
+    return future
+
+
+################################ Private #######################################
+
+
+def _log_error(what, future):
+    """Private function.
+
+    Log the error of a future, if any.
+
+    Args:
+        what (str): Description of what ran, used in the log message.
+        future (asyncio.Future): Future done.
+    """
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error("Error in %s", what, exc_info=error)
@@ -0,0 +1,160 @@
+"""Module containing the definition of the `Board` class. A board is a help
+message posted in a channel, and shared by all members of the channel : each
+member navigates the help on their own, through ephemeral messages.
+"""
+
+import uuid
+
+from discord_interactive.background import run_in_background
+from discord_interactive.cache import LRUCache
+from discord_interactive.page import Controls
+from discord_interactive.scheduler import Priority
+from discord_interactive.session import Session
+
+
+class Board:
+    """Class representing a help message posted in a channel, shared by all
+    members of the channel.
+
+    The message displays the root of the help, with buttons. When a member
+    clicks a button, the next page is displayed to this member only, in an
+    ephemeral message. The member then navigates the help in this ephemeral
+    message, which is edited when responding to each interaction.
+
+    The renders of the pages are shared by all members, and each hop only
+    costs the response to the interaction : no message is sent by the bot, and
+    no reaction is added, whatever the number of members using the board. The
+    interaction is deferred as soon as it's received, so slow callbacks don't
+    miss the time Discord gives to respond.
+
+    Callbacks are run for each member, like in a private session. Links
+    requiring a user input are not available on a board.
+
+    Attributes:
+        help (Help): Help displayed by the board.
+        channel (Discord.TextChannel): Channel where the board is posted.
+        message (Discord.Message): Message of the board, or `None` if it's not
+            posted yet.
+        controls (Controls): Controls displayed : buttons or a select menu.
+        prefix (str): Prefix of the custom IDs of the components of the board.
+        members (LRUCache): State of the members navigating the board.
+    """
+
+    def __init__(self, help, channel, max_members=10000):
+        """Board constructor.
+
+        Args:
+            help (Help): Help displayed by the board.
+            channel (Discord.TextChannel): Channel where the board is posted.
+            max_members (int, optional): Maximum number of members whose
+                navigation is remembered. The least recently active members
+                start again from the board. Defaults to `10000`.
+        """
+        self.help = help
+        self.channel = channel
+        self.message = None
+        self.controls = Controls.SELECT if help.controls == Controls.SELECT else Controls.BUTTONS
+        self.prefix = "help-{}:".format(uuid.uuid4().hex[:12])
+        self.members = LRUCache(max_members)
+        self._page = None
+
+    async def post(self):
+        """Post the message of the board in the channel, and start handling
+        the interactions of the members.
+        """
+        self._page = self.help.tree.page()
+        kwargs = self.help._message_kwargs(self._page, self.controls, quit=False, prefix=self.prefix)
+        channel = self.channel
+        self.message = await self.help._request(Priority.MESSAGE, channel.send, channel=channel.id, **kwargs)
+        self.help.router.add_board(self.prefix, self.on_interaction)
+
+    async def close(self):
+        """Stop handling the interactions of the members, and delete the
+        message of the board.
+        """
+        self.help.router.remove_board(self.prefix)
+        self.members.clear()
+        if self.message is not None:
+            message, self.message = self.message, None
+            try:
+                await self.help._request(Priority.DELETE, message.delete, message=message)
+            except Exception:
+                pass
+
+    def on_interaction(self, interaction):
+        """Handle an interaction of a member with the board (or with the
+        ephemeral message of the member). It's called by the router.
+
+        Args:
+            interaction (Discord.Interaction): Interaction of the member.
+        """
+        # Nobody waits for the navigation
+        run_in_background(self._navigate(interaction), "the navigation of a board")
+
+    ############################## Private #####################################
+
+    async def _navigate(self, interaction):
+        """Private function.
+
+        Display the page chosen by a member.
+
+        Args:
+            interaction (Discord.Interaction): Interaction of the member.
+        """
+        help = self.help
+        member = interaction.user
+        respond = help._instrumented
+        choice = self._choice(interaction)
+
+        # Clicking the board starts again from the root, for this member only
+        from_board = self.message is not None and interaction.message.id == self.message.id
+        state = None if from_board else self.members.get(member.id)
+        session, page = state if state is not None else (Session(member), self._page)
+
+        if choice == help.quit_react and not from_board:
+            self.members.pop(member.id)
+            await respond(interaction.response.defer)()
+            await respond(interaction.delete_original_response)()
+            return
+
+        # Acknowledge the interaction right away : Discord only waits 3
+        # seconds for the response, and the callbacks may take longer
+        await respond(interaction.response.defer)()
+        next_link = page.next_link(choice)
+        if next_link is None:
+            return
+
+        link = session.bind(next_link)
+        await help._run_callbacks(link, member, session.prev_input)
+        page = link.page()
+        with help._timer("prepare"):
+            await page.prepare(member)
+
+        with help._timer("render"):
+            kwargs = help._message_kwargs(page, self.controls, prefix=self.prefix)
+        with help._timer("send"):
+            if from_board:
+                await respond(interaction.followup.send)(ephemeral=True, **kwargs)
+            else:
+                await respond(interaction.edit_original_response)(**kwargs)
+        self.members.put(member.id, (session, page))
+
+        if help.metrics is not None:
+            help.metrics.count("pages_shown_total")
+
+    def _choice(self, interaction):
+        """Private function.
+
+        Retrieve the reaction chosen by the member : the custom ID of the
+        button (without the prefix), or the value of the select menu.
+
+        Args:
+            interaction (Discord.Interaction): Interaction of the member.
+
+        Returns:
+            str: Reaction chosen by the member.
+        """
+        data = interaction.data or {}
+        if data.get("values"):
+            return data["values"][0]
+        return data.get("custom_id", "")[len(self.prefix) :]
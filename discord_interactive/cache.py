@@ -0,0 +1,91 @@
+"""Module containing the definition of the `LRUCache` class, a bounded
+mapping forgetting the least recently used entries. It's used to keep the
+pages built by `LazyPage` in memory, without keeping the whole tree.
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Class representing a bounded cache, which forgets the least recently
+    used entries when it's full.
+
+    Attributes:
+        maxsize (int): Maximum number of entries, or `None` for no limit.
+        hits (int): Number of lookups that found their entry.
+        misses (int): Number of lookups that didn't find their entry.
+        evictions (int): Number of entries forgotten to make room.
+    """
+
+    def __init__(self, maxsize=1024):
+        """LRUCache constructor.
+
+        Args:
+            maxsize (int, optional): Maximum number of entries. Defaults to
+                `1024`.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """Number of entries in the cache."""
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Check if an entry is in the cache, without marking it as used."""
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Retrieve an entry, and mark it as the most recently used.
+
+        Args:
+            key (hashable): Key of the entry.
+            default (optional): Value returned if there is no entry. Defaults
+                to `None`.
+
+        Returns:
+            Value of the entry, or `default`.
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Add (or replace) an entry, and forget the least recently used
+        entries if the cache is full.
+
+        Args:
+            key (hashable): Key of the entry.
+            value: Value of the entry.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Forget an entry.
+
+        Args:
+            key (hashable): Key of the entry.
+            default (optional): Value returned if there is no entry. Defaults
+                to `None`.
+
+        Returns:
+            Value of the entry, or `default`.
+        """
+        return self._entries.pop(key, default)
+
+    def clear(self):
+        """Forget all entries."""
+        self._entries.clear()
@@ -0,0 +1,218 @@
+"""Module containing the definition of the `Callback` class, and the function
+running the callbacks of a link. Callbacks run one after another by default,
+but independent callbacks can run concurrently, with a timeout and a fallback
+page, and synchronous callbacks are run in a thread pool so they never block
+the event loop.
+"""
+
+import asyncio
+import inspect
+
+
+class Callback:
+    """Class wrapping a callback of a link, to change how it's run. It can be
+    given to `Page.link()` like any callback.
+
+    Consecutive concurrent callbacks of a link run together. A callback which
+    is not concurrent waits for the previous callbacks, and the next callbacks
+    wait for it : use it when a callback depends on what the previous ones
+    changed (like `link.path`).
+
+    When a callback takes longer than its timeout, it's cancelled, and the
+    link is redirected to the fallback page for this session (if any).
+    Otherwise the page is displayed as if the callback was done. Synchronous
+    callbacks running in a thread can't be interrupted : the thread keeps
+    running, but the help doesn't wait for it anymore. What it changes in the
+    session after its timeout is not discarded, and applies to the next pages
+    displayed.
+
+    Attributes:
+        func (function): Function called, with the same signature as any
+            callback. It can be a coroutine function or a normal function.
+        concurrent (bool): Whether the callback can run at the same time as the
+            other concurrent callbacks of the link.
+        timeout (float): Number of seconds the callback can take, or `None` to
+            use the timeout of the `Help`.
+        fallback (Page): Page displayed if the callback times out, or `None`
+            to use the fallback page of the `Help`.
+    """
+
+    def __init__(self, func, concurrent=False, timeout=None, fallback=None):
+        """Callback constructor.
+
+        Args:
+            func (function): Function called, with the same signature as any
+                callback.
+            concurrent (bool, optional): Whether the callback can run at the
+                same time as the other concurrent callbacks of the link.
+                Defaults to `False`.
+            timeout (float, optional): Number of seconds the callback can
+                take. Defaults to `None` (timeout of the `Help`).
+            fallback (Page, optional): Page displayed if the callback times
+                out. Defaults to `None` (fallback page of the `Help`).
+        """
+        self.func = func
+        self.concurrent = concurrent
+        self.timeout = timeout
+        self.fallback = fallback
+
+    def __repr__(self):
+        """Representation of the callback, used in the error messages."""
+        return "Callback({!r}, concurrent={})".format(self.func, self.concurrent)
+
+    async def __call__(self, link, member, prev_input):
+        """Call the function, without timeout. Synchronous functions are run
+        in the default thread pool of the event loop.
+
+        Args:
+            link (SessionLink): Link taken.
+            member (Discord.Member): Member navigating the help.
+            prev_input (list of Discord.Message): Messages previously sent by
+                the member.
+        """
+        await _call(self.func, (link, member, prev_input))
+
+
+async def run_callbacks(callbacks, link, member, prev_input, timeout=None, fallback=None, executor=None):
+    """Run the callbacks of a link. Consecutive concurrent callbacks (see
+    `Callback`) run together, other callbacks run one after another.
+
+    Args:
+        callbacks (list): Callbacks to run : functions, or `Callback`.
+        link (SessionLink): Link taken, given to the callbacks.
+        member (Discord.Member): Member navigating the help.
+        prev_input (list of Discord.Message): Messages previously sent by the
+            member.
+        timeout (float, optional): Number of seconds a callback can take, if
+            it doesn't have its own timeout. Defaults to `None` (no timeout).
+        fallback (Page, optional): Page displayed if a callback times out, if
+            it doesn't have its own fallback page. Defaults to `None` (the page
+            of the link is displayed).
+        executor (concurrent.futures.Executor, optional): Thread pool running
+            the synchronous callbacks. Defaults to `None` (default thread pool
+            of the event loop).
+
+    Returns:
+        int: Number of callbacks which timed out.
+    """
+    args = (link, member, prev_input)
+    timeouts = 0
+    for group in _groups(callbacks):
+        if len(group) == 1:
+            timeouts += await _run(group[0], args, timeout, fallback, executor)
+            continue
+        results = await asyncio.gather(
+            *[_run(callback, args, timeout, fallback, executor) for callback in group], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            timeouts += result
+    return timeouts
+
+
+################################ Private #######################################
+
+
+def _groups(callbacks):
+    """Private function.
+
+    Split the callbacks into groups running together : consecutive concurrent
+    callbacks, or a single callback which is not concurrent.
+
+    Args:
+        callbacks (list): Callbacks to run.
+
+    Returns:
+        list of list: Groups of callbacks, in order.
+    """
+    groups = []
+    for callback in callbacks:
+        concurrent = isinstance(callback, Callback) and callback.concurrent
+        if concurrent and groups and groups[-1][0]:
+            groups[-1][1].append(callback)
+        else:
+            groups.append((concurrent, [callback]))
+    return [group for _, group in groups]
+
+
+async def _run(callback, args, timeout, fallback, executor):
+    """Private function.
+
+    Run a single callback with its timeout, and redirect the link to the
+    fallback page if it times out.
+
+    Args:
+        callback (function or Callback): Callback to run.
+        args (tuple): Arguments of the callback.
+        timeout (float): Default timeout, or `None`.
+        fallback (Page): Default fallback page, or `None`.
+        executor (concurrent.futures.Executor): Thread pool running the
+            synchronous callbacks, or `None`.
+
+    Returns:
+        int: `1` if the callback timed out, `0` otherwise.
+    """
+    func = callback
+    if isinstance(callback, Callback):
+        func = callback.func
+        timeout = callback.timeout if callback.timeout is not None else timeout
+        fallback = callback.fallback if callback.fallback is not None else fallback
+
+    # Not `wait_for()` : a `TimeoutError` raised by the callback itself is an
+    # error, not a timeout
+    task = asyncio.ensure_future(_call(func, args, executor))
+    try:
+        done, _ = await asyncio.wait([task], timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        if fallback is not None:
+            _redirect(args[0], fallback)
+        return 1
+    task.result()
+    return 0
+
+
+def _redirect(link, fallback):
+    """Private function.
+
+    Redirect the link to the fallback page, for the session of the link. The
+    fallback page is shared by all the links : for this session only, it gets
+    the parent and the root of the page it replaces, so the user can navigate
+    back.
+
+    Args:
+        link (SessionLink): Link taken.
+        fallback (Page): Fallback page.
+    """
+    replaced = link.page()
+    link.redirect(fallback)
+    page = link.page()
+    page.parent = replaced.parent
+    page.root = replaced.root
+
+
+async def _call(func, args, executor=None):
+    """Private function.
+
+    Call a callback : coroutine functions are awaited, other functions are run
+    in a thread pool.
+
+    Args:
+        func (function): Function to call.
+        args (tuple): Arguments of the function.
+        executor (concurrent.futures.Executor, optional): Thread pool, or
+            `None` for the default thread pool of the event loop.
+    """
+    if inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, "__call__", None)):
+        await func(*args)
+        return
+
+    result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    # Functions returning an awaitable (like a lambda calling a coroutine
+    # function) are awaited in the event loop
+    if inspect.isawaitable(result):
+        await result
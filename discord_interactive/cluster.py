@@ -0,0 +1,430 @@
+"""Module containing the classes used to share the help between several bot
+processes (or shards). Each session is owned by the process displaying it :
+its messages are registered in a `SessionDirectory`, and events received by
+another process are forwarded to the owner through a `Transport`.
+"""
+
+import asyncio
+import json
+import os
+import types
+
+import discord
+
+from discord_interactive.background import run_in_background
+
+
+class SessionDirectory:
+    """Interface of a session directory : it knows which node owns the
+    sessions displayed in each message and channel. Subclass it to share the
+    directory between processes (for example with a database).
+    """
+
+    async def claim(self, key, node):
+        """Register a node as the owner of a key.
+
+        Args:
+            key (tuple): Key of a message (`("message", id)`) or a channel
+                (`("channel", id)`).
+            node (str): Name of the node.
+        """
+        raise NotImplementedError
+
+    async def release(self, key, node):
+        """Unregister a node as the owner of a key. Nothing happens if the key
+        is now owned by another node.
+
+        Args:
+            key (tuple): Key of a message or a channel.
+            node (str): Name of the node.
+        """
+        raise NotImplementedError
+
+    async def owner(self, key):
+        """Find the owner of a key.
+
+        Args:
+            key (tuple): Key of a message or a channel.
+
+        Returns:
+            str: Name of the node owning the key, or `None`.
+        """
+        raise NotImplementedError
+
+
+class LocalDirectory(SessionDirectory):
+    """Session directory kept in memory. It can be shared by several nodes
+    of the same process (for example to test the forwarding).
+    """
+
+    def __init__(self):
+        """LocalDirectory constructor."""
+        self._owners = {}
+
+    def __len__(self):
+        """Number of keys owned."""
+        return len(self._owners)
+
+    async def claim(self, key, node):
+        """See `SessionDirectory.claim()`."""
+        self._owners[key] = node
+
+    async def release(self, key, node):
+        """See `SessionDirectory.release()`."""
+        if self._owners.get(key) == node:
+            del self._owners[key]
+
+    async def owner(self, key):
+        """See `SessionDirectory.owner()`."""
+        return self._owners.get(key)
+
+
+class Transport:
+    """Interface of a transport : it delivers the events forwarded from one
+    node to another. Events are `dict` of JSON-serializable values.
+    """
+
+    async def start(self, node, handler):
+        """Start receiving the events sent to a node.
+
+        Args:
+            node (str): Name of the node.
+            handler (function): Function called with each event received.
+        """
+        raise NotImplementedError
+
+    async def send(self, node, event):
+        """Send an event to a node.
+
+        Args:
+            node (str): Name of the node receiving the event.
+            event (dict): Event to send.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Stop receiving events, and release the resources of the
+        transport.
+        """
+
+
+class LocalTransport(Transport):
+    """Transport delivering the events between the nodes of the same process.
+    The same instance should be given to all nodes.
+    """
+
+    def __init__(self):
+        """LocalTransport constructor."""
+        self._handlers = {}
+
+    async def start(self, node, handler):
+        """See `Transport.start()`."""
+        self._handlers[node] = handler
+
+    async def send(self, node, event):
+        """See `Transport.send()`. Events are serialized like they would be
+        between processes, and delivered on the next iteration of the event
+        loop.
+        """
+        handler = self._handlers.get(node)
+        if handler is not None:
+            asyncio.get_running_loop().call_soon(handler, json.loads(json.dumps(event)))
+
+    async def close(self):
+        """See `Transport.close()`."""
+        self._handlers.clear()
+
+
+class UnixSocketTransport(Transport):
+    """Transport delivering the events between processes of the same machine,
+    through Unix sockets. Each node listens on its own socket, named after the
+    node, and events are sent as lines of JSON.
+
+    Attributes:
+        path (str): Directory containing the sockets.
+    """
+
+    def __init__(self, path):
+        """UnixSocketTransport constructor.
+
+        Args:
+            path (str): Directory containing the sockets.
+        """
+        self.path = path
+        self._server = None
+        self._socket = None
+        self._writers = {}
+        self._connections = {}
+
+    async def start(self, node, handler):
+        """See `Transport.start()`."""
+
+        async def receive(reader, writer):
+            self._connections[writer] = asyncio.current_task()
+            try:
+                async for line in reader:
+                    handler(json.loads(line))
+            finally:
+                writer.close()
+                self._connections.pop(writer, None)
+
+        self._socket = self._socket_path(node)
+        if os.path.exists(self._socket):
+            os.remove(self._socket)
+        self._server = await asyncio.start_unix_server(receive, self._socket)
+
+    async def send(self, node, event):
+        """See `Transport.send()`. The connection to each node is kept open,
+        and opened again if it was closed.
+        """
+        data = (json.dumps(event) + "\n").encode()
+        writer = self._writers.get(node)
+        if writer is None or writer.is_closing():
+            _, writer = await asyncio.open_unix_connection(self._socket_path(node))
+            self._writers[node] = writer
+        writer.write(data)
+        await writer.drain()
+
+    async def close(self):
+        """See `Transport.close()`."""
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        if self._server is not None:
+            self._server.close()
+            # Close the connections of the other nodes, and wait until they
+            # are done reading
+            connections = list(self._connections.items())
+            for writer, _ in connections:
+                writer.close()
+            await asyncio.gather(*[task for _, task in connections], return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+            os.remove(self._socket)
+
+    ############################## Private #####################################
+
+    def _socket_path(self, node):
+        """Private function.
+
+        Path of the socket of a node.
+
+        Args:
+            node (str): Name of the node.
+
+        Returns:
+            str: Path of the socket.
+        """
+        return os.path.join(self.path, "{}.sock".format(node))
+
+
+class Cluster:
+    """Class representing a node of a cluster of processes (or shards)
+    sharing the help.
+
+    Each node owns the sessions it displays : it registers their messages in
+    the directory. When a node receives an event for a session it doesn't
+    own (for example because Discord sends all DM events to the first shard),
+    it forwards the event to the owner through the transport.
+
+    Interactions can't be forwarded : the node receiving them acknowledges
+    them, and forwards the choice of the user as a reaction. The owner then
+    edits its message directly.
+
+    Attributes:
+        node (str): Name of this node.
+        directory (SessionDirectory): Directory of the sessions owners.
+        transport (Transport): Transport used to forward the events.
+        forwarded (int): Number of events forwarded to other nodes.
+        received (int): Number of events received from other nodes.
+    """
+
+    def __init__(self, node, directory, transport):
+        """Cluster constructor.
+
+        Args:
+            node (str): Name of this node. It must be unique in the cluster.
+            directory (SessionDirectory): Directory of the sessions owners,
+                shared by all nodes.
+            transport (Transport): Transport used to forward the events.
+        """
+        self.node = str(node)
+        self.directory = directory
+        self.transport = transport
+        self.forwarded = 0
+        self.received = 0
+        self._router = None
+
+    async def start(self, router):
+        """Start receiving the events forwarded by other nodes. It's called by
+        `Help.start()`.
+
+        Args:
+            router (EventRouter): Router delivering the events to the sessions
+                of this node.
+        """
+        if self._router is None:
+            self._router = router
+            await self.transport.start(self.node, self._receive)
+
+    async def claim(self, message):
+        """Register this node as the owner of a message (and its channel).
+
+        Args:
+            message (Discord.Message): Message displaying a session.
+        """
+        await self.directory.claim(("message", message.id), self.node)
+        await self.directory.claim(("channel", message.channel.id), self.node)
+
+    async def release(self, message):
+        """Unregister this node as the owner of a message (and its channel).
+
+        Args:
+            message (Discord.Message): Message displaying a session.
+        """
+        await self.directory.release(("message", message.id), self.node)
+        await self.directory.release(("channel", message.channel.id), self.node)
+
+    def forward(self, event, *args):
+        """Forward an event to the node owning its session, if it's not this
+        node. It's called by the router for the events no local session was
+        waiting for. The forwarding happens in the background.
+
+        Args:
+            event (str): Name of the event.
+            *args: Arguments of the event.
+        """
+        payload = _serialize(event, *args)
+        bot = getattr(self._router.client, "user", None) if self._router is not None else None
+        if payload is not None and (bot is None or payload["user"] != bot.id):
+            # Nobody waits for the forwarding
+            run_in_background(
+                self._forward(payload, args[0] if event == "interaction" else None), "the forwarding of an event"
+            )
+
+    async def close(self):
+        """Stop receiving the events forwarded by other nodes."""
+        await self.transport.close()
+        self._router = None
+
+    ############################## Private #####################################
+
+    async def _forward(self, payload, interaction=None):
+        """Private function.
+
+        Find the owner of an event, and send it the event.
+
+        Args:
+            payload (dict): Serialized event.
+            interaction (Discord.Interaction, optional): Interaction to
+                acknowledge, if the event comes from an interaction. Defaults
+                to `None`.
+        """
+        owner = await self.directory.owner(tuple(payload["key"]))
+        if owner is None or owner == self.node:
+            return
+        if interaction is not None:
+            await interaction.response.defer()
+        self.forwarded += 1
+        await self.transport.send(owner, payload)
+
+    def _receive(self, payload):
+        """Private function.
+
+        Deliver an event forwarded by another node to the sessions of this
+        node. Events are never forwarded twice.
+
+        Args:
+            payload (dict): Serialized event.
+        """
+        if self._router is None:
+            return
+        self.received += 1
+        event, args = _deserialize(payload)
+        getattr(self._router, "on_" + event)(*args)
+
+
+def _serialize(event, *args):
+    """Private function.
+
+    Serialize an event, so it can be forwarded. Only the events of direct
+    messages can be forwarded.
+
+    Args:
+        event (str): Name of the event.
+        *args: Arguments of the event.
+
+    Returns:
+        dict: Serialized event, or `None` if it can't be forwarded.
+    """
+    if event in ("raw_reaction_add", "raw_reaction_remove"):
+        raw = args[0]
+        if raw.guild_id is not None:
+            return None
+        return {
+            "event": event[len("raw_") :],
+            "key": ["message", raw.message_id],
+            "user": raw.user_id,
+            "channel": raw.channel_id,
+            "message": raw.message_id,
+            "emoji": str(raw.emoji),
+        }
+    elif event == "interaction":
+        interaction = args[0]
+        message, user = interaction.message, interaction.user
+        if interaction.type != discord.InteractionType.component or message is None:
+            return None
+        data = interaction.data or {}
+        emoji = data["values"][0] if data.get("values") else data.get("custom_id")
+        # The owner can't respond to the interaction, so it's delivered as a
+        # reaction
+        event = "reaction_add"
+    elif event == "message":
+        message = args[0]
+        if getattr(message, "guild", None) is not None:
+            return None
+        return {
+            "event": event,
+            "key": ["channel", message.channel.id],
+            "user": message.author.id,
+            "channel": message.channel.id,
+            "message": message.id,
+            "content": message.content,
+        }
+    else:
+        return None
+
+    return {
+        "event": event,
+        "key": ["message", message.id],
+        "user": user.id,
+        "channel": message.channel.id,
+        "message": message.id,
+        "emoji": emoji,
+    }
+
+
+def _deserialize(payload):
+    """Private function.
+
+    Rebuild an event forwarded by another node, with objects having the
+    attributes used by the `Help`.
+
+    Args:
+        payload (dict): Serialized event.
+
+    Returns:
+        event (str): Name of the event.
+        args (tuple): Arguments of the event.
+    """
+    user = types.SimpleNamespace(id=payload["user"])
+    channel = types.SimpleNamespace(id=payload["channel"])
+    if payload["event"] == "message":
+        message = types.SimpleNamespace(
+            id=payload["message"], author=user, channel=channel, guild=None, content=payload["content"]
+        )
+        return "message", (message,)
+
+    message = types.SimpleNamespace(id=payload["message"], channel=channel, guild=None)
+    reaction = types.SimpleNamespace(emoji=payload["emoji"], message=message)
+    return payload["event"], (reaction, user)
@@ -0,0 +1,424 @@
+"""Module containing the functions to compile a help tree built with
+`Page.link()` calls : the tree is validated in a single pass (instead of
+failing while a user navigates it), the pages are given stable IDs, and the
+navigation tables are precomputed.
+"""
+
+import contextlib
+import gc
+from collections import deque, namedtuple
+
+from discord_interactive.page import DEFAULT_QUIT_REACT, MAX_COMPONENTS, FrozenPageError, LazyPage, ListPage, Page
+
+
+# Maximum number of different reactions on a Discord message
+MAX_REACTIONS = 20
+
+NavigationTables = namedtuple("NavigationTables", ["ids", "depth", "parent", "reactions", "msg_targets"])
+NavigationTables.__doc__ = """Navigation tables of a compiled tree. Pages are
+numbered in the order of their IDs, and all tables are indexed by this number.
+Lazy pages are not numbered : they are represented by `-1`.
+
+Attributes:
+    ids (tuple of str): ID of each page.
+    depth (tuple of int): Number of links from the root to each page, or `-1`
+        if the page is only reachable through parent or root links.
+    parent (tuple of int): Parent page of each page, or `-1`.
+    reactions (tuple): For each page, tuple of `(reaction, targets)`, where
+        `targets` is a tuple of page numbers, in the order of `reactions()`.
+    msg_targets (tuple): For each page, tuple of the page numbers targeted by
+        its `MsgLink`, or `None`.
+"""
+
+
+class TreeError(ValueError):
+    """Exception raised when a help tree, or the document describing it, is
+    not valid.
+    """
+
+
+class Tree:
+    """Class representing a compiled help tree, loaded from a document (see
+    `load_tree()`) or built with `Page.link()` calls (see `compile_pages()`).
+    It can be given directly to the `Help`.
+
+    All pages of the tree are frozen : they can't be modified, but callbacks
+    can still customize them for a session.
+
+    Attributes:
+        root (Page or list of Page): Root page of the tree.
+        pages (dict): Pages of the tree, by ID.
+        tables (tuple): Compiled tables the tree was built from.
+    """
+
+    def __init__(self, root, pages, tables):
+        """Tree constructor.
+
+        Args:
+            root (Page or list of Page): Root page of the tree.
+            pages (dict): Pages of the tree, by ID.
+            tables (tuple): Compiled tables the tree was built from.
+        """
+        self.root = root
+        self.pages = pages
+        self.tables = tables
+
+    def __getitem__(self, page_id):
+        """Retrieve a page by ID."""
+        return self.pages[page_id]
+
+    def __len__(self):
+        """Number of pages in the tree."""
+        return len(self.pages)
+
+
+def index_pages(pages):
+    """Index the pages reachable from the given pages by ID. Pages without ID
+    are given one, based on their position in the tree (so it's stable as long
+    as the tree is built the same way). Lazy pages are not built.
+
+    Args:
+        pages (list of Page or Page): Starting point of the help.
+
+    Returns:
+        dict: Pages by ID.
+    """
+    pages = pages if isinstance(pages, list) else [pages]
+    to_visit = [(page, str(i)) for i, page in enumerate(pages)]
+    index = {}
+    seen = set()
+    while to_visit:
+        page, page_id = to_visit.pop()
+        if page in seen or not isinstance(page, Page):
+            continue
+        seen.add(page)
+
+        if page.id is None:
+            try:
+                page.id = page_id
+            except FrozenPageError:
+                continue
+        index[page.id] = page
+
+        children = [child for link in _down_links(page) for child in link.pages]
+        to_visit.extend(reversed([(child, "{}/{}".format(page.id, i)) for i, child in enumerate(children)]))
+    return index
+
+
+def validate_tree(pages, quit_react=DEFAULT_QUIT_REACT):
+    """Check the pages reachable from the given pages, and list the problems
+    found. Lazy pages are not built, so their subtree is not checked.
+
+    The following problems are detected :
+
+    * Several links of a page (including the parent and the root links) using
+      the same reaction, or using the quit reaction.
+    * More reactions than Discord allows on a message, or more links than
+      components can display.
+    * Links without target page, with a target that is not a page, or with a
+      `path` out of range (including `MsgLink`).
+    * Callbacks that are not callable.
+    * Several pages with the same ID.
+
+    Args:
+        pages (list of Page or Page): Starting point of the help.
+        quit_react (str, optional): Reaction used to leave the help system.
+            Defaults to `❌`.
+
+    Returns:
+        list of str: Problems found, empty if the tree is valid.
+    """
+    problems = []
+    ids = {}
+    for page in _walk(pages):
+        if page.id is not None:
+            if page.id in ids:
+                problems.append("Several pages use the ID '{}'".format(page.id))
+            ids[page.id] = page
+
+        where = "page '{}'".format(page.id) if page.id is not None else "page {!r}".format(_excerpt(page.msg))
+
+        problems.extend(_check_reactions(page, where, quit_react))
+        problems.extend(_check_links(page, where))
+    return problems
+
+
+def compile_pages(pages, quit_react=DEFAULT_QUIT_REACT, freeze=True):
+    """Compile a help tree built with `Page.link()` calls : validate it, give
+    stable IDs to its pages, and precompute its navigation tables.
+
+    The result can be given directly to the `Help`. Once frozen, the tree
+    doesn't change anymore : compile it before forking worker processes, so
+    they share it (call `gc.freeze()` before forking, so the garbage collector
+    doesn't touch the shared pages).
+
+    Args:
+        pages (list of Page or Page): Starting point of the help.
+        quit_react (str, optional): Reaction used to leave the help system.
+            Defaults to `❌`.
+        freeze (bool, optional): If `True`, the pages are frozen (see
+            `Page.freeze()`). Defaults to `True`.
+
+    Throws:
+        TreeError: The tree is not valid. The message lists all the problems
+            found.
+
+    Returns:
+        Tree: The compiled tree.
+    """
+    _check_tree(pages, quit_react)
+
+    with _paused_gc():
+        index = index_pages(pages)
+        ids = tuple(sorted(index))
+        numbers = {index[page_id]: i for i, page_id in enumerate(ids)}
+
+        def number(target):
+            return numbers.get(target, -1)
+
+        reactions, msg_targets, parent = [], [], []
+        for page_id in ids:
+            page = index[page_id]
+            links = _react_links(page)
+            reactions.append(tuple((link.reaction, tuple(number(t) for t in link.pages)) for link in links))
+            msg_link = page.msg_link
+            msg_targets.append(tuple(number(t) for t in msg_link.pages) if msg_link is not None else None)
+            parent.append(number(page.parent.pages[0]) if page.parent is not None else -1)
+
+        depth = _depths(pages, index, ids, number)
+
+        if freeze:
+            for page in index.values():
+                page.freeze()
+
+        tables = NavigationTables(ids, depth, tuple(parent), tuple(reactions), tuple(msg_targets))
+        return Tree(pages, index, tables)
+
+
+################################ Private #######################################
+
+
+@contextlib.contextmanager
+def _paused_gc():
+    """Private function.
+
+    Pause the garbage collector. Loading a tree creates thousands of objects,
+    which triggers the garbage collector many times for nothing (there is no
+    garbage yet).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _check_tree(pages, quit_react):
+    """Private function.
+
+    Validate a tree, see `validate_tree()`.
+
+    Args:
+        pages (list of Page or Page): Starting point of the help.
+        quit_react (str): Reaction used to leave the help system.
+
+    Throws:
+        TreeError: The tree is not valid. The message lists all the problems
+            found.
+    """
+    problems = validate_tree(pages, quit_react)
+    if problems:
+        raise TreeError("The help tree is not valid :\n" + "\n".join("* " + p for p in problems))
+
+
+def _walk(pages):
+    """Private function.
+
+    List the pages reachable from the given pages, following the links, the
+    parent and the root links. Lazy pages are not built.
+
+    Args:
+        pages (list of Page or Page): Starting point of the help.
+
+    Returns:
+        list of Page: Pages reachable.
+    """
+    to_visit = list(pages) if isinstance(pages, list) else [pages]
+    seen = set()
+    walked = []
+    while to_visit:
+        page = to_visit.pop()
+        if page in seen or not isinstance(page, Page):
+            continue
+        seen.add(page)
+        walked.append(page)
+        for _, link in _named_links(page):
+            to_visit.extend(link.pages)
+    return walked
+
+
+def _check_reactions(page, where, quit_react):
+    """Private function.
+
+    Check the reactions used by the links of a page.
+
+    Args:
+        page (Page): Page to check.
+        where (str): Name of the page, used in the error messages.
+        quit_react (str): Reaction used to leave the help system.
+
+    Returns:
+        list of str: Problems found.
+    """
+    problems = []
+    reactions = [link.reaction for link in _react_links(page)]
+    for reaction in sorted({r for r in reactions if reactions.count(r) > 1}):
+        problems.append("The reaction {} is used by several links of the {}".format(reaction, where))
+    if quit_react in reactions:
+        problems.append("The quit reaction {} is used by a link of the {}".format(quit_react, where))
+    if len(set(reactions)) + 1 > MAX_REACTIONS:
+        problems.append(
+            "The {} has {} reactions, but a message can only have {}".format(
+                where, len(set(reactions)) + 1, MAX_REACTIONS
+            )
+        )
+    if len(set(reactions)) > MAX_COMPONENTS - 1:
+        problems.append(
+            "The {} has {} links, but only {} can be displayed as buttons".format(
+                where, len(set(reactions)), MAX_COMPONENTS - 1
+            )
+        )
+    return problems
+
+
+def _check_links(page, where):
+    """Private function.
+
+    Check the targets and the callbacks of the links of a page.
+
+    Args:
+        page (Page): Page to check.
+        where (str): Name of the page, used in the error messages.
+
+    Returns:
+        list of str: Problems found.
+    """
+    problems = []
+    for name, link in _named_links(page):
+        link_where = "{} of the {}".format(name, where)
+        if not link.pages:
+            problems.append("The {} has no target page".format(link_where))
+        elif not 0 <= link.path < len(link.pages):
+            problems.append(
+                "The path of the {} is {}, but it has {} target pages".format(link_where, link.path, len(link.pages))
+            )
+        for target in link.pages:
+            if not isinstance(target, (Page, LazyPage)):
+                problems.append("The {} targets {!r}, which is not a page".format(link_where, target))
+        for callback in link.callbacks:
+            if not callable(callback):
+                problems.append("The callback {!r} of the {} is not callable".format(callback, link_where))
+    return problems
+
+
+def _depths(pages, index, ids, number):
+    """Private function.
+
+    Compute the depth of each page : the number of links going down the tree
+    from the starting pages (breadth-first).
+
+    Args:
+        pages (list of Page or Page): Starting point of the help.
+        index (dict): Pages by ID.
+        ids (tuple of str): ID of each page, by page number.
+        number (function): Function giving the number of a page.
+
+    Returns:
+        tuple of int: Depth of each page, or `-1` if it's not reachable.
+    """
+    depth = [-1] * len(ids)
+    roots = pages if isinstance(pages, list) else [pages]
+    queue = deque(number(p) for p in roots if number(p) >= 0)
+    for i in queue:
+        depth[i] = 0
+    while queue:
+        i = queue.popleft()
+        for link in _down_links(index[ids[i]]):
+            for target in link.pages:
+                j = number(target)
+                if j >= 0 and depth[j] < 0:
+                    depth[j] = depth[i] + 1
+                    queue.append(j)
+    return tuple(depth)
+
+
+def _down_links(page):
+    """Private function.
+
+    List the links of a page going down the tree (not the parent or root).
+
+    Args:
+        page (Page): Page.
+
+    Returns:
+        list of Link: Links of the page, and its `MsgLink` if any.
+    """
+    links = list(page.links)
+    if page.msg_link is not None:
+        links.append(page.msg_link)
+    return links
+
+
+def _react_links(page):
+    """Private function.
+
+    List the links of a page used with a reaction, in the order of
+    `Page.reactions()` : the `◀` and `▶` links of a `ListPage`, its links, then
+    its parent and root links.
+
+    Args:
+        page (Page): Page.
+
+    Returns:
+        list of ReactLink: Links of the page.
+    """
+    links = [page.prev_page_link, page.next_page_link] if isinstance(page, ListPage) else []
+    return links + list(page.links) + [link for link in (page.parent, page.root) if link is not None]
+
+
+def _named_links(page):
+    """Private function.
+
+    List all the links of a page, with a name used in the error messages.
+
+    Args:
+        page (Page): Page.
+
+    Returns:
+        list: List of `(name, link)`.
+    """
+    named = [("link {}".format(link.reaction), link) for link in page.links]
+    if page.msg_link is not None:
+        named.append(("message link", page.msg_link))
+    if page.parent is not None:
+        named.append(("parent link", page.parent))
+    if page.root is not None:
+        named.append(("root link", page.root))
+    return named
+
+
+def _excerpt(text, length=30):
+    """Private function.
+
+    Shorten a text, to identify a page in the error messages.
+
+    Args:
+        text (str): Text.
+        length (int, optional): Maximum length. Defaults to `30`.
+
+    Returns:
+        str: Shortened text.
+    """
+    return text if len(text) <= length else text[: length - 1] + "…"
@@ -0,0 +1,165 @@
+"""Module containing the definition of the `ContentProvider` class. A content
+provider fetches the dynamic content of a page (for example from a database),
+and caches it, so popular pages don't query the backing store on every view.
+"""
+
+import asyncio
+from enum import Enum, auto
+
+from discord_interactive.background import run_in_background
+from discord_interactive.cache import LRUCache
+
+
+class Scope(Enum):
+    """Scope of the content fetched by a `ContentProvider` : who shares the
+    same cached content.
+    """
+
+    GLOBAL = auto()
+    GUILD = auto()
+    USER = auto()
+
+
+class ContentProvider:
+    """Class fetching the dynamic content of a page, and caching it.
+
+    The content is fetched by calling `fetch(member)`, a coroutine function
+    returning either the message of the page (`str`), or a `dict` of
+    attributes of the page to set (like `{"msg": ..., "embed_kwargs": ...}`).
+
+    The content is cached for `ttl` seconds, and shared by all members of the
+    same scope : everyone (`Scope.GLOBAL`), the members of the same guild
+    (`Scope.GUILD`), or only the member (`Scope.USER`).
+
+    Once expired, the content can still be served for `stale_while_revalidate`
+    seconds while it's fetched again in the background. Concurrent requests
+    for content not cached are grouped into a single call to `fetch`.
+
+    Attributes:
+        fetch (coroutine function): Function fetching the content for a member.
+        ttl (float): Number of seconds the content stays fresh.
+        scope (Scope): Who shares the same cached content.
+        stale_while_revalidate (float): Number of seconds the content can be
+            served after it expired, while it's fetched again.
+        fetches (int): Number of calls to `fetch`.
+    """
+
+    def __init__(self, fetch, ttl=60.0, scope=Scope.GLOBAL, stale_while_revalidate=0.0, maxsize=1024):
+        """ContentProvider constructor.
+
+        Args:
+            fetch (coroutine function): Function fetching the content for a
+                member.
+            ttl (float, optional): Number of seconds the content stays fresh.
+                Defaults to `60`.
+            scope (Scope, optional): Who shares the same cached content.
+                Defaults to `Scope.GLOBAL`.
+            stale_while_revalidate (float, optional): Number of seconds the
+                content can be served after it expired, while it's fetched
+                again in the background. Defaults to `0`.
+            maxsize (int, optional): Maximum number of contents cached (one per
+                guild or per user, depending on the scope). Defaults to `1024`.
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.scope = scope
+        self.stale_while_revalidate = stale_while_revalidate
+        self.fetches = 0
+        self._cache = LRUCache(maxsize)
+        self._inflight = {}
+
+    async def get(self, member):
+        """Retrieve the content for a member, from the cache if possible.
+
+        Args:
+            member (Discord.Member): Member who will see the content.
+
+        Returns:
+            str or dict: Content of the page.
+        """
+        key = self._key(member)
+        now = asyncio.get_running_loop().time()
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            value, fetched_at = cached
+            age = now - fetched_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_while_revalidate:
+                # Serve the stale content, and refresh it in the background
+                self._refresh(key, member)
+                return value
+
+        return await asyncio.shield(self._refresh(key, member))
+
+    def invalidate(self, member=None):
+        """Forget the cached content, so it's fetched again on the next view.
+
+        Args:
+            member (Discord.Member, optional): If given, only forget the
+                content of the scope of this member. Defaults to `None` (forget
+                everything).
+        """
+        if member is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(self._key(member))
+
+    ############################## Private #####################################
+
+    def _key(self, member):
+        """Private function.
+
+        Compute the key of the cached content for a member, depending on the
+        scope.
+
+        Args:
+            member (Discord.Member): Member who will see the content.
+
+        Returns:
+            hashable: Key of the content.
+        """
+        if self.scope == Scope.USER:
+            return member.id
+        elif self.scope == Scope.GUILD:
+            guild = getattr(member, "guild", None)
+            return guild.id if guild is not None else None
+        return None
+
+    def _refresh(self, key, member):
+        """Private function.
+
+        Fetch the content again, unless it's already being fetched.
+
+        Args:
+            key (hashable): Key of the content.
+            member (Discord.Member): Member who will see the content.
+
+        Returns:
+            asyncio.Future: Future resolved with the content.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            # Nobody might wait for a background refresh
+            future = run_in_background(self._fetch(key, member), "the refresh of a content")
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None))
+        return future
+
+    async def _fetch(self, key, member):
+        """Private function.
+
+        Fetch the content, and cache it.
+
+        Args:
+            key (hashable): Key of the content.
+            member (Discord.Member): Member who will see the content.
+
+        Returns:
+            str or dict: Content of the page.
+        """
+        self.fetches += 1
+        value = await self.fetch(member)
+        self._cache.put(key, (value, asyncio.get_running_loop().time()))
+        return value
@@ -4,12 +4,176 @@ with the user.
 """
 
 import asyncio
+import contextlib
 
+import discord
+
+from discord_interactive.background import run_in_background
+from discord_interactive.board import Board
+from discord_interactive.cache import LRUCache
+from discord_interactive.callback import run_callbacks
+from discord_interactive.compiler import Tree, index_pages
 from discord_interactive.link import RootLink
-from discord_interactive.page import PageType
+from discord_interactive.page import DEFAULT_QUIT_REACT, Controls, PageType
+from discord_interactive.router import EventRouter
+from discord_interactive.scheduler import Priority
+from discord_interactive.session import HistoryEntry, SessionLimitError, SessionManager
+from discord_interactive.store import Checkpoint
+
+
+DEFAULT_QUEUE_MSG = "⏳ The help is busy, you are number {position} in the queue."
+DEFAULT_BUSY_MSG = "⏳ The help is busy, please try again later."
+
+# Used instead of a timer when no metrics are attached, so it costs nothing
+_NO_TIMER = contextlib.nullcontext()
+
+
+def _diff_reactions(current, target):
+    """Private function.
+
+    Compute the reactions to remove and to add on a message, to go from the
+    `current` reactions to the `target` reactions.
+
+    Discord displays reactions in the order they were first added. Keeping
+    that order would mean removing every reaction after the first one that
+    moves : going from a page with only `🔙 🔝 ❌` to a page with links would
+    remove and add them all again. Instead, the reactions already on the
+    message stay where they are, and the missing ones are added after them.
+
+    Args:
+        current (tuple of str): Reactions currently on the message.
+        target (tuple of str): Reactions expected by the next page, in order.
+
+    Returns:
+        to_remove (list of str): Reactions to remove from the message.
+        to_add (tuple of str): Reactions to add to the message, in order.
+    """
+    kept = set(target)
+    to_remove = [react for react in current if react not in kept]
+    on_message = set(current)
+    return to_remove, tuple(react for react in target if react not in on_message)
+
+
+def _resend_is_cheaper(current, target):
+    """Private function.
+
+    Check if deleting the message and sending a new one costs fewer requests
+    than editing it and updating its reactions. Editing costs one request,
+    plus one per reaction removed or added. Sending a new message costs two
+    requests (delete and send), plus one per reaction.
+
+    Args:
+        current (tuple of str): Reactions currently on the message.
+        target (tuple of str): Reactions expected by the next page.
+
+    Returns:
+        bool: `True` if a new message should be sent.
+    """
+    to_remove, to_add = _diff_reactions(current, target)
+    return 1 + len(to_remove) + len(to_add) > 2 + len(target)
+
+
+def _chosen_reaction(reaction):
+    """Private function.
+
+    Retrieve the reaction chosen by the user. When the user used a component,
+    the reaction is the custom ID of the button, or the value of the select
+    menu.
+
+    Args:
+        reaction (Discord.Reaction or Discord.Interaction): Reaction (or
+            interaction) of the user.
+
+    Returns:
+        str: Reaction chosen by the user.
+    """
+    if not isinstance(reaction, discord.Interaction):
+        return reaction.emoji
+
+    values = reaction.data.get("values")
+    if values:
+        return values[0]
+    return reaction.data.get("custom_id")
+
 
+class _StoredInput:
+    """Private class.
 
-DEFAULT_QUIT_REACT = "❌"
+    Message previously sent by the user, restored from a checkpoint. Only its
+    content is known.
+    """
+
+    def __init__(self, content):
+        """_StoredInput constructor.
+
+        Args:
+            content (str): Content of the message.
+        """
+        self.content = content
+
+
+class _QueueMessage:
+    """Private class.
+
+    Message telling a member their position in the queue, while they wait for
+    a session. Updates are coalesced : while a message is being sent or
+    edited, only the latest position is kept for the next edit.
+    """
+
+    def __init__(self, help, member):
+        """_QueueMessage constructor.
+
+        Args:
+            help (Help): Help the member is waiting for.
+            member (Discord.Member): Member waiting.
+        """
+        self.help = help
+        self.member = member
+        self.message = None
+        self.position = None
+        self._task = None
+
+    def update(self, position):
+        """Display the new position of the member, in the background.
+
+        Args:
+            position (int): Position in the queue, starting at `1`.
+        """
+        self.position = position
+        if self._task is None or self._task.done():
+            # Nobody waits for the update
+            self._task = run_in_background(self._send(), "the update of a queue message")
+
+    def close(self):
+        """Delete the message in the background, once it's sent."""
+        run_in_background(self._delete(), "the deletion of a queue message")
+
+    async def _send(self):
+        """Private function.
+
+        Send or edit the message until it displays the latest position.
+        """
+        help = self.help
+        shown = None
+        while shown != self.position:
+            shown = self.position
+            content = help.queue_msg.format(position=shown)
+            if self.message is None:
+                channel = await help._dm_channel(self.member)
+                self.message = await help._request(Priority.MESSAGE, channel.send, content, channel=channel.id)
+            else:
+                # The position is only an indication, it can wait
+                await help._request(Priority.REACTION, self.message.edit, content=content, message=self.message)
+
+    async def _delete(self):
+        """Private function.
+
+        Wait for the pending update, and delete the message.
+        """
+        if self._task is not None:
+            await asyncio.wait([self._task])
+        if self.message is not None:
+            await self.help._request(Priority.DELETE, self.message.delete, message=self.message)
 
 
 class Help:
@@ -19,28 +183,191 @@ class Help:
         client (Discord.Client): Discord client (to send messages).
         tree (RootLink): Link representing the whole help pages as a tree.
         quit_react (str): Reaction used to leave the help system..
+        edit_in_place (bool): If `True`, a single message is used for the
+            whole session, and navigating to another page edits this message
+            instead of deleting it and sending a new one (unless sending a new
+            one needs fewer requests).
+        router (EventRouter): Router dispatching the events of the client to
+            the sessions waiting for an input.
+        timeout (float): Number of seconds to wait for the user input before
+            closing the session, or `None` to wait forever.
+        sessions (SessionManager): Manager keeping track of the live sessions.
+        scheduler (RequestScheduler): Scheduler used to send the requests to
+            Discord, or `None` to send them directly.
+        controls (Controls): How the user navigates between pages.
+        metrics (Metrics): Where to report the measures of the help (timings
+            of each phase, API calls, live sessions), or `None`.
+        prerender (int): Maximum number of child pages rendered in advance
+            while waiting for the user input.
+        prerender_content (bool): If `True`, the content providers of the
+            child pages are also called in advance.
+        store (SessionStore): Where the sessions are saved, so they can be
+            resumed after a restart, or `None`.
+        cluster (Cluster): Node of the cluster of processes sharing the help,
+            or `None` if the help runs in a single process.
+        dm_channels (LRUCache): DM channels of the members, by user ID.
+        callback_timeout (float): Number of seconds a callback can take, or
+            `None` for no timeout.
+        callback_fallback (Page): Page displayed when a callback times out, or
+            `None`.
+        callback_executor (concurrent.futures.Executor): Thread pool running
+            the synchronous callbacks, or `None` for the default one.
+        queue_msg (str): Message telling a waiting member their position in
+            the queue, or `None`.
+        busy_msg (str): Message sent to a member when the queue is full, or
+            `None` to raise `SessionLimitError`.
+        reattach (bool): Whether `display()` reattaches to the live session of
+            the member instead of opening another one.
     """
 
-    def __init__(self, client, pages, callbacks=[], quit_react=DEFAULT_QUIT_REACT):
+    def __init__(
+        self,
+        client,
+        pages,
+        callbacks=[],
+        quit_react=DEFAULT_QUIT_REACT,
+        edit_in_place=False,
+        timeout=None,
+        max_sessions=None,
+        max_sessions_per_user=None,
+        scheduler=None,
+        controls=Controls.REACTIONS,
+        metrics=None,
+        prerender=0,
+        prerender_content=False,
+        store=None,
+        cluster=None,
+        dm_cache_size=10000,
+        callback_timeout=None,
+        callback_fallback=None,
+        callback_executor=None,
+        max_queue=0,
+        queue_msg=DEFAULT_QUEUE_MSG,
+        busy_msg=DEFAULT_BUSY_MSG,
+        reattach=False,
+        max_inputs=100,
+        history_size=10,
+    ):
         """Help constructor.
 
         Args:
             client (Discord.Client): Discord client (to send messages).
-            pages (list of Page or Page): List of pages representing the
-                starting point of the help.
+            pages (list of Page or Page or Tree): List of pages representing
+                the starting point of the help, or a tree loaded with
+                `load_tree()`.
             callbacks (list, optional): List of functions to call when taking
                 this link. Defaults to empty list.
             quit_react (str, optional): Reaction used to leave the help system.
                 Defaults to `❌`.
+            edit_in_place (bool, optional): If `True`, keep a single message
+                per session and edit it when navigating. The message is only
+                deleted when the user quits. Defaults to `False`.
+            timeout (float, optional): Number of seconds to wait for the user
+                input before closing the session. Defaults to `None` (wait
+                forever).
+            max_sessions (int, optional): Maximum number of concurrent
+                sessions. Defaults to `None` (no limit).
+            max_sessions_per_user (int, optional): Maximum number of concurrent
+                sessions for a single user. When a user opens a new session
+                over this limit, their oldest session is closed. Defaults to
+                `None` (no limit).
+            scheduler (RequestScheduler, optional): Scheduler used to send the
+                requests to Discord, following the rate limits. If `None`, the
+                requests are sent directly. Defaults to `None`.
+            controls (Controls, optional): How the user navigates between
+                pages : with reactions, buttons, or a select menu. With buttons
+                or a select menu, the message is always edited in place.
+                Defaults to `Controls.REACTIONS`.
+            metrics (Metrics, optional): Where to report the measures of the
+                help. See `Metrics` for the list of measures. Defaults to `None`
+                (nothing is measured).
+            prerender (int, optional): Maximum number of child pages of the
+                current page rendered in advance while waiting for the user
+                input, so the next page only needs to be sent. Defaults to `0`
+                (nothing is rendered in advance).
+            prerender_content (bool, optional): If `True`, the content
+                providers of the child pages are also called in advance, so
+                their content is cached when the user picks a page. Defaults
+                to `False`.
+            store (SessionStore, optional): Where a checkpoint of each session
+                is saved after each page displayed, so the sessions can be
+                resumed with `resume()` after the bot restarts. Defaults to
+                `None` (sessions are not saved).
+            cluster (Cluster, optional): Node of the cluster of processes (or
+                shards) sharing the help. Sessions are owned by the process
+                displaying them, and events received by another process are
+                forwarded to the owner. Defaults to `None` (the help runs in a
+                single process).
+            dm_cache_size (int, optional): Maximum number of DM channels kept
+                in cache, so opening the help doesn't need to create the DM
+                channel again. Defaults to `10000`.
+            callback_timeout (float, optional): Number of seconds a callback
+                can take before the page is displayed without waiting for it.
+                Callbacks can set their own timeout with `Callback`. Defaults
+                to `None` (no timeout).
+            callback_fallback (Page, optional): Page displayed instead of the
+                page of the link when a callback times out. Defaults to `None`
+                (the page of the link is displayed).
+            callback_executor (concurrent.futures.Executor, optional): Thread
+                pool running the callbacks which are not coroutine functions.
+                Defaults to `None` (default thread pool of the event loop).
+            max_queue (int, optional): Maximum number of members waiting for a
+                session when `max_sessions` is reached. They are admitted in
+                order, as soon as sessions end. Defaults to `0` (nobody
+                waits).
+            queue_msg (str, optional): Message telling a waiting member their
+                position in the queue (`{position}` is replaced), or `None` to
+                wait silently. Defaults to `DEFAULT_QUEUE_MSG`.
+            busy_msg (str, optional): Message sent to a member when the queue
+                is full, or `None` to raise `SessionLimitError` instead.
+                Defaults to `DEFAULT_BUSY_MSG`.
+            reattach (bool, optional): If `True`, calling `display()` for a
+                member who already has a live session (or is waiting for one)
+                doesn't open another session : the current page of the live
+                session is sent again, and `display()` waits for the session
+                to end. Defaults to `False`.
+            max_inputs (int, optional): Maximum number of messages of the
+                member kept by each session, and given to the callbacks as
+                `prev_input`. Older messages are forgotten. Defaults to `100`.
+            history_size (int, optional): Maximum number of pages displayed
+                kept by each session, with their rendered message. Going back
+                to a cacheable page (see `Page`) still in the history displays
+                it again without running its callbacks. Defaults to `10`.
         """
         self.client = client
         self.quit_react = quit_react
+        self.edit_in_place = edit_in_place
+        self.router = EventRouter(client, cluster)
+        self.timeout = timeout
+        self.sessions = SessionManager(max_sessions, max_sessions_per_user, max_queue, max_inputs, history_size)
+        self.scheduler = scheduler
+        self.controls = controls
+        self.metrics = metrics
+        self.prerender = prerender
+        self.prerender_content = prerender_content
+        self.store = store
+        self.cluster = cluster
+        self.dm_channels = LRUCache(dm_cache_size)
+        self._dm_inflight = {}
+        self.callback_timeout = callback_timeout
+        self.callback_fallback = callback_fallback
+        self.callback_executor = callback_executor
+        self.queue_msg = queue_msg
+        self.busy_msg = busy_msg
+        self.reattach = reattach
 
-        # Create a RootLink, representing the root of the help tree
+        # Create a RootLink, representing the root of the help tree. Index the
+        # pages by ID, to find the page of a saved session
+        self._pages = None
+        if isinstance(pages, Tree):
+            self._pages = pages.pages
+            pages = pages.root
+        elif store is not None:
+            self._pages = index_pages(pages)
         root = RootLink(pages, callbacks)
         self.tree = root
 
-    async def display(self, member):  # noqa: C901
+    async def display(self, member):
         """Main function of the Help system.
 
         This function is the main function of the help system. When a user
@@ -48,66 +375,694 @@ class Help:
         It will display the first message of the help, and then wait the user to
         react. Depending on the reaction, it will display the next page, etc...
 
+        The session ends when the user quits, when the user doesn't answer
+        before the timeout, or when the session is cancelled. In all cases, the
+        message of the bot is deleted.
+
+        If the maximum number of concurrent sessions is reached, the member
+        waits in the queue (see `max_queue`), and is told their position.
+
         Args:
             member (Discord.Member): Member who called help. Help will be
-                displayed as a private message to him.
+                displayed as a private message to them.
+
+        Throws:
+            SessionLimitError: The maximum number of concurrent sessions is
+                reached, the queue is full, and there is no `busy_msg`.
+        """
+        await self.start()
+        if self.reattach:
+            task = self.sessions.task(member)
+            if task is not None and task is not asyncio.current_task():
+                if self.metrics is not None:
+                    self.metrics.count("sessions_reattached_total")
+                # Display the live session again, at the bottom of the
+                # conversation
+                sessions = self.sessions.sessions(member)
+                if sessions and sessions[-1].message is not None:
+                    self.router.interrupt(sessions[-1].member, sessions[-1].message)
+                await asyncio.wait([task])
+                return
+
+        session = await self._admit(member)
+        if session is not None:
+            await self._run(session)
+
+    async def post(self, channel, max_members=10000):
+        """Post a help message in a channel, shared by all members of the
+        channel. Each member navigates the help on their own, through ephemeral
+        messages. See `Board`.
+
+        Args:
+            channel (Discord.TextChannel): Channel where the help is posted.
+            max_members (int, optional): Maximum number of members whose
+                navigation is remembered. Defaults to `10000`.
+
+        Returns:
+            Board: The board posted. Close it with `Board.close()`.
+        """
+        await self.start()
+        board = Board(self, channel, max_members)
+        await board.post()
+        return board
+
+    async def warm_up(self, members, concurrency=10):
+        """Create in advance the DM channels of members, for example the
+        members who joined recently, so opening the help for them only needs
+        to send the message.
+
+        Args:
+            members (list of Discord.Member): Members who might open the help.
+            concurrency (int, optional): Maximum number of DM channels created
+                at the same time. Defaults to `10`.
+
+        Returns:
+            int: Number of DM channels ready.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def warm(member):
+            async with semaphore:
+                # In the background : sessions opened meanwhile go first
+                await self._dm_channel(member, Priority.REACTION)
+
+        results = await asyncio.gather(*[warm(m) for m in members], return_exceptions=True)
+        return sum(1 for r in results if not isinstance(r, BaseException))
+
+    async def start(self):
+        """Start listening to the events of the client, and to the events
+        forwarded by other processes. It's called automatically when a session
+        is displayed, but processes forwarding events without displaying any
+        session should call it when the bot starts.
+        """
+        self.router.listen()
+        if self.cluster is not None:
+            await self.cluster.start(self.router)
+
+    async def resume(self):
+        """Resume the sessions saved in the store, for example when the bot
+        starts. Each session reuses its message : nothing is sent again, the
+        help waits for the user input as if the bot never restarted.
+
+        Sessions that can't be resumed (the page or the user doesn't exist
+        anymore, or the maximum number of concurrent sessions is reached) are
+        forgotten : their checkpoint and their message are deleted.
+
+        Returns:
+            list of asyncio.Task: Tasks running the resumed sessions.
+        """
+        if self.store is None:
+            return []
+        await self.start()
+        return [asyncio.ensure_future(self._resume(checkpoint)) for checkpoint in await self.store.load()]
+
+    async def suspend(self):
+        """Stop all sessions, but keep their messages and their checkpoints,
+        so they can be resumed with `resume()`. Call it before the bot stops.
+        """
+        sessions = self.sessions.sessions()
+        for session in sessions:
+            session.suspend()
+        await asyncio.gather(*[s.task for s in sessions if s.task is not None], return_exceptions=True)
+        if self.store is not None:
+            await self.store.flush()
+
+    async def _resume(self, checkpoint):
+        """Resume a saved session.
+
+        Args:
+            checkpoint (Checkpoint): Checkpoint of the session.
+        """
+        channel = self.client.get_partial_messageable(checkpoint.channel, type=discord.ChannelType.private)
+        message = channel.get_partial_message(checkpoint.message)
+        page = self._pages.get(checkpoint.page) if self._pages is not None else None
+        member = self.client.get_user(checkpoint.user)
+        try:
+            if member is None:
+                member = await self.client.fetch_user(checkpoint.user)
+        except discord.HTTPException:
+            member = None
+
+        if page is None or member is None:
+            await self._forget(checkpoint, message)
+            return
+
+        try:
+            session = self.sessions.open(member)
+        except SessionLimitError:
+            if self.metrics is not None:
+                self.metrics.count("sessions_rejected_total")
+            await self._forget(checkpoint, message)
+            return
+        session.id = checkpoint.session
+        session.message = message
+        session.prev_input.extend(_StoredInput(content) for content in checkpoint.inputs)
+        if self.controls == Controls.REACTIONS:
+            session.reactions = page.reactions() + (self.quit_react,)
+        if self.cluster is not None:
+            await self.cluster.claim(message)
+        await self._run(session, page)
+
+    async def _forget(self, checkpoint, message):
+        """Forget a saved session that can't be resumed : delete its
+        checkpoint and its message. Errors happening when deleting the message
+        are ignored.
+
+        Args:
+            checkpoint (Checkpoint): Checkpoint of the session.
+            message (Discord.PartialMessage): Message of the session.
+        """
+        await self.store.delete(checkpoint.session)
+        try:
+            await self._request(Priority.DELETE, message.delete, message=message)
+        except Exception:
+            pass
+
+    async def _admit(self, member):
+        """Open a session for a member, waiting in the queue if needed. If the
+        queue is full, the member is told to try again later.
+
+        Args:
+            member (Discord.Member): Member who called help.
+
+        Throws:
+            SessionLimitError: The queue is full, and there is no `busy_msg`.
+
+        Returns:
+            Session: The new session, or `None` if the member was turned away.
+        """
+        queue_message = _QueueMessage(self, member) if self.queue_msg is not None else None
+        try:
+            return await self.sessions.acquire(member, queue_message.update if queue_message is not None else None)
+        except SessionLimitError:
+            if self.metrics is not None:
+                self.metrics.count("sessions_rejected_total")
+            if self.busy_msg is None:
+                raise
+            channel = await self._dm_channel(member)
+            await self._request(Priority.MESSAGE, channel.send, self.busy_msg, channel=channel.id)
+            return None
+        finally:
+            if queue_message is not None and queue_message.position is not None:
+                queue_message.close()
+            if self.metrics is not None:
+                self.metrics.gauge("sessions_queued", self.sessions.waiting())
+
+    async def _run(self, session, page=None):
+        """Run a session until it ends, and clean it.
+
+        Args:
+            session (Session): Session to run.
+            page (Page, optional): Page already displayed, if the session is
+                resumed. Defaults to `None`.
+        """
+        if self.metrics is not None:
+            self.metrics.count("sessions_total")
+            self.metrics.gauge("sessions_active", len(self.sessions))
+        try:
+            await self._navigate(session, page)
+        except asyncio.CancelledError:
+            # Don't swallow cancellation coming from outside of the Help
+            if not session.cancelled:
+                raise
+        finally:
+            self.sessions.close(session)
+            if self.metrics is not None:
+                self.metrics.gauge("sessions_active", len(self.sessions))
+            if session.suspended:
+                # Keep the message and the checkpoint, to resume the session
+                session.cancel_pending()
+            else:
+                if self.store is not None:
+                    await self.store.delete(session.id)
+                with self._timer("delete"):
+                    await self._clear(session)
+
+    async def _navigate(self, session, page=None):  # noqa: C901
+        """Navigate the help tree, until the user quits.
+
+        Args:
+            session (Session): Session of the member navigating the help.
+            page (Page, optional): Page already displayed, if the session is
+                resumed. Defaults to `None`.
         """
-        current_link = self.tree
-        prev_input = []
+        member = session.member
+        current_link = session.bind(self.tree)
+        interaction = None
+        entry = None
 
         # Never stop displaying help
         while True:
-            # Run basic callbacks before displaying the page
-            for callback in current_link.callbacks:
-                await callback(current_link, member, prev_input)
+            if page is None and entry is not None:
+                # Going back to a cacheable page : display it as it was
+                page = entry.page
+                session.prev_input.clear()
+                session.prev_input.extend(entry.inputs)
+                await self._show(session, page, interaction, entry)
+                await self._checkpoint(session, page)
 
-            # After running the callbacks, we can retrieve the page to be
-            # displayed
-            page = current_link.page()
+            elif page is None:
+                # Run basic callbacks before displaying the page. Callbacks see
+                # the link as bound to this session, so their changes only
+                # affect it
+                await self._run_callbacks(current_link, member, session.prev_input)
 
-            # Send the current page to the user as private message :
-            # Ensure the channel exist
-            if member.dm_channel is None:
-                await member.create_dm()
+                # After running the callbacks, we can retrieve the page to be
+                # displayed
+                page = current_link.page()
+                with self._timer("prepare"):
+                    await page.prepare(member)
+                await self._show(session, page, interaction)
+                await self._checkpoint(session, page)
 
-            # Different page type should be sent differently
-            if page.type == PageType.MESSAGE:
-                bot_message = await member.dm_channel.send(page.get_message())
-            elif page.type == PageType.EMBED:
-                bot_message = await member.dm_channel.send(embed=page.get_embed(), content=None)
-
-            # Display possible reactions
-            for react in page.reactions() + [self.quit_react]:
-                asyncio.ensure_future(bot_message.add_reaction(react))
+            # Use the time spent waiting for the user to render the pages they
+            # might choose next. This is stopped as soon as they choose
+            prerender = None
+            if self.prerender > 0:
+                prerender = session.track(asyncio.ensure_future(self._prerender(page, member)))
 
             next_link = None
             # While user give wrong reaction/input, keep waiting for better input
             while next_link is None:
                 # Get user input
-                reaction, message = await self._get_user_input(member, bot_message, page)
+                with self._timer("wait"):
+                    try:
+                        reaction, message = await asyncio.wait_for(
+                            self._get_user_input(member, session.message, page), self.timeout
+                        )
+                    except asyncio.TimeoutError:
+                        # The user left, nothing more to do
+                        if self.metrics is not None:
+                            self.metrics.count("sessions_timed_out_total")
+                        return
+                    finally:
+                        if prerender is not None:
+                            prerender.cancel()
+                interaction = reaction if isinstance(reaction, discord.Interaction) else None
+
+                if reaction is None and message is None:
+                    # The member asked for the help again (see `reattach`)
+                    await self._bump(session, page)
+                    continue
 
                 # 2 cases : reaction or message
                 if reaction is not None and message is None:
-                    # If the user wants to quit, quit
-                    if reaction.emoji == self.quit_react:
-                        # Clean and quit. This is the only way to quit for now
-                        await bot_message.delete()
+                    # If the user wants to quit, quit. The message is cleaned
+                    # when the session ends
+                    choice = _chosen_reaction(reaction)
+                    if choice == self.quit_react:
+                        if interaction is not None:
+                            await self._instrumented(interaction.response.defer)()
                         return
 
                     # Else, retrieve the next link based on reaction
-                    next_link = page.next_link(reaction.emoji)
+                    next_link = page.next_link(choice)
 
                 elif reaction is None and message is not None:
                     # Retrieve next link
                     next_link = page.next_link()
 
+                if interaction is not None:
+                    # Acknowledge the interaction right away, even if it leads
+                    # nowhere : Discord only waits 3 seconds for the response,
+                    # and the callbacks may take longer. The next page then
+                    # edits the original response
+                    await self._instrumented(interaction.response.defer)()
+
             # Before going to next page, remember the input of the user if given
             if message is not None:
-                prev_input.append(message)
+                session.prev_input.append(message)
+
+            # Here the next page is valid. Clean current message (unless we
+            # reuse it) and loop
+            if not self._reuse_message():
+                with self._timer("delete"):
+                    await self._clear(session)
+            current_link = session.bind(next_link)
+            entry = self._back(session, page, next_link)
+            page = None
+
+    def _back(self, session, page, link):
+        """Check if the user goes back to the previous page of the history,
+        and if it can be displayed again as it was. The history is updated.
+
+        Args:
+            session (Session): Session of the member navigating the help.
+            page (Page): Page currently displayed.
+            link (Link): Link chosen by the user.
+
+        Returns:
+            HistoryEntry: The previous page, or `None` if it should be
+                displayed normally (callbacks and rendering).
+        """
+        history = session.history
+        if link is not page.parent or not history or history[-1].page is not page:
+            return None
+
+        # Leave the current page. The previous one is displayed again, either
+        # from the history or rendered again (and added back to the history)
+        history.pop()
+        if not history or history[-1].page.materialize() is not link.pages[link.path].materialize():
+            return None
+        if not history[-1].page.cacheable:
+            history.pop()
+            return None
+        return history[-1]
+
+    async def _show(self, session, page, interaction=None, entry=None):
+        """Display a page to the user.
+
+        If the session has no message yet, the page is sent as a new private
+        message. Otherwise the message is edited : through the interaction if
+        the user used a component (so it doesn't count against the rate limits
+        of the bot), or directly if not.
+
+        Args:
+            session (Session): Session of the member navigating the help.
+            page (Page): Page to display.
+            interaction (Discord.Interaction, optional): Interaction of the user
+                that led to this page, already deferred. Defaults to `None`.
+            entry (HistoryEntry, optional): Page of the history, displayed
+                again as it was. Defaults to `None` (the page is rendered, and
+                added to the history).
+        """
+        if entry is None:
+            with self._timer("render"):
+                kwargs = self._message_kwargs(page)
+                reactions = page.reactions() + (self.quit_react,)
+            if session.history.maxlen:
+                session.history.append(HistoryEntry(page, kwargs, reactions, tuple(session.prev_input)))
+        else:
+            kwargs, reactions = entry.kwargs, entry.reactions
+
+        if session.message is not None and interaction is None and self.controls == Controls.REACTIONS:
+            if _resend_is_cheaper(session.reactions, reactions):
+                with self._timer("delete"):
+                    await self._clear(session)
+
+        with self._timer("send"):
+            if session.message is None:
+                # Send the current page to the user as private message :
+                # Ensure the channel exist
+                channel = await self._dm_channel(session.member)
+                session.message = await self._request(Priority.MESSAGE, channel.send, channel=channel.id, **kwargs)
+                if self.cluster is not None:
+                    # Events for this message should come to this process
+                    await self.cluster.claim(session.message)
+            elif interaction is not None:
+                # Reuse the message of the previous page, by editing the
+                # response to the interaction
+                await self._instrumented(interaction.edit_original_response)(**kwargs)
+            else:
+                # Reuse the message of the previous page
+                await self._request(Priority.MESSAGE, session.message.edit, message=session.message, **kwargs)
+
+        if self.metrics is not None:
+            self.metrics.count("pages_shown_total")
+
+        if self.controls == Controls.REACTIONS:
+            with self._timer("reactions"):
+                await self._update_reactions(session, reactions)
+
+    async def _update_reactions(self, session, reactions):
+        """Display the possible reactions on the message of the session. If
+        the message is reused, only the reactions that changed are updated.
+        Reactions are added in the background, their time is measured as API
+        calls.
+
+        Args:
+            session (Session): Session of the member navigating the help.
+            reactions (tuple of str): Reactions of the page displayed.
+        """
+        to_remove, to_add = _diff_reactions(session.reactions, reactions)
+        bot_message = session.message
+        for react in to_remove:
+            await self._request(
+                Priority.REACTION, bot_message.remove_reaction, react, self.client.user, message=bot_message
+            )
+        for react in to_add:
+            session.track(self._request(Priority.REACTION, bot_message.add_reaction, react, message=bot_message))
+        # Reactions as displayed : the kept ones first, in their place
+        session.reactions = tuple(react for react in session.reactions if react in reactions) + to_add
+
+    async def _bump(self, session, page):
+        """Display the current page again, in a new message : the page moves
+        to the bottom of the conversation, and the member is notified. The page
+        is displayed as it is, without running the callbacks again.
+
+        Args:
+            session (Session): Session of the member navigating the help.
+            page (Page): Page currently displayed.
+        """
+        with self._timer("render"):
+            entry = HistoryEntry(
+                page, self._message_kwargs(page), page.reactions() + (self.quit_react,), tuple(session.prev_input)
+            )
+        with self._timer("delete"):
+            await self._clear(session)
+        await self._show(session, page, entry=entry)
+        await self._checkpoint(session, page)
+
+    async def _checkpoint(self, session, page):
+        """Save the state of a session in the store, so it can be resumed.
+        Pages without ID can't be found again : sessions displaying them are
+        not saved.
+
+        Args:
+            session (Session): Session of the member navigating the help.
+            page (Page): Page displayed.
+        """
+        if self.store is None:
+            return
+        if page.id is None:
+            await self.store.delete(session.id)
+            return
+
+        message = session.message
+        inputs = [m.content for m in session.prev_input]
+        await self.store.save(
+            Checkpoint(session.id, session.member.id, message.channel.id, message.id, page.id, inputs)
+        )
+
+    async def _run_callbacks(self, link, member, prev_input):
+        """Run the callbacks of a link taken by a member (see
+        `run_callbacks()`), with the timeout, fallback page and thread pool of
+        the help.
+
+        Args:
+            link (SessionLink): Link taken, bound to the session of the member.
+            member (Discord.Member): Member navigating the help.
+            prev_input (list of Discord.Message): Messages previously sent by
+                the member.
+        """
+        with self._timer("callbacks"):
+            timeouts = await run_callbacks(
+                link.callbacks,
+                link,
+                member,
+                prev_input,
+                self.callback_timeout,
+                self.callback_fallback,
+                self.callback_executor,
+            )
+        if timeouts and self.metrics is not None:
+            self.metrics.count("callback_timeouts_total", timeouts)
+
+    async def _prerender(self, page, member):
+        """Render in advance the child pages of a page, so they are cached
+        when the user picks one of them. At most `prerender` pages are
+        rendered, one at a time, giving back control to the event loop between
+        each page.
+
+        Errors are ignored : they will happen again (and be reported) if the
+        user picks the page.
+
+        Args:
+            page (Page): Page being displayed.
+            member (Discord.Member): Member who will see the pages.
+        """
+        budget = self.prerender
+        links = list(page.links)
+        if page.msg_link is not None:
+            links.append(page.msg_link)
+
+        for link in links:
+            for child in link.pages:
+                if budget <= 0:
+                    return
+                budget -= 1
+                try:
+                    with self._timer("prerender"):
+                        child = child.materialize()
+                        if self.prerender_content and child.content is not None:
+                            await child.content.get(member)
+                        self._message_kwargs(child)
+                except Exception:
+                    pass
+                await asyncio.sleep(0)
+
+    async def _dm_channel(self, member, priority=Priority.MESSAGE):
+        """Retrieve the DM channel of a member : from the cache, from the
+        member, or by creating it. Concurrent creations for the same member are
+        grouped into a single request.
+
+        Args:
+            member (Discord.Member): Member.
+            priority (Priority, optional): Priority of the creation of the
+                channel. Defaults to `Priority.MESSAGE`.
 
-            # Here the next page is valid. Clean current message and loop
-            await bot_message.delete()
-            current_link = next_link
+        Returns:
+            Discord.DMChannel: DM channel of the member.
+        """
+        channel = self.dm_channels.get(member.id)
+        if channel is not None:
+            return channel
+
+        channel = member.dm_channel
+        if channel is None:
+            future = self._dm_inflight.get(member.id)
+            if future is None:
+                future = self._request(priority, member.create_dm)
+                self._dm_inflight[member.id] = future
+                future.add_done_callback(lambda f: self._dm_inflight.pop(member.id, None))
+            channel = await asyncio.shield(future)
+        self.dm_channels.put(member.id, channel)
+        return channel
+
+    def _reuse_message(self):
+        """Check if the message should be reused from one page to another.
+
+        Components are always updated in place, when responding to the
+        interaction of the user.
+
+        Returns:
+            bool: `True` if the message should be reused.
+        """
+        return self.edit_in_place or self.controls != Controls.REACTIONS
+
+    def _request(self, priority, func, *args, channel=None, message=None, **kwargs):
+        """Send a request to Discord, through the scheduler if there is one.
+
+        Args:
+            priority (Priority): Priority of the request.
+            func (coroutine function): Function sending the request.
+            *args: Positional arguments given to `func`.
+            channel (int, optional): ID of the channel targeted by the request.
+                If not given, it's retrieved from `message`. Defaults to `None`.
+            message (Discord.Message, optional): Message targeted by the
+                request. Defaults to `None`.
+            **kwargs: Keywords arguments given to `func`.
+
+        Returns:
+            asyncio.Future: Future resolved with the result of the request.
+        """
+        func = self._instrumented(func)
+        if self.scheduler is None:
+            return asyncio.ensure_future(func(*args, **kwargs))
+
+        message_id = None
+        if message is not None:
+            message_id = message.id
+            channel = message.channel.id
+        return self.scheduler.submit(func, *args, channel=channel, priority=priority, message=message_id, **kwargs)
+
+    def _timer(self, phase):
+        """Measure the time spent in a phase of the session, with a `with`
+        statement.
+
+        Args:
+            phase (str): Name of the phase.
+
+        Returns:
+            context manager: Timer reporting to the metrics, or a context
+                manager doing nothing if there is no metrics.
+        """
+        if self.metrics is None:
+            return _NO_TIMER
+        return self.metrics.timer("phase_seconds", {"phase": phase})
+
+    def _instrumented(self, func):
+        """Wrap a function sending a request to Discord, so the request is
+        counted and timed.
+
+        Args:
+            func (coroutine function): Function sending the request.
+
+        Returns:
+            coroutine function: The wrapped function, or `func` itself if
+                there is no metrics.
+        """
+        metrics = self.metrics
+        if metrics is None:
+            return func
+
+        labels = {"call": getattr(func, "__name__", "unknown")}
+
+        async def instrumented(*args, **kwargs):
+            metrics.count("api_calls_total", labels=labels)
+            try:
+                with metrics.timer("api_call_seconds", labels):
+                    return await func(*args, **kwargs)
+            except Exception:
+                metrics.count("api_errors_total", labels=labels)
+                raise
+
+        return instrumented
+
+    async def _clear(self, session):
+        """Clean the session : cancel its pending futures and delete its
+        message. Errors happening when deleting the message (for example if it
+        was already deleted by the user) are ignored.
+
+        Args:
+            session (Session): Session to clean.
+        """
+        session.cancel_pending()
+
+        session.reactions = ()
+        if session.message is not None:
+            message, session.message = session.message, None
+            if self.scheduler is not None:
+                # No need to send what's still queued for this message
+                self.scheduler.discard(message.id)
+            if self.cluster is not None:
+                await self.cluster.release(message)
+            try:
+                await self._request(Priority.DELETE, message.delete, message=message)
+            except Exception:
+                pass
+
+    def _message_kwargs(self, page, controls=None, quit=True, prefix=""):
+        """Build the keywords arguments used to send or edit a message, so it
+        displays the given page.
+
+        Different page types are displayed differently. Both the content and
+        the embed are always given, so editing a message can switch from one
+        page type to the other. If the user navigates with components, the
+        view is given as well.
+
+        Args:
+            page (Page): Page to display.
+            controls (Controls, optional): Controls to display. Defaults to
+                `None` (the controls of the help).
+            quit (bool, optional): If `False`, the quit button is not
+                displayed. Defaults to `True`.
+            prefix (str, optional): Prefix of the custom IDs of the
+                components. Defaults to empty string.
+
+        Returns:
+            dict: Keywords arguments for `Messageable.send()` or
+                `Message.edit()`.
+        """
+        if page.type == PageType.MESSAGE:
+            kwargs = {"content": page.get_message(), "embed": None}
+        else:
+            kwargs = {"content": None, "embed": page.get_embed()}
+
+        controls = self.controls if controls is None else controls
+        if controls != Controls.REACTIONS:
+            kwargs["view"] = page.get_view(controls, self.quit_react if quit else None, prefix)
+        return kwargs
 
     async def _get_user_input(self, member, message, current_page):
         """Function retrieving the user input.
@@ -131,28 +1086,6 @@ class Help:
             message (Discord.Message): Message of the user, or None if the
                 correct input was a user reaction.
         """
-
-        def check_reaction(reaction, user):
-            return user == member
-
-        def check_message(m):
-            return m.author == member
-
-        task_react = asyncio.ensure_future(self.client.wait_for("reaction_add", check=check_reaction))
-        task_answer = asyncio.ensure_future(self.client.wait_for("message", check=check_message))
-        tasks = [task_react]  # Always wait for user reaction
-        if current_page.need_user_input():
-            tasks.append(task_answer)  # Sometimes need to expect input too
-
-        # Wait the actual user input
-        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-
-        # Depending on what the user did, return the right thing
-        if task_react in done:
-            # User reacted
-            reaction, _ = done.pop().result()
-            return reaction, None
-        else:
-            # User answered
-            msg = done.pop().result()
-            return None, msg
+        return await self.router.wait(
+            member, message, need_input=current_page.need_user_input(), accept_unreact=self.edit_in_place
+        )
@@ -18,7 +18,8 @@ class Link:
     the list is selected.
 
     Attributes:
-        pages (list of Page): List of pages associated to this link.
+        pages (list of Page or LazyPage): List of pages associated to this
+            link.
         description (str): Description of this link, to explain to user the
             effect of this link.
         callbacks (list): List of functions to call when taking this link.
@@ -57,10 +58,12 @@ class Link:
         So the path was updated (or not) to select the right page, and we should
         return the appropriate page.
 
+        If the page is a `LazyPage`, it's built if needed.
+
         Returns:
             Page: The page selected by callbacks (or default choice).
         """
-        return self.pages[self.path]
+        return self.pages[self.path].materialize()
 
 
 class ReactLink(Link):
@@ -68,6 +71,8 @@ class ReactLink(Link):
 
     Attributes:
         reaction (str): Reaction needed by this link to display the page.
+        label (str): Description of this link, without the reaction. Used
+            when the link is displayed as a button or a select option.
     """
 
     def __init__(self, reaction, pages, description=None, callbacks=[]):
@@ -86,6 +91,7 @@ class ReactLink(Link):
         """
         super(ReactLink, self).__init__(pages, description, callbacks)
         self.reaction = reaction
+        self.label = self.description
 
         # We need to update the description of this link to add the reaction
         if self.description is not None:
@@ -0,0 +1,466 @@
+"""Module containing the functions to load the help tree from a document
+(JSON, YAML or TOML), instead of building it with `Page.link()` calls.
+
+The document is compiled into flat tables (validated, with the parents, roots
+and default reactions resolved), which are then used to build the pages. The
+tables can be cached on disk, so the next start skips parsing and validation.
+
+A document looks like this (in JSON) :
+
+```json
+{
+    "root": "home",
+    "pages": {
+        "home": {
+            "msg": "Welcome to the help !",
+            "title": "Help",
+            "links": [
+                {"to": "commands", "description": "List of commands"},
+                {"to": "guild", "reaction": "😀", "description": "Guilds", "callbacks": "show_guilds"}
+            ]
+        },
+        "commands": {"msg": "Here are the commands...", "embed": false},
+        "guild": {"msg": ""}
+    }
+}
+```
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+
+import discord
+
+from discord_interactive.compiler import Tree, TreeError, _check_tree, _paused_gc
+from discord_interactive.link import MsgLink, ReactLink
+from discord_interactive.page import (
+    DEFAULT_LINK_REACTS,
+    DEFAULT_PARENT_REACT,
+    DEFAULT_QUIT_REACT,
+    DEFAULT_ROOT_REACT,
+    Page,
+)
+
+
+# Bump this when the format of the compiled tables changes, to invalidate the caches
+TABLES_VERSION = 2
+
+PAGE_KEYS = {"msg", "sep", "links_sep", "embed", "links", "parent", "parent_reaction", "root", "cacheable"}
+LINK_KEYS = {"to", "reaction", "description", "callbacks", "user_input", "is_parent", "parent_reaction"}
+EMBED_KEYS = set(inspect.signature(discord.Embed).parameters) - {"description"}
+
+
+def load_tree(path, callbacks=None, cache=None, fmt=None):
+    """Load a help tree from a file.
+
+    Args:
+        path (str): Path of the file describing the tree.
+        callbacks (dict, optional): Callbacks used by the links of the tree, by
+            name. Defaults to `None`.
+        cache (str, optional): Path of the file where the compiled tree is
+            cached. If the cache was made from the same document, the document
+            is not parsed nor validated again. Defaults to `None` (no cache).
+        fmt (str, optional): Format of the file : `json`, `yaml` or `toml`.
+            Defaults to `None` (guessed from the extension of the file).
+
+    Throws:
+        TreeError: The document is not valid.
+        ImportError: The library needed to parse the document is not
+            installed.
+
+    Returns:
+        Tree: The help tree.
+    """
+    with open(path, "rb") as f:
+        source = f.read()
+
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lstrip(".").lower()
+
+    digest = hashlib.sha256(source).hexdigest()
+    with _paused_gc():
+        tables = _read_cache(cache, digest) if cache is not None else None
+        if tables is not None:
+            # Already validated when the cache was written
+            return _build(tables, callbacks or {})
+
+        tables = _compile(_parse(source, fmt))
+        tree = _build(tables, callbacks or {})
+        _check_tree(tree.root, DEFAULT_QUIT_REACT)
+        if cache is not None:
+            _write_cache(cache, digest, tables)
+        return tree
+
+
+def compile_tree(document, callbacks=None):
+    """Compile a document (already parsed) into a help tree.
+
+    Args:
+        document (dict): Document describing the tree.
+        callbacks (dict, optional): Callbacks used by the links of the tree, by
+            name. Defaults to `None`.
+
+    Throws:
+        TreeError: The document is not valid.
+
+    Returns:
+        Tree: The help tree.
+    """
+    with _paused_gc():
+        tree = _build(_compile(document), callbacks or {})
+        _check_tree(tree.root, DEFAULT_QUIT_REACT)
+        return tree
+
+
+################################ Private #######################################
+
+
+def _parse(source, fmt):
+    """Private function.
+
+    Parse a document.
+
+    Args:
+        source (bytes): Content of the document.
+        fmt (str): Format of the document : `json`, `yaml` or `toml`.
+
+    Throws:
+        TreeError: The format is unknown, or the document can't be parsed.
+
+    Returns:
+        dict: Parsed document.
+    """
+    try:
+        if fmt == "json":
+            return json.loads(source.decode("utf-8"))
+        elif fmt in ("yaml", "yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Loading a YAML document requires PyYAML : pip install discord_interactive[yaml]")
+            return yaml.safe_load(source)
+        elif fmt == "toml":
+            try:
+                import tomllib
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise ImportError("Loading a TOML document requires tomli : pip install discord_interactive[toml]")
+            return tomllib.loads(source.decode("utf-8"))
+    except ImportError:
+        raise
+    except Exception as e:
+        raise TreeError("Can't parse the {} document : {}".format(fmt, e)) from e
+
+    raise TreeError("Unknown format '{}', expected json, yaml or toml".format(fmt))
+
+
+def _compile(document):  # noqa: C901
+    """Private function.
+
+    Validate the structure of a document, and compile it into flat tables,
+    where everything is resolved (default reactions, parents, roots). The
+    reactions are checked once the pages are built, by `validate_tree()`.
+
+    The tables only contain basic types, so they are fast to pickle. Each page
+    is a tuple `(id, msg, sep, links_sep, embed, embed_kwargs, links,
+    msg_link, parent, root, cacheable)`, where :
+
+    * `embed_kwargs` is a tuple of `(key, value)`.
+    * `links` is a tuple of `(reaction, targets, description, callbacks)`.
+    * `msg_link` is `(targets, description, callbacks)`, or `None`.
+    * `parent` and `root` are `(reaction, target)`, or `None`.
+
+    Targets are IDs of pages, and callbacks are names.
+
+    Args:
+        document (dict): Document describing the tree.
+
+    Throws:
+        TreeError: The document is not valid.
+
+    Returns:
+        tuple: `(version, root_id, pages)`.
+    """
+    if not isinstance(document, dict):
+        raise TreeError("The document should be a mapping, with the keys `root` and `pages`")
+    pages = document.get("pages")
+    if not isinstance(pages, dict) or not pages:
+        raise TreeError("The document should contain the mapping `pages`, with at least one page")
+    root_id = document.get("root", next(iter(pages)))
+    if root_id not in pages:
+        raise TreeError("The root page '{}' does not exist".format(root_id))
+    root_reaction = document.get("root_reaction", DEFAULT_ROOT_REACT)
+
+    records = {}
+    parents = {}
+    for page_id, spec in pages.items():
+        where = "page '{}'".format(page_id)
+        if not isinstance(spec, dict):
+            raise TreeError("The {} should be a mapping".format(where))
+        unknown = set(spec) - PAGE_KEYS - EMBED_KEYS
+        if unknown:
+            raise TreeError("Unknown keys in {} : {}".format(where, ", ".join(sorted(unknown))))
+
+        links, msg_link = [], None
+        for i, link in enumerate(spec.get("links", [])):
+            link_where = "link {} of {}".format(i, where)
+            if not isinstance(link, dict):
+                raise TreeError("The {} should be a mapping".format(link_where))
+            unknown = set(link) - LINK_KEYS
+            if unknown:
+                raise TreeError("Unknown keys in {} : {}".format(link_where, ", ".join(sorted(unknown))))
+
+            targets = _targets(link.get("to"), pages, link_where)
+            description = link.get("description")
+            callbacks = tuple(_as_list(link.get("callbacks", [])))
+
+            if link.get("user_input", False):
+                msg_link = (targets, description, callbacks)
+            else:
+                reaction = link.get("reaction")
+                if reaction is None:
+                    if len(links) >= len(DEFAULT_LINK_REACTS):
+                        raise TreeError("Too many links without reaction in {}".format(where))
+                    reaction = DEFAULT_LINK_REACTS[len(links)]
+                links.append((reaction, targets, description, callbacks))
+
+            if link.get("is_parent", True):
+                parent_reaction = link.get("parent_reaction", DEFAULT_PARENT_REACT)
+                if isinstance(parent_reaction, list):
+                    if len(parent_reaction) != len(targets):
+                        raise TreeError(
+                            "The {} has {} targets, but {} parent reactions".format(
+                                link_where, len(targets), len(parent_reaction)
+                            )
+                        )
+                else:
+                    parent_reaction = [parent_reaction] * len(targets)
+                for target, reaction in zip(targets, parent_reaction):
+                    parents[target] = (reaction, page_id)
+
+        embed_kwargs = tuple((k, _embed_value(k, v, where)) for k, v in spec.items() if k in EMBED_KEYS)
+        records[page_id] = [
+            page_id,
+            _string(spec, "msg", "", where),
+            _string(spec, "sep", "\n\n", where),
+            _string(spec, "links_sep", "\n", where),
+            bool(spec.get("embed", True)),
+            embed_kwargs,
+            tuple(links),
+            msg_link,
+            None,
+            None,
+            bool(spec.get("cacheable", False)),
+        ]
+
+    for page_id, spec in pages.items():
+        record = records[page_id]
+        if "parent" in spec:
+            # An explicit parent overrides the one of the links
+            parent = spec["parent"]
+            if parent is not None:
+                parent_where = "parent of page '{}'".format(page_id)
+                targets = _targets(parent, pages, parent_where)
+                if len(targets) > 1:
+                    raise TreeError("The {} should be a single page".format(parent_where))
+                parents[page_id] = (spec.get("parent_reaction", DEFAULT_PARENT_REACT), targets[0])
+            else:
+                parents.pop(page_id, None)
+        record[8] = parents.get(page_id)
+        if page_id != root_id and spec.get("root", True):
+            record[9] = (root_reaction, root_id)
+
+    return (TABLES_VERSION, root_id, tuple(tuple(record) for record in records.values()))
+
+
+def _build(tables, callbacks):
+    """Private function.
+
+    Build the pages of the tree from the compiled tables, and freeze them.
+
+    Args:
+        tables (tuple): Compiled tables, see `_compile()`.
+        callbacks (dict): Callbacks used by the links, by name.
+
+    Throws:
+        TreeError: A callback used by a link is not given.
+
+    Returns:
+        Tree: The help tree.
+    """
+    _, root_id, records = tables
+
+    pages = {}
+    for page_id, msg, sep, links_sep, embed, embed_kwargs, _, _, _, _, cacheable in records:
+        page = Page(msg, sep=sep, links_sep=links_sep, embed=embed, cacheable=cacheable, **dict(embed_kwargs))
+        page.id = page_id
+        pages[page_id] = page
+
+    def resolve(names, where):
+        try:
+            return [callbacks[name] for name in names]
+        except KeyError as e:
+            raise TreeError("Unknown callback {} in {}".format(e, where)) from None
+
+    for page_id, _, _, _, _, _, links, msg_link, parent, root, _ in records:
+        page = pages[page_id]
+        for reaction, targets, description, names in links:
+            funcs = resolve(names, "page '{}'".format(page_id))
+            page.links.append(ReactLink(reaction, [pages[t] for t in targets], description, funcs))
+        if msg_link is not None:
+            targets, description, names = msg_link
+            funcs = resolve(names, "page '{}'".format(page_id))
+            page.msg_link = MsgLink([pages[t] for t in targets], description, funcs)
+        if parent is not None:
+            page.parent = ReactLink(parent[0], pages[parent[1]])
+        if root is not None:
+            page.root = ReactLink(root[0], pages[root[1]])
+
+    for page in pages.values():
+        page.freeze()
+
+    return Tree(pages[root_id], pages, tables)
+
+
+def _targets(value, pages, where):
+    """Private function.
+
+    Normalize and check the target pages of a link.
+
+    Args:
+        value (str or list of str): ID of the target page, or list of IDs.
+        pages (dict): Pages of the document, by ID.
+        where (str): Description of the link, for the error messages.
+
+    Throws:
+        TreeError: A target page does not exist.
+
+    Returns:
+        tuple of str: IDs of the target pages.
+    """
+    targets = tuple(_as_list(value))
+    if not targets:
+        raise TreeError("The {} has no target page".format(where))
+    for target in targets:
+        if target not in pages:
+            raise TreeError("The {} targets the page '{}', which does not exist".format(where, target))
+    return targets
+
+
+def _string(spec, key, default, where):
+    """Private function.
+
+    Get a text of a page, and check it's a string.
+
+    Args:
+        spec (dict): Specification of the page.
+        key (str): Key of the text.
+        default (str): Default text, if the key is missing.
+        where (str): Description of the page, for the error messages.
+
+    Throws:
+        TreeError: The text is not a string.
+
+    Returns:
+        str: The text.
+    """
+    value = spec.get(key, default)
+    if not isinstance(value, str):
+        raise TreeError("The `{}` of {} should be a string, not {!r}".format(key, where, value))
+    return value
+
+
+def _as_list(value):
+    """Private function.
+
+    Normalize a value that can be a single element or a list.
+
+    Args:
+        value: Single element, list of elements, or `None`.
+
+    Returns:
+        list: List of elements.
+    """
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _embed_value(key, value, where):
+    """Private function.
+
+    Convert a value of the document to what the `Embed` expects. Colors can be
+    written as strings, like `#e67e22` or `0xe67e22`.
+
+    Args:
+        key (str): Keyword argument of the `Embed`.
+        value: Value from the document.
+        where (str): Description of the page, for the error messages.
+
+    Throws:
+        TreeError: The color is not valid.
+
+    Returns:
+        Value to give to the `Embed`.
+    """
+    if key in ("color", "colour") and isinstance(value, str):
+        try:
+            return int(value.lstrip("#"), 16) if value.startswith("#") else int(value, 0)
+        except ValueError:
+            raise TreeError("The {} of the {} is not a valid color : '{}'".format(key, where, value)) from None
+    return value
+
+
+def _read_cache(path, digest):
+    """Private function.
+
+    Read the compiled tables from the cache.
+
+    Args:
+        path (str): Path of the cache file.
+        digest (str): Hash of the document the tables should be made from.
+
+    Returns:
+        tuple: Compiled tables, or `None` if the cache is missing, outdated or
+            unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            cached_digest, tables = pickle.load(f)
+    except Exception:
+        return None
+
+    if cached_digest != digest or not tables or tables[0] != TABLES_VERSION:
+        return None
+    return tables
+
+
+def _write_cache(path, digest, tables):
+    """Private function.
+
+    Write the compiled tables to the cache. The file is replaced atomically,
+    so concurrent workers never read a partial cache. Errors are ignored, the
+    cache is only an optimization.
+
+    Args:
+        path (str): Path of the cache file.
+        digest (str): Hash of the document the tables are made from.
+        tables (tuple): Compiled tables.
+    """
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((digest, tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
@@ -0,0 +1,336 @@
+"""Module containing the instrumentation of the `Help`. The `Metrics` class
+defines the interface used by the `Help` to report what it's doing (timings
+of each phase, API calls, live sessions). Subclass it to plug the `Help` into
+your own monitoring or tracing system, or use `InMemoryMetrics` to aggregate
+the measures in memory, and `prometheus_text()` to export them.
+"""
+
+import bisect
+import time
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metrics:
+    """Interface receiving the measures of the `Help`. All methods do nothing
+    by default, subclass it and override what you need.
+
+    The `Help` reports the following measures :
+
+    * `phase_seconds` (timing) : Time spent in each phase of a session, with
+      the label `phase` : `callbacks`, `prepare`, `render`, `send`,
+      `reactions`, `wait`, `delete` or `prerender`.
+    * `api_calls_total` (counter) : Requests sent to Discord, with the label
+      `call` (`send`, `edit`, `add_reaction`, ...).
+    * `api_errors_total` (counter) : Requests that failed, with the label
+      `call`.
+    * `api_call_seconds` (timing) : Time taken by each request, with the label
+      `call`.
+    * `sessions_total` (counter) : Sessions opened.
+    * `sessions_active` (gauge) : Sessions currently open.
+    * `sessions_queued` (gauge) : Members waiting for a session.
+    * `sessions_rejected_total` (counter) : Members turned away because the
+      queue was full.
+    * `sessions_reattached_total` (counter) : Calls to `display()` reattached
+      to a live session.
+    * `sessions_timed_out_total` (counter) : Sessions closed because the
+      user didn't answer before the timeout.
+    * `pages_shown_total` (counter) : Pages displayed.
+    * `callback_timeouts_total` (counter) : Callbacks which took longer than
+      their timeout.
+    """
+
+    def count(self, name, value=1, labels=None):
+        """Increment a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (float, optional): Value to add. Defaults to `1`.
+            labels (dict, optional): Labels of the measure. Defaults to `None`.
+        """
+
+    def gauge(self, name, value, labels=None):
+        """Set the current value of a gauge.
+
+        Args:
+            name (str): Name of the gauge.
+            value (float): Current value.
+            labels (dict, optional): Labels of the measure. Defaults to `None`.
+        """
+
+    def observe(self, name, seconds, labels=None):
+        """Record a timing.
+
+        Args:
+            name (str): Name of the timing.
+            seconds (float): Duration measured, in seconds.
+            labels (dict, optional): Labels of the measure. Defaults to `None`.
+        """
+
+    def timer(self, name, labels=None):
+        """Measure the time spent in a block of code, with a `with` statement.
+        The timing is recorded with `observe()` when the block exits, even if
+        it raised an exception.
+
+        Args:
+            name (str): Name of the timing.
+            labels (dict, optional): Labels of the measure. Defaults to `None`.
+
+        Returns:
+            Timer: Context manager measuring the time spent in the block.
+        """
+        return Timer(self, name, labels)
+
+
+class Timer:
+    """Context manager measuring the time spent in a block of code, and
+    reporting it to a `Metrics`.
+
+    Attributes:
+        metrics (Metrics): Where to report the timing.
+        name (str): Name of the timing.
+        labels (dict): Labels of the measure.
+    """
+
+    def __init__(self, metrics, name, labels=None):
+        """Timer constructor.
+
+        Args:
+            metrics (Metrics): Where to report the timing.
+            name (str): Name of the timing.
+            labels (dict, optional): Labels of the measure. Defaults to `None`.
+        """
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        """Start the timer."""
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop the timer, and report the time spent."""
+        self.metrics.observe(self.name, time.perf_counter() - self._start, self.labels)
+        return False
+
+
+class Histogram:
+    """Class aggregating the timings of a measure.
+
+    Attributes:
+        buckets (tuple of float): Upper bounds of the buckets, in seconds.
+        counts (list of int): Number of timings in each bucket (not
+            cumulative). The last one counts the timings above all bounds.
+        count (int): Number of timings recorded.
+        sum (float): Sum of the timings recorded.
+        min (float): Smallest timing recorded, or `None`.
+        max (float): Largest timing recorded, or `None`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Histogram constructor.
+
+        Args:
+            buckets (tuple of float, optional): Upper bounds of the buckets, in
+                seconds. Defaults to `DEFAULT_BUCKETS`.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Record a timing.
+
+        Args:
+            value (float): Timing to record, in seconds.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def mean(self):
+        """Compute the average timing.
+
+        Returns:
+            float: Average timing, or `None` if nothing was recorded.
+        """
+        return self.sum / self.count if self.count else None
+
+
+class InMemoryMetrics(Metrics):
+    """Class aggregating the measures of the `Help` in memory.
+
+    Measures are identified by their name and their labels.
+
+    Attributes:
+        counters (dict): Value of each counter.
+        gauges (dict): Value of each gauge.
+        histograms (dict): `Histogram` of each timing.
+        buckets (tuple of float): Upper bounds of the buckets of the
+            histograms, in seconds.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """InMemoryMetrics constructor.
+
+        Args:
+            buckets (tuple of float, optional): Upper bounds of the buckets of
+                the histograms, in seconds. Defaults to `DEFAULT_BUCKETS`.
+        """
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def count(self, name, value=1, labels=None):
+        """See `Metrics.count()`."""
+        key = _key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, labels=None):
+        """See `Metrics.gauge()`."""
+        self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, seconds, labels=None):
+        """See `Metrics.observe()`."""
+        key = _key(name, labels)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(self.buckets)
+        self.histograms[key].add(seconds)
+
+    def get(self, name, **labels):
+        """Retrieve the value of a counter or a gauge, or the histogram of a
+        timing.
+
+        Args:
+            name (str): Name of the measure.
+            **labels: Labels of the measure.
+
+        Returns:
+            float or Histogram: Value of the measure, or `None` if it was never
+                recorded.
+        """
+        key = _key(name, labels)
+        for measures in (self.counters, self.gauges, self.histograms):
+            if key in measures:
+                return measures[key]
+        return None
+
+    def reset(self):
+        """Forget all measures."""
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+
+
+def prometheus_text(metrics, namespace="discord_help"):
+    """Export the measures of an `InMemoryMetrics` in the text format of
+    Prometheus, so they can be served on a `/metrics` endpoint.
+
+    Counters and gauges are exported as is, timings are exported as
+    histograms.
+
+    Args:
+        metrics (InMemoryMetrics): Measures to export.
+        namespace (str, optional): Prefix of the names of the metrics. Defaults
+            to `discord_help`.
+
+    Returns:
+        str: Measures, in the Prometheus text format.
+    """
+    lines = []
+    prefix = namespace + "_" if namespace else ""
+
+    for kind, measures in (("counter", metrics.counters), ("gauge", metrics.gauges)):
+        for name, series in _by_name(measures):
+            lines.append("# TYPE {}{} {}".format(prefix, name, kind))
+            for labels, value in series:
+                lines.append("{}{}{} {}".format(prefix, name, _format_labels(labels), _format_value(value)))
+
+    for name, series in _by_name(metrics.histograms):
+        lines.append("# TYPE {}{} histogram".format(prefix, name))
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                bucket_labels = labels + (("le", _format_value(bound)),)
+                lines.append("{}{}_bucket{} {}".format(prefix, name, _format_labels(bucket_labels), cumulative))
+            lines.append("{}{}_sum{} {}".format(prefix, name, _format_labels(labels), _format_value(histogram.sum)))
+            lines.append("{}{}_count{} {}".format(prefix, name, _format_labels(labels), histogram.count))
+
+    return "\n".join(lines) + "\n"
+
+
+def _key(name, labels):
+    """Private function.
+
+    Build the key identifying a measure.
+
+    Args:
+        name (str): Name of the measure.
+        labels (dict): Labels of the measure, or `None`.
+
+    Returns:
+        tuple: Key of the measure.
+    """
+    if not labels:
+        return (name, ())
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+def _by_name(measures):
+    """Private function.
+
+    Group the measures by name, sorted.
+
+    Args:
+        measures (dict): Measures, by key.
+
+    Returns:
+        list: List of `(name, [(labels, value), ...])`.
+    """
+    groups = {}
+    for (name, labels), value in sorted(measures.items(), key=lambda item: item[0]):
+        groups.setdefault(name, []).append((labels, value))
+    return list(groups.items())
+
+
+def _format_labels(labels):
+    """Private function.
+
+    Format labels for the Prometheus text format.
+
+    Args:
+        labels (tuple): Labels, as a tuple of `(name, value)`.
+
+    Returns:
+        str: Formatted labels.
+    """
+    if not labels:
+        return ""
+    escaped = ((k, v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for k, v in labels)
+    return "{" + ",".join('{}="{}"'.format(k, v) for k, v in escaped) + "}"
+
+
+def _format_value(value):
+    """Private function.
+
+    Format a value for the Prometheus text format.
+
+    Args:
+        value (float): Value to format.
+
+    Returns:
+        str: Formatted value.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
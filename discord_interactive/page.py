@@ -2,16 +2,35 @@
 class to define the pages of your interactive help for your Discord bot.
 """
 
+import inspect
 from enum import Enum, auto
+from functools import partial
+from types import MappingProxyType
 
 import discord
 
+from discord_interactive.cache import LRUCache
 from discord_interactive.link import MsgLink, ReactLink
 
 
+DEFAULT_QUIT_REACT = "❌"
 DEFAULT_PARENT_REACT = "🔙"
 DEFAULT_ROOT_REACT = "🔝"
 DEFAULT_LINK_REACTS = ["1⃣", "2⃣", "3⃣", "4⃣", "5⃣", "6⃣", "7⃣", "8⃣", "9⃣"]
+DEFAULT_PREV_REACT = "◀"
+DEFAULT_NEXT_REACT = "▶"
+
+# Limits of Discord components
+MAX_BUTTONS_PER_ROW = 5
+MAX_COMPONENTS = 25
+MAX_LABEL_LENGTH = 80
+
+# Pages built by the `LazyPage` without their own cache are kept here
+DEFAULT_LAZY_CACHE = LRUCache(maxsize=1024)
+
+
+class FrozenPageError(AttributeError):
+    """Exception raised when trying to modify a page that was frozen."""
 
 
 class PageType(Enum):
@@ -23,6 +42,17 @@ class PageType(Enum):
     EMBED = auto()
 
 
+class Controls(Enum):
+    """Existing type of controls. The controls define how the user navigates
+    from one page to another : by reacting to the message, by clicking buttons,
+    or by choosing an option in a select menu.
+    """
+
+    REACTIONS = auto()
+    BUTTONS = auto()
+    SELECT = auto()
+
+
 class Page:
     """Class representing a page of the help.
 
@@ -47,9 +77,15 @@ class Page:
         embed_kwargs (dict): Others keywords arguments, used to initialize
             the `Embed` for display. Only used if the type of the page is
             `PageType.EMBED`.
+        id (str): Identifier of the page, if it was loaded from a file.
+            `None` otherwise.
+        content (ContentProvider): Provider of the dynamic content of the
+            page, or `None` if the page is static.
+        cacheable (bool): If `True`, going back to this page (with the parent
+            link) displays it as it was, without running its callbacks again.
     """
 
-    def __init__(self, msg="", sep="\n\n", links_sep="\n", embed=True, **embed_kwargs):
+    def __init__(self, msg="", sep="\n\n", links_sep="\n", embed=True, content=None, cacheable=False, **embed_kwargs):
         r"""Page constructor.
 
         Constructor of the class Page. Create a Page with a message.
@@ -65,19 +101,115 @@ class Page:
             embed (bool, optional): If set to `True`, create a page of type
                 `PageType.EMBED`, if `False` the page type is
                 `PageType.MESSAGE`. Defaults to `True`.
+            content (ContentProvider, optional): Provider of the dynamic
+                content of the page. The content is fetched right before the
+                page is displayed. Defaults to `None`.
+            cacheable (bool, optional): If `True`, going back to this page
+                (with the parent link) displays it as the user saw it, without
+                running the callbacks of the link and rendering it again. Only
+                set it if the page doesn't need to be refreshed. Defaults to
+                `False`.
             embed_kwargs (dict): Others keywords arguments, used to initialize
                 the `Embed` for display. Only used if the type of the page is
                 `PageType.EMBED`.
         """
+        self._version = 0
+        self._observers = []
+        self._render_cache = {}
+        self._links_index = None
+        self._reactions = ()
         self.msg = msg
         self.links = []
         self.msg_link = None
-        self.parent = None
-        self.root = None
+        self._parent = None
+        self._root = None
         self.sep = sep
         self.links_sep = links_sep
         self.type = PageType.EMBED if embed else PageType.MESSAGE
         self.embed_kwargs = embed_kwargs
+        self.content = content
+        self.cacheable = cacheable
+        self.id = None
+
+    @property
+    def msg(self):
+        """Message to display to the user when displaying the page."""
+        return self._msg
+
+    @msg.setter
+    def msg(self, msg):
+        self._msg = msg
+        self._changed()
+
+    @property
+    def sep(self):
+        """String used to separate the message and the links description."""
+        return self._sep
+
+    @sep.setter
+    def sep(self, sep):
+        self._sep = sep
+        self._changed()
+
+    @property
+    def links_sep(self):
+        """String used to separate the links description."""
+        return self._links_sep
+
+    @links_sep.setter
+    def links_sep(self, links_sep):
+        self._links_sep = links_sep
+        self._changed()
+
+    @property
+    def links(self):
+        """Links of the page, used with a reaction (list of ReactLink)."""
+        return self._links
+
+    @links.setter
+    def links(self, links):
+        self._links = _TrackedList(links, on_change=self._changed)
+        self._changed()
+
+    @property
+    def msg_link(self):
+        """Link taken when the user sends a message (MsgLink), or `None`."""
+        return self._msg_link
+
+    @msg_link.setter
+    def msg_link(self, link):
+        self._msg_link = link
+        self._changed()
+
+    @property
+    def embed_kwargs(self):
+        """Others keywords arguments, used to initialize the `Embed`."""
+        return self._embed_kwargs
+
+    @embed_kwargs.setter
+    def embed_kwargs(self, embed_kwargs):
+        self._embed_kwargs = _TrackedDict(embed_kwargs, on_change=self._changed)
+        self._changed()
+
+    @property
+    def parent(self):
+        """Link to the parent page."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, link):
+        self._parent = link
+        self._changed()
+
+    @property
+    def root(self):
+        """Link to the root page."""
+        return self._root
+
+    @root.setter
+    def root(self, link):
+        self._root = link
+        self._changed()
 
     ####################### Construction of the Tree ###########################
 
@@ -119,6 +251,7 @@ class Page:
                 default reaction, this Exception will be thrown.
             ValueError: The number of parent reaction given does not correspond
                 to the number of child pages.
+            FrozenPageError: The page is frozen.
         """
         # Create the appropriate link
         if user_input:  # Create a MsgLink
@@ -216,6 +349,50 @@ class Page:
             # Then associate this link to the page
             p.root = r_link
 
+    def freeze(self):
+        """Freeze the page : its content and its links can't be modified
+        anymore, and trying to do so raises a `FrozenPageError`.
+
+        Callbacks can still customize a frozen page, because the changes they
+        make only affect the current session.
+        """
+        if isinstance(self, _Frozen):
+            return
+
+        # Build the links index now, it can't be built once frozen
+        self._index()
+        self._links = tuple(self._links)
+        self._embed_kwargs = MappingProxyType(dict(self._embed_kwargs))
+        self.__class__ = _frozen_class(type(self))
+
+    def add_observer(self, observer):
+        """Register a function called whenever the page changes (its content
+        or its links). Changes made by callbacks for a single session are not
+        notified.
+
+        Args:
+            observer (function): Function called with the page as argument.
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        """Unregister a function registered with `add_observer()`.
+
+        Args:
+            observer (function): Function to unregister.
+        """
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def materialize(self):
+        """Retrieve the page to display. A `Page` is always ready, so it
+        returns itself. See `LazyPage.materialize()`.
+
+        Returns:
+            Page: This page.
+        """
+        return self
+
     ######################## Display of the Tree ###############################
 
     def get_message(self):
@@ -225,15 +402,12 @@ class Page:
         describing each Link of the Page.
         This method simply construct the string to send to the channel.
 
+        The content is cached, and built again only if the page changed.
+
         Returns:
             str: Content to display to user.
         """
-        content = self.msg
-        content += self.sep
-        content += self.links_sep.join([link.description for link in self.links if link.description is not None])
-        if self.msg_link is not None and self.msg_link.description is not None:
-            content += self.links_sep + self.msg_link.description
-        return content
+        return self._cached("message", self._build_message)
 
     def get_embed(self):
         """This method is called by the Help if the page is a `PageType.EMBED`.
@@ -241,20 +415,73 @@ class Page:
         This will display the main message of the Page, as well as the message
         describing each Link of the Page.
 
+        The `Embed` is cached, and built again only if the page changed. The
+        same object is returned each time : copy it before modifying it.
+
         Returns:
             Embed: Embed to display to user.
         """
-        return discord.Embed(description=self.get_message(), **self.embed_kwargs)
+        description = self.get_message()
+        return self._cached("embed", lambda: discord.Embed(description=description, **self.embed_kwargs), description)
+
+    def get_view(self, controls, quit_react, prefix=""):
+        """This method is called by the Help if the controls are not
+        `Controls.REACTIONS`. It returns a `View`, containing the components
+        the user can use to interact with the help.
+
+        Each `ReactLink` (including the parent and the root) is displayed as a
+        button (or an option of the select menu), identified by its reaction.
+        The quit button is always displayed as a button, unless `quit_react`
+        is `None`.
+
+        The returned view is already stopped : it's only used to render the
+        components, and the interactions are handled by the Help. Like the
+        `Embed`, it's cached and built again only if the page changed.
+
+        Args:
+            controls (Controls): Type of controls to display.
+            quit_react (str): Reaction used to leave the help system, or `None`
+                to not display the quit button.
+            prefix (str, optional): Prefix of the custom IDs of the
+                components. Defaults to empty string.
+
+        Returns:
+            View: View to display to user.
+        """
+        return self._cached(
+            ("view", controls, quit_react, prefix), lambda: self._build_view(controls, quit_react, prefix)
+        )
 
     def reactions(self):
         """This method is called by the Help, to retrieve the list of reactions
         that the user can use to interact with the help.
 
         Returns:
-            list of str: List of reactions (str) that the user can use for this
-                page.
+            tuple of str: Reactions (str) that the user can use for this page.
+        """
+        self._index()
+        return self._reactions
+
+    async def prepare(self, member):
+        """This method is called by the Help right before displaying the page
+        (after the callbacks). If the page has a content provider, it fetches
+        the content and updates the page with it.
+
+        When called by the Help, the page is bound to the session, so the
+        content only affects the current session.
+
+        Args:
+            member (Discord.Member): Member who will see the page.
         """
-        return [link.reaction for link in self._all_links()]
+        if self.content is None:
+            return
+
+        content = await self.content.get(member)
+        if isinstance(content, dict):
+            for name, value in content.items():
+                setattr(self, name, value)
+        else:
+            self.msg = content
 
     def need_user_input(self):
         """Method to know if the Help display needs to wait for the user to
@@ -286,25 +513,585 @@ class Page:
         if reaction is None:
             return self.msg_link
 
-        next_link = None
-        for link in self._all_links():
-            if link.reaction == reaction:
-                next_link = link
-        return next_link
+        return self._index().get(reaction)
+
+    ############################## Private #####################################
+
+    def _build_message(self):
+        """Private function.
+
+        Build the content of the page, see `get_message()`.
+
+        Returns:
+            str: Content to display to user.
+        """
+        content = self.msg
+        content += self.sep
+        content += self.links_sep.join([link.description for link in self.links if link.description is not None])
+        if self.msg_link is not None and self.msg_link.description is not None:
+            content += self.links_sep + self.msg_link.description
+        return content
+
+    def _build_view(self, controls, quit_react, prefix=""):
+        """Private function.
+
+        Build the view of the page, see `get_view()`.
+
+        Args:
+            controls (Controls): Type of controls to display.
+            quit_react (str): Reaction used to leave the help system, or `None`.
+            prefix (str, optional): Prefix of the custom IDs of the
+                components. Defaults to empty string.
+
+        Returns:
+            View: View to display to user.
+        """
+        view = discord.ui.View(timeout=None)
+        links = list(self._index().values())[: MAX_COMPONENTS - 1]
+
+        if controls == Controls.SELECT:
+            if links:
+                options = [
+                    discord.SelectOption(
+                        label=_label(link.label, link.reaction), value=link.reaction, emoji=link.reaction
+                    )
+                    for link in links
+                ]
+                view.add_item(discord.ui.Select(custom_id=prefix + "select", options=options, row=0))
+            if quit_react is not None:
+                view.add_item(
+                    discord.ui.Button(
+                        custom_id=prefix + quit_react, emoji=quit_react, style=discord.ButtonStyle.danger
+                    )
+                )
+        else:
+            for i, link in enumerate(links):
+                label = _label(link.label, None)
+                view.add_item(
+                    discord.ui.Button(
+                        custom_id=prefix + link.reaction,
+                        emoji=link.reaction,
+                        label=label,
+                        row=i // MAX_BUTTONS_PER_ROW,
+                    )
+                )
+            if quit_react is not None:
+                view.add_item(
+                    discord.ui.Button(
+                        custom_id=prefix + quit_react,
+                        emoji=quit_react,
+                        style=discord.ButtonStyle.danger,
+                        row=len(links) // MAX_BUTTONS_PER_ROW,
+                    )
+                )
+
+        view.stop()
+        return view
+
+    def _changed(self):
+        """Private function.
+
+        Called whenever the page changes : bump the version of the page, so
+        the cached renders and the links index are built again.
+        """
+        self._version += 1
+        self._links_index = None
+        for observer in self._observers:
+            observer(self)
+
+    def _cached(self, key, build, *deps):
+        """Private function.
+
+        Retrieve a render of the page from the cache, or build it if the page
+        changed since it was cached.
+
+        Args:
+            key (hashable): Key of the render in the cache.
+            build (function): Function building the render.
+            *deps: Other values the render depends on. The cached render is
+                built again if they change.
+
+        Returns:
+            Cached render.
+        """
+        token = (self._version,) + deps
+        cached = self._render_cache.get(key)
+        if cached is not None and cached[0] == token:
+            return cached[1]
+
+        value = build()
+        self._render_cache[key] = (token, value)
+        return value
+
+    def _index(self):
+        """Private function.
+
+        Return the mapping from reaction to ReactLink for this page (links,
+        then parent, then root). If several links use the same reaction, the
+        last one wins.
+
+        The mapping is built once, and rebuilt only when the links of the page
+        change.
+
+        Returns:
+            dict: Mapping from reaction (str) to ReactLink.
+        """
+        if self._links_index is None:
+            index = self._build_index()
+            self._links_index = index
+            self._reactions = tuple(index)
+        return self._links_index
+
+    def _build_index(self):
+        """Private function.
+
+        Build the mapping from reaction to ReactLink, without caching it.
+
+        Returns:
+            dict: Mapping from reaction (str) to ReactLink.
+        """
+        index = {link.reaction: link for link in self.links}
+        for link in (self.parent, self.root):
+            if link is not None:
+                index[link.reaction] = link
+        return index
+
+
+class LazyPage:
+    """Class representing a page that is built only when a user navigates to
+    it. It can be used anywhere a `Page` is expected as the target of a link.
+
+    The page is built by calling the `provider`, which can also build a whole
+    subtree (the pages linked from the page it returns). Pages built are kept
+    in a bounded LRU cache : branches not visited for a while are forgotten,
+    and built again on the next visit.
+
+    The parent and root links given to a `LazyPage` (for example with
+    `parent_of()` or `root_of()`) are given to the page when it's built. The
+    root link is also given to the pages of its subtree without root.
+
+    Attributes:
+        provider (function): Function without arguments, returning the `Page`.
+        cache (LRUCache): Cache keeping the page once built.
+        parent (Link): Link to the parent page, given to the page when built.
+        root (Link): Link to the root page, given to the page when built.
+    """
+
+    def __init__(self, provider, cache=None):
+        """LazyPage constructor.
+
+        Args:
+            provider (function): Function without arguments, returning the
+                `Page` (and building its subtree if needed).
+            cache (LRUCache, optional): Cache keeping the page once built.
+                Defaults to `None` (use `DEFAULT_LAZY_CACHE`, shared by all
+                lazy pages).
+        """
+        self.provider = provider
+        self.cache = cache if cache is not None else DEFAULT_LAZY_CACHE
+        self.parent = None
+        self.root = None
+
+    def materialize(self):
+        """Retrieve the page, building it if it's not in the cache.
+
+        Returns:
+            Page: The page built by the provider.
+        """
+        page = self.cache.get(self)
+        if page is None:
+            page = self.provider()
+            if self.parent is not None and page.parent is None:
+                page.parent = self.parent
+            if self.root is not None:
+                _share_root(page, self.root)
+            self.cache.put(self, page)
+        return page
+
+
+class ListPage(Page):
+    """Class representing a page displaying a (possibly very long) list of
+    items, a slice at a time. The user navigates between the slices with the
+    `◀` and `▶` reactions, added automatically.
+
+    The items come from a sequence, or from a coroutine function
+    `fetch(offset, limit)`, returning the items starting at `offset` : a list
+    of at most `limit` items, or an async iterator (only `limit` items are
+    read from it). Only the slice displayed is retrieved and rendered, so the
+    cost of the page depends on `per_page`, not on the number of items.
+
+    The offset is kept per session : each user navigates the list on their
+    own.
+
+    Attributes:
+        items (sequence or coroutine function): Items of the list, or function
+            fetching them.
+        per_page (int): Number of items displayed at a time.
+        format_item (function): Function formatting an item as a string.
+        items_sep (str): String used to separate the items (for display).
+        offset (int): Index of the first item displayed.
+        shown (tuple): Items currently displayed.
+        prev_page_link (ReactLink): Link displaying the previous items.
+        next_page_link (ReactLink): Link displaying the next items.
+    """
+
+    def __init__(
+        self,
+        items,
+        msg="",
+        per_page=10,
+        format_item=str,
+        items_sep="\n",
+        prev_reaction=DEFAULT_PREV_REACT,
+        next_reaction=DEFAULT_NEXT_REACT,
+        **kwargs,
+    ):
+        r"""ListPage constructor.
+
+        Args:
+            items (sequence or coroutine function): Items of the list, or
+                function fetching them with `fetch(offset, limit)`.
+            msg (str, optional): Message displayed before the items. Defaults
+                to an empty string.
+            per_page (int, optional): Number of items displayed at a time.
+                Defaults to `10`.
+            format_item (function, optional): Function formatting an item as a
+                string. Defaults to `str`.
+            items_sep (str, optional): String used to separate the items (for
+                display). Defaults to `\n`.
+            prev_reaction (str, optional): Reaction displaying the previous
+                items. Defaults to `◀`.
+            next_reaction (str, optional): Reaction displaying the next items.
+                Defaults to `▶`.
+            kwargs (dict): Others keywords arguments, given to the `Page`
+                constructor.
+        """
+        super().__init__(msg, **kwargs)
+        self.items = items
+        self.per_page = per_page
+        self.format_item = format_item
+        self.items_sep = items_sep
+        self.offset = 0
+        self.shown = ()
+        self.prev_page_link = ReactLink(prev_reaction, self, callbacks=partial(_turn_page, step=-1))
+        self.next_page_link = ReactLink(next_reaction, self, callbacks=partial(_turn_page, step=1))
+
+    def total(self):
+        """Number of items in the list.
+
+        Returns:
+            int: Number of items, or `None` if the items are fetched (the
+                number is unknown).
+        """
+        if callable(self.items):
+            return None
+        return len(self.items)
+
+    async def prepare(self, member):
+        """Retrieve the items to display, see `Page.prepare()`.
+
+        If the offset is past the end of the list, it goes back to the last
+        items.
+
+        Args:
+            member (Discord.Member): Member who will see the page.
+        """
+        await Page.prepare(self, member)
+
+        offset = self.offset
+        total = self.total()
+        if total is not None and offset >= total:
+            offset = max((total - 1) // self.per_page * self.per_page, 0)
+
+        shown = await self._fetch(offset)
+        if not shown and offset > 0 and total is None:
+            # We went past the end of the fetched list, go back
+            offset = max(offset - self.per_page, 0)
+            shown = await self._fetch(offset)
+
+        if offset != self.offset:
+            self.offset = offset
+        self.shown = shown
+
+    def get_message(self):
+        """See `Page.get_message()`. The items displayed are part of the
+        message.
+
+        Returns:
+            str: Content to display to user.
+        """
+        return self._cached("message", self._build_message, self.offset, self.shown)
 
     ############################## Private #####################################
 
-    def _all_links(self):
+    async def _fetch(self, offset):
         """Private function.
 
-        Return a list of available ReactLink for this page.
+        Retrieve the items to display, starting at `offset`.
+
+        Args:
+            offset (int): Index of the first item to display.
 
         Returns:
-            list of ReactLink: All links.
+            tuple: Items to display.
         """
-        all_links = self.links
-        if self.parent is not None:
-            all_links += [self.parent]
-        if self.root is not None:
-            all_links += [self.root]
-        return all_links
+        if not callable(self.items):
+            return tuple(self.items[offset : offset + self.per_page])
+
+        result = self.items(offset, self.per_page)
+        if inspect.isawaitable(result):
+            result = await result
+        if not hasattr(result, "__aiter__"):
+            return tuple(result)[: self.per_page]
+
+        shown = []
+        async for item in result:
+            shown.append(item)
+            if len(shown) >= self.per_page:
+                break
+        if hasattr(result, "aclose"):
+            await result.aclose()
+        return tuple(shown)
+
+    def _build_message(self):
+        """Private function.
+
+        Build the content of the page, with the items displayed, see
+        `get_message()`.
+
+        Returns:
+            str: Content to display to user.
+        """
+        content = self.msg
+        content += self.sep
+        content += self.items_sep.join(self.format_item(item) for item in self.shown)
+
+        total = self.total()
+        if total is not None and total > self.per_page:
+            start = self.offset + 1 if self.shown else self.offset
+            content += self.items_sep + "({}-{} / {})".format(start, self.offset + len(self.shown), total)
+
+        descriptions = [link.description for link in self.links if link.description is not None]
+        if self.msg_link is not None and self.msg_link.description is not None:
+            descriptions.append(self.msg_link.description)
+        if descriptions:
+            content += self.sep + self.links_sep.join(descriptions)
+        return content
+
+    def _build_index(self):
+        """Private function.
+
+        See `Page._build_index()`. The `◀` and `▶` links come first.
+
+        Returns:
+            dict: Mapping from reaction (str) to ReactLink.
+        """
+        index = {link.reaction: link for link in (self.prev_page_link, self.next_page_link)}
+        # Not `super()` : the page may be seen through a `SessionPage`
+        index.update(Page._build_index(self))
+        return index
+
+
+async def _turn_page(link, member, prev_input, step):
+    """Private function.
+
+    Callback of the `◀` and `▶` links of a `ListPage` : move the offset of the
+    page, for the current session only.
+
+    Args:
+        link (SessionLink): Link taken.
+        member (Discord.Member): Member navigating the help.
+        prev_input (list of Discord.Message): Previous inputs of the member.
+        step (int): `-1` to display the previous items, `1` for the next ones.
+    """
+    page = link.page()
+    page.offset = max(page.offset + step * page.per_page, 0)
+
+
+class _Frozen:
+    """Private class.
+
+    Mixin added to the class of the pages once frozen (see `Page.freeze()`).
+    Changing the class instead of checking a flag keeps the pages that are not
+    frozen as fast as before.
+    """
+
+    def __setattr__(self, name, value):
+        raise FrozenPageError("Page {} is frozen and can't be modified".format(self.id or ""))
+
+    def link(self, *args, **kwargs):
+        raise FrozenPageError("Page {} is frozen and can't be modified".format(self.id or ""))
+
+
+# Frozen version of each class of page
+_FROZEN_CLASSES = {}
+
+
+def _frozen_class(cls):
+    """Private function.
+
+    Retrieve the frozen version of a class of page, creating it if needed.
+
+    Args:
+        cls (type): Class of page.
+
+    Returns:
+        type: Frozen version of the class.
+    """
+    if cls not in _FROZEN_CLASSES:
+        _FROZEN_CLASSES[cls] = type("Frozen" + cls.__name__, (_Frozen, cls), {"__doc__": cls.__doc__})
+    return _FROZEN_CLASSES[cls]
+
+
+class _TrackedDict(dict):
+    """Private class.
+
+    Dictionary calling a function whenever it's modified, so the `Page` knows
+    when its `embed_kwargs` change.
+    """
+
+    def __init__(self, *args, on_change, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._on_change = on_change
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._on_change()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._on_change()
+
+    def clear(self):
+        super().clear()
+        self._on_change()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._on_change()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._on_change()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._on_change()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._on_change()
+
+
+class _TrackedList(list):
+    """Private class.
+
+    List calling a function whenever it's modified, so the `Page` knows when
+    its `links` change.
+    """
+
+    def __init__(self, *args, on_change):
+        super().__init__(*args)
+        self._on_change = on_change
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._on_change()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._on_change()
+
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._on_change()
+        return result
+
+    def __imul__(self, n):
+        result = super().__imul__(n)
+        self._on_change()
+        return result
+
+    def append(self, value):
+        super().append(value)
+        self._on_change()
+
+    def extend(self, values):
+        super().extend(values)
+        self._on_change()
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._on_change()
+
+    def remove(self, value):
+        super().remove(value)
+        self._on_change()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._on_change()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._on_change()
+
+    def sort(self, **kwargs):
+        super().sort(**kwargs)
+        self._on_change()
+
+    def reverse(self):
+        super().reverse()
+        self._on_change()
+
+
+def _share_root(page, root):
+    """Private function.
+
+    Give a root link to a page built by a `LazyPage`, and to the pages of its
+    subtree that don't have a root yet. The lazy pages of the subtree are not
+    built.
+
+    Args:
+        page (Page): Page built.
+        root (Link): Link to the root page.
+    """
+    root_page = root.pages[0]
+    seen = {id(page)}
+    to_visit = [page]
+    while to_visit:
+        current = to_visit.pop()
+        if current.root is None and current is not root_page and not isinstance(current, _Frozen):
+            current.root = root
+
+        links = list(current.links)
+        if current.msg_link is not None:
+            links.append(current.msg_link)
+        for link in links:
+            for child in link.pages:
+                if isinstance(child, Page) and id(child) not in seen:
+                    seen.add(id(child))
+                    to_visit.append(child)
+
+
+def _label(label, default):
+    """Private function.
+
+    Normalize the label of a component, so it fits the limits of Discord.
+
+    Args:
+        label (str): Label of the component, or `None`.
+        default (str): Label to use if there is no label.
+
+    Returns:
+        str: Label to use.
+    """
+    if not label:
+        return default
+    if len(label) > MAX_LABEL_LENGTH:
+        return label[: MAX_LABEL_LENGTH - 1] + "…"
+    return label
@@ -0,0 +1,330 @@
+"""Module containing the definition of the `EventRouter` class. This class is
+not public-facing, it is used internally by the `Help` to dispatch the events
+received by the Discord client to the help sessions waiting for them.
+"""
+
+import asyncio
+import types
+
+import discord
+
+
+class EventRouter:
+    """Class dispatching Discord events to the help sessions.
+
+    Instead of registering new listeners for each session and each page (which
+    means every event is checked against every session), the router listens
+    only once to each event, and find the session waiting for this event with
+    a dictionary lookup.
+
+    Reactions (and interactions with components) are routed based on the user
+    and the message reacted to. The raw reaction events are used, because
+    discord.py only dispatches the other ones for the messages in its cache :
+    the message of a resumed session (or of an old session) is not.
+    Interactions with the components of a shared message are routed to its
+    board, based on the prefix of their custom ID. Messages are routed based
+    on the author and the channel where the message was sent.
+
+    When the help is shared by several processes, the events no session of
+    this process is waiting for are given to the cluster, which forwards them
+    to the process owning the session.
+
+    Attributes:
+        client (Discord.Client): Discord client (to listen to events).
+        cluster (Cluster): Cluster forwarding the events of sessions owned by
+            other processes, or `None`.
+    """
+
+    EVENTS = ["raw_reaction_add", "raw_reaction_remove", "message", "interaction"]
+
+    def __init__(self, client, cluster=None):
+        """EventRouter constructor.
+
+        Args:
+            client (Discord.Client): Discord client (to listen to events).
+            cluster (Cluster, optional): Cluster forwarding the events of
+                sessions owned by other processes. Defaults to `None`.
+        """
+        self.client = client
+        self.cluster = cluster
+        self._reaction_waiters = {}
+        self._message_waiters = {}
+        self._boards = {}
+        self._listeners = {}
+
+    async def wait(self, member, message, need_input=False, accept_unreact=False):
+        """Wait for the next input of the user on the given message.
+
+        Args:
+            member (Discord.Member): Member we are waiting for.
+            message (Discord.Message): Message sent by the bot, where the user
+                should react.
+            need_input (bool, optional): If `True`, a message sent by the user
+                in the same channel is also a valid input. Defaults to `False`.
+            accept_unreact (bool, optional): If `True`, removing a reaction is
+                also a valid input. Defaults to `False`.
+
+        Returns:
+            reaction (Discord.Reaction or Discord.Interaction): Reaction of the
+                user (or interaction if the user used a component), or None if
+                the correct input was a user message.
+            message (Discord.Message): Message of the user, or None if the
+                correct input was a user reaction.
+        """
+        self.listen()
+
+        future = asyncio.get_running_loop().create_future()
+        reaction_key = (member.id, message.id)
+        message_key = (member.id, message.channel.id)
+
+        self._reaction_waiters[reaction_key] = (future, accept_unreact)
+        if need_input:
+            self._message_waiters[message_key] = future
+
+        try:
+            return await future
+        finally:
+            # Remove the waiters, unless they were replaced in the meantime
+            if self._reaction_waiters.get(reaction_key, (None,))[0] is future:
+                del self._reaction_waiters[reaction_key]
+            if self._message_waiters.get(message_key) is future:
+                del self._message_waiters[message_key]
+
+    def interrupt(self, member, message):
+        """Stop waiting for the input of a member on the given message : the
+        session waiting for it receives `(None, None)`.
+
+        Args:
+            member (Discord.Member): Member waited for.
+            message (Discord.Message): Message sent by the bot.
+
+        Returns:
+            bool: `True` if a session was waiting for this member.
+        """
+        waiter = self._reaction_waiters.get((member.id, message.id))
+        if waiter is not None and not waiter[0].done():
+            waiter[0].set_result((None, None))
+            return True
+        return False
+
+    def add_board(self, prefix, handler):
+        """Route the interactions whose custom ID starts with the given prefix
+        to a handler, whatever the message and the user.
+
+        Args:
+            prefix (str): Prefix of the custom IDs, ending with `:`.
+            handler (function): Function called with each interaction.
+        """
+        self.listen()
+        self._boards[prefix] = handler
+
+    def remove_board(self, prefix):
+        """Stop routing the interactions with the given prefix.
+
+        Args:
+            prefix (str): Prefix of the custom IDs.
+        """
+        self._boards.pop(prefix, None)
+
+    def on_reaction_add(self, reaction, user):
+        """Route a `reaction_add` event to the session waiting for it.
+
+        Args:
+            reaction (Discord.Reaction): Reaction added.
+            user (Discord.User): User who added the reaction.
+
+        Returns:
+            bool: `True` if a session was waiting for this event.
+        """
+        waiter = self._reaction_waiters.get((user.id, reaction.message.id))
+        if waiter is not None and not waiter[0].done():
+            waiter[0].set_result((reaction, None))
+            return True
+        return False
+
+    def on_reaction_remove(self, reaction, user):
+        """Route a `reaction_remove` event to the session waiting for it.
+
+        Args:
+            reaction (Discord.Reaction): Reaction removed.
+            user (Discord.User): User who removed the reaction.
+
+        Returns:
+            bool: `True` if a session was waiting for this event.
+        """
+        waiter = self._reaction_waiters.get((user.id, reaction.message.id))
+        if waiter is not None and waiter[1] and not waiter[0].done():
+            waiter[0].set_result((reaction, None))
+            return True
+        return False
+
+    def on_raw_reaction_add(self, payload):
+        """Route a `raw_reaction_add` event to the session waiting for it. The
+        event is dispatched for all messages, even if they are not cached.
+
+        Args:
+            payload (Discord.RawReactionActionEvent): Reaction added.
+
+        Returns:
+            bool: `True` if a session was waiting for this event.
+        """
+        return self.on_reaction_add(*_from_payload(payload))
+
+    def on_raw_reaction_remove(self, payload):
+        """Route a `raw_reaction_remove` event to the session waiting for it.
+
+        Args:
+            payload (Discord.RawReactionActionEvent): Reaction removed.
+
+        Returns:
+            bool: `True` if a session was waiting for this event.
+        """
+        return self.on_reaction_remove(*_from_payload(payload))
+
+    def on_message(self, message):
+        """Route a `message` event to the session waiting for it.
+
+        Args:
+            message (Discord.Message): Message sent.
+
+        Returns:
+            bool: `True` if a session was waiting for this event.
+        """
+        future = self._message_waiters.get((message.author.id, message.channel.id))
+        if future is not None and not future.done():
+            future.set_result((None, message))
+            return True
+        return False
+
+    def on_interaction(self, interaction):
+        """Route an `interaction` event to the session waiting for it.
+
+        Only interactions with the components of a message are routed.
+
+        Args:
+            interaction (Discord.Interaction): Interaction of the user.
+
+        Returns:
+            bool: `True` if a session was waiting for this event.
+        """
+        if interaction.type != discord.InteractionType.component or interaction.message is None:
+            return False
+        if self._boards:
+            custom_id = (interaction.data or {}).get("custom_id", "")
+            handler = self._boards.get(custom_id.split(":", 1)[0] + ":")
+            if handler is not None:
+                handler(interaction)
+                return True
+        waiter = self._reaction_waiters.get((interaction.user.id, interaction.message.id))
+        if waiter is not None and not waiter[0].done():
+            waiter[0].set_result((interaction, None))
+            return True
+        return False
+
+    def listen(self):
+        """Subscribe to the events of the client, if not done yet.
+
+        A `commands.Bot` lets us add listeners directly. A basic `Client` does
+        not, so we register a single `wait_for()` per event, whose check
+        routes the event and never accepts it : the listener stays registered
+        forever.
+        """
+        if hasattr(self.client, "add_listener"):
+            if not self._listeners:
+                for event in self.EVENTS:
+                    self.client.add_listener(self._as_coroutine(event), "on_" + event)
+                    self._listeners[event] = None
+            return
+
+        for event in self.EVENTS:
+            # Listeners might have been cancelled (for example on shutdown)
+            task = self._listeners.get(event)
+            if task is None or task.done():
+                self._listeners[event] = asyncio.ensure_future(
+                    self.client.wait_for(event, check=self._as_check(event))
+                )
+
+    ############################## Private #####################################
+
+    def _as_check(self, event):
+        """Private function.
+
+        Wrap the handler of an event as a `wait_for()` check.
+
+        Args:
+            event (str): Name of the event.
+
+        Returns:
+            function: Check routing the event, and always returning `False`.
+        """
+        handler = self._handler(event)
+
+        def check(*args):
+            try:
+                handler(*args)
+            except Exception:
+                # An exception in a check would remove our listener
+                pass
+            return False
+
+        return check
+
+    def _as_coroutine(self, event):
+        """Private function.
+
+        Wrap the handler of an event as a coroutine, to be used as a listener.
+
+        Args:
+            event (str): Name of the event.
+
+        Returns:
+            coroutine function: Listener routing the event.
+        """
+        handler = self._handler(event)
+
+        async def listener(*args):
+            handler(*args)
+
+        return listener
+
+    def _handler(self, event):
+        """Private function.
+
+        Retrieve the handler of an event. If the help is shared by several
+        processes, events no session was waiting for are forwarded.
+
+        Args:
+            event (str): Name of the event.
+
+        Returns:
+            function: Handler of the event.
+        """
+        handler = getattr(self, "on_" + event)
+        if self.cluster is None:
+            return handler
+
+        def forwarding_handler(*args):
+            if not handler(*args):
+                self.cluster.forward(event, *args)
+
+        return forwarding_handler
+
+
+def _from_payload(payload):
+    """Private function.
+
+    Rebuild the reaction and the user of a raw reaction event, with the
+    attributes used by the `Help`.
+
+    Args:
+        payload (Discord.RawReactionActionEvent): Raw reaction event.
+
+    Returns:
+        reaction (object): Reaction, with its `emoji` (as a string) and its
+            `message`.
+        user (object): User who reacted, with their `id`.
+    """
+    channel = types.SimpleNamespace(id=payload.channel_id)
+    message = types.SimpleNamespace(id=payload.message_id, channel=channel, guild=None)
+    reaction = types.SimpleNamespace(emoji=str(payload.emoji), message=message)
+    return reaction, types.SimpleNamespace(id=payload.user_id)
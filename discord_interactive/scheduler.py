@@ -0,0 +1,464 @@
+"""Module containing the definition of the `RequestScheduler` class, which
+schedules the requests sent to Discord by the `Help`, to avoid bursts of
+requests hitting the rate limits.
+"""
+
+import asyncio
+import heapq
+import itertools
+from enum import IntEnum
+
+import discord
+
+
+class Priority(IntEnum):
+    """Priority of a request. Requests with a lower value are sent first.
+    Messages are what the user is waiting for, so they come first. Reactions
+    are only decoration, so they come last.
+    """
+
+    MESSAGE = 0
+    DELETE = 1
+    REACTION = 2
+
+
+class TokenBucket:
+    """Class representing a rate limit, as a token bucket.
+
+    The bucket holds up to `capacity` tokens, and is refilled at a rate of
+    `capacity` tokens every `per` seconds. Each request consumes one token.
+
+    Attributes:
+        capacity (int): Maximum number of tokens in the bucket.
+        per (float): Number of seconds to refill the bucket completely.
+        tokens (float): Number of tokens currently in the bucket.
+        paused_until (float): Time (of the event loop) until which no request
+            should be sent, because Discord told us we are rate limited.
+    """
+
+    def __init__(self, capacity, per, now=0.0):
+        """TokenBucket constructor.
+
+        Args:
+            capacity (int): Maximum number of tokens in the bucket.
+            per (float): Number of seconds to refill the bucket completely.
+            now (float, optional): Current time. Defaults to `0`.
+        """
+        self.capacity = capacity
+        self.per = per
+        self.tokens = float(capacity)
+        self.paused_until = now
+        self._last = now
+
+    def delay(self, now):
+        """Compute how long to wait before a token is available.
+
+        Args:
+            now (float): Current time.
+
+        Returns:
+            float: Number of seconds to wait, `0` if a token is available.
+        """
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) * self.per / self.capacity
+
+    def consume(self, now):
+        """Consume a token.
+
+        Args:
+            now (float): Current time.
+        """
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, now, retry_after):
+        """Follow the feedback of Discord : we were rate limited, so wait
+        before sending other requests, and start again with an empty bucket.
+
+        Args:
+            now (float): Current time.
+            retry_after (float): Number of seconds to wait, given by Discord.
+        """
+        self._refill(now)
+        self.tokens = 0
+        self.paused_until = max(self.paused_until, now + retry_after)
+        self._last = self.paused_until
+
+    def _refill(self, now):
+        """Private function.
+
+        Refill the bucket, based on the time elapsed since the last refill.
+
+        Args:
+            now (float): Current time.
+        """
+        if now > self._last:
+            self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.capacity / self.per)
+            self._last = now
+
+
+class _Request:
+    """Private class representing a request waiting to be sent."""
+
+    def __init__(self, priority, seq, channel, message, func, args, kwargs, future):
+        self.priority = priority
+        self.seq = seq
+        self.channel = channel
+        self.message = message
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.retries = 0
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler:
+    """Class scheduling the requests sent to Discord.
+
+    Requests are queued per channel. Each channel has its own token bucket,
+    and all channels share a global token bucket. Requests without channel
+    (like the creation of a DM channel) are only limited by the global bucket.
+    When several requests can be sent, the one with the highest priority is
+    sent first.
+
+    When Discord answers with a 429 (rate limited), the corresponding bucket is
+    paused for the duration given by Discord, and the request is queued again.
+
+    When a message is deleted, the requests still queued for this message are
+    dropped.
+
+    Attributes:
+        channel_rate (int): Number of requests allowed per channel, every
+            `channel_per` seconds.
+        channel_per (float): Period of the per-channel rate limit.
+        global_bucket (TokenBucket): Bucket shared by all channels.
+        max_retries (int): Maximum number of times a rate limited request is
+            queued again, before giving up.
+    """
+
+    def __init__(self, channel_rate=5, channel_per=1.0, global_rate=50, global_per=1.0, max_retries=3):
+        """RequestScheduler constructor.
+
+        Args:
+            channel_rate (int, optional): Number of requests allowed per
+                channel, every `channel_per` seconds. Defaults to `5`.
+            channel_per (float, optional): Period of the per-channel rate
+                limit, in seconds. Defaults to `1`.
+            global_rate (int, optional): Number of requests allowed across all
+                channels, every `global_per` seconds. Defaults to `50`.
+            global_per (float, optional): Period of the global rate limit, in
+                seconds. Defaults to `1`.
+            max_retries (int, optional): Maximum number of times a rate limited
+                request is queued again, before giving up. Defaults to `3`.
+        """
+        self.channel_rate = channel_rate
+        self.channel_per = channel_per
+        self.global_bucket = TokenBucket(global_rate, global_per)
+        self.max_retries = max_retries
+
+        self._queues = {}
+        self._buckets = {}
+        # Rate limited requests without channel, waiting to be queued again
+        self._delayed = set()
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._worker = None
+
+    def __len__(self):
+        """Number of requests waiting to be sent."""
+        return sum(len(queue) for queue in self._queues.values()) + len(self._delayed)
+
+    def submit(self, func, *args, channel=None, priority=Priority.MESSAGE, message=None, **kwargs):
+        """Queue a request.
+
+        Args:
+            func (coroutine function): Function sending the request.
+            *args: Positional arguments given to `func`.
+            channel (int, optional): ID of the channel targeted by the request.
+                Defaults to `None`.
+            priority (Priority, optional): Priority of the request. Defaults to
+                `Priority.MESSAGE`.
+            message (int, optional): ID of the message targeted by the request.
+                Requests for a message are dropped when the message is deleted.
+                Defaults to `None`.
+            **kwargs: Keywords arguments given to `func`.
+
+        Returns:
+            asyncio.Future: Future resolved with the result of the request.
+                Cancelling it drops the request if it's not sent yet.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        request = _Request(priority, next(self._seq), channel, message, func, args, kwargs, future)
+        heapq.heappush(self._queues.setdefault(channel, []), request)
+
+        self._start()
+        return future
+
+    def discard(self, message):
+        """Drop all requests queued for the given message (for example because
+        it was deleted).
+
+        Args:
+            message (int): ID of the message.
+        """
+        for channel, queue in list(self._queues.items()):
+            kept = []
+            for request in queue:
+                if request.message == message:
+                    request.future.cancel()
+                else:
+                    kept.append(request)
+            if len(kept) != len(queue):
+                heapq.heapify(kept)
+                self._queues[channel] = kept
+
+    async def close(self):
+        """Stop the scheduler, dropping all requests still queued."""
+        self._drop_all()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    ############################## Private #####################################
+
+    def _start(self):
+        """Private function.
+
+        Start the worker if needed, or wake it up if it's waiting.
+        """
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+
+    async def _run(self):
+        """Private function.
+
+        Worker sending the queued requests, following the rate limits.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await self._loop(loop)
+        except asyncio.CancelledError:
+            # Nobody will send the queued requests, don't let anyone wait for them
+            self._drop_all()
+            raise
+
+    async def _loop(self, loop):
+        """Private function.
+
+        Main loop of the worker.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Running event loop.
+        """
+        while True:
+            self._wakeup.clear()
+            request, delay = self._next(loop.time())
+
+            if request is not None:
+                now = loop.time()
+                if request.channel is not None:
+                    self._bucket(request.channel, now).consume(now)
+                self.global_bucket.consume(now)
+                asyncio.ensure_future(self._send(request))
+                continue
+
+            if delay is None and not self._queues:
+                # Nothing left to send
+                return
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _drop_all(self):
+        """Private function.
+
+        Drop all requests still queued.
+        """
+        for queue in self._queues.values():
+            for request in queue:
+                request.future.cancel()
+        self._queues.clear()
+        for request in self._delayed:
+            request.future.cancel()
+        self._delayed.clear()
+
+    def _bucket(self, channel, now):
+        """Private function.
+
+        Retrieve the token bucket of a channel, creating it if needed.
+
+        Args:
+            channel (int): ID of the channel.
+            now (float): Current time.
+
+        Returns:
+            TokenBucket: Bucket of the channel.
+        """
+        if channel not in self._buckets:
+            self._buckets[channel] = TokenBucket(self.channel_rate, self.channel_per, now)
+        return self._buckets[channel]
+
+    def _next(self, now):
+        """Private function.
+
+        Pop the next request that can be sent now.
+
+        Args:
+            now (float): Current time.
+
+        Returns:
+            request (_Request): Request to send, or `None` if no request can be
+                sent now.
+            delay (float): If no request can be sent, number of seconds to wait
+                before trying again (`None` if there is no request).
+        """
+        global_delay = self.global_bucket.delay(now)
+
+        best, delay = None, None
+        for channel in list(self._queues):
+            queue = self._queues[channel]
+            # Skip the requests that were cancelled
+            while queue and queue[0].future.done():
+                heapq.heappop(queue)
+            # Requests without channel only follow the global bucket
+            bucket = self._bucket(channel, now) if channel is not None else None
+            if not queue:
+                del self._queues[channel]
+                # Forget the buckets that are back to normal, to save memory
+                if bucket is not None and bucket.delay(now) == 0 and bucket.tokens >= bucket.capacity:
+                    del self._buckets[channel]
+                continue
+
+            wait = max(global_delay, bucket.delay(now) if bucket is not None else 0)
+            if wait > 0:
+                delay = wait if delay is None else min(delay, wait)
+            elif best is None or queue[0] < best:
+                best = queue[0]
+
+        if best is not None:
+            heapq.heappop(self._queues[best.channel])
+        return best, delay
+
+    async def _send(self, request):
+        """Private function.
+
+        Send a request, and handle the rate limit feedback.
+
+        Args:
+            request (_Request): Request to send.
+        """
+        if request.future.done():
+            return
+
+        try:
+            result = await request.func(*request.args, **request.kwargs)
+        except discord.NotFound as e:
+            # The message is gone, no need to send anything else for it
+            if request.message is not None:
+                self.discard(request.message)
+            self._resolve(request, exception=e)
+        except (discord.RateLimited, discord.HTTPException) as e:
+            retry_after = _retry_after(e)
+            if retry_after is None or request.retries >= self.max_retries:
+                self._resolve(request, exception=e)
+                return
+
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            request.retries += 1
+            if _is_global(e):
+                self.global_bucket.pause(now, retry_after)
+            elif request.channel is None:
+                # No channel bucket to pause : only this request waits
+                self._delayed.add(request)
+                loop.call_later(retry_after, self._requeue, request)
+                return
+            else:
+                self._bucket(request.channel, now).pause(now, retry_after)
+            self._requeue(request)
+        except Exception as e:
+            self._resolve(request, exception=e)
+        else:
+            self._resolve(request, result=result)
+
+    def _requeue(self, request):
+        """Private function.
+
+        Queue a rate limited request again, keeping its place.
+
+        Args:
+            request (_Request): Request to send again.
+        """
+        self._delayed.discard(request)
+        if request.future.done():
+            return
+        heapq.heappush(self._queues.setdefault(request.channel, []), request)
+        self._start()
+
+    def _resolve(self, request, result=None, exception=None):
+        """Private function.
+
+        Set the result of a request that is done.
+
+        Args:
+            request (_Request): Request done.
+            result (optional): Result of the request. Defaults to `None`.
+            exception (Exception, optional): Exception raised by the request.
+                Defaults to `None`.
+        """
+        if request.future.done():
+            return
+        if exception is not None:
+            request.future.set_exception(exception)
+        else:
+            request.future.set_result(result)
+
+
+def _retry_after(error):
+    """Private function.
+
+    Retrieve the number of seconds to wait from a rate limit error.
+
+    Args:
+        error (Exception): Error raised by discord.py.
+
+    Returns:
+        float: Number of seconds to wait, or `None` if the error is not a rate
+            limit error.
+    """
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+
+    response = getattr(error, "response", None)
+    if getattr(response, "status", None) != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    return float(headers.get("Retry-After", 1))
+
+
+def _is_global(error):
+    """Private function.
+
+    Check if a rate limit error concerns the global rate limit.
+
+    Args:
+        error (Exception): Error raised by discord.py.
+
+    Returns:
+        bool: `True` if the global rate limit was hit.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    return str(headers.get("X-RateLimit-Global", "false")).lower() == "true"
@@ -0,0 +1,389 @@
+"""Module containing the definition of the `SearchIndex` class, a full-text
+index over the pages of the help tree. Users can type a few words, and jump
+directly to the page they are looking for, instead of navigating the tree
+level by level.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+
+from discord_interactive.page import DEFAULT_LINK_REACTS, Page, PageType
+
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TITLE_LENGTH = 60
+
+
+class SearchIndex:
+    """Class representing a full-text index over pages.
+
+    Each page is indexed with the words of its message, of its title, and of
+    the descriptions of the links leading to it. Words are matched by prefix,
+    and the results are ranked by relevance (rare words count more).
+
+    The index is updated incrementally : when an indexed page changes, it's
+    indexed again on the next search.
+
+    Attributes:
+        link_weight (float): Weight of the words of the links descriptions,
+            compared to the words of the page itself.
+        max_expansions (int): Maximum number of words matched by the prefix of
+            a word of the query.
+    """
+
+    def __init__(self, pages=None, link_weight=2.0, max_expansions=50):
+        """SearchIndex constructor.
+
+        Args:
+            pages (list of Page, optional): Pages to index. Defaults to `None`.
+            link_weight (float, optional): Weight of the words of the links
+                descriptions. Defaults to `2`.
+            max_expansions (int, optional): Maximum number of words matched by
+                the prefix of a word of the query. Defaults to `50`.
+        """
+        self.link_weight = link_weight
+        self.max_expansions = max_expansions
+
+        self._postings = {}
+        self._terms = []
+        self._docs = {}
+        self._own = {}
+        self._incoming = {}
+        self._outgoing = {}
+        self._dirty = set()
+
+        for page in pages or []:
+            self.add(page)
+
+    def __len__(self):
+        """Number of pages indexed."""
+        return len(self._own)
+
+    def __contains__(self, page):
+        """Check if a page is indexed."""
+        return page in self._own
+
+    def add(self, page):
+        """Index a page.
+
+        Args:
+            page (Page): Page to index.
+        """
+        if page in self._own:
+            return
+        page.add_observer(self._mark_dirty)
+        self._own[page] = Counter()
+        self._outgoing[page] = {}
+        self._reindex(page)
+
+    def add_tree(self, root):
+        """Index all the pages reachable from a page. Lazy pages not built yet
+        are not indexed.
+
+        Args:
+            root (Page): Page to start from.
+        """
+        seen = {root}
+        to_visit = [root]
+        while to_visit:
+            page = to_visit.pop()
+            self.add(page)
+            for link in _links(page) + [page.parent, page.root]:
+                for child in link.pages if link is not None else []:
+                    if isinstance(child, Page) and child not in seen:
+                        seen.add(child)
+                        to_visit.append(child)
+
+    def remove(self, page):
+        """Stop indexing a page.
+
+        Args:
+            page (Page): Page to remove from the index.
+        """
+        if page not in self._own:
+            return
+        page.remove_observer(self._mark_dirty)
+        self._dirty.discard(page)
+
+        for target in self._outgoing.pop(page):
+            self._incoming.get(target, {}).pop(page, None)
+            if target in self._own:
+                self._refresh(target)
+
+        del self._own[page]
+        self._incoming.pop(page, None)
+        self._refresh(page)
+
+    def search(self, query, limit=5):
+        """Search the pages matching a query. A page matches if it contains
+        all the words of the query (or words starting with them).
+
+        Args:
+            query (str): Words to search.
+            limit (int, optional): Maximum number of results. Defaults to `5`.
+
+        Returns:
+            list: List of `(page, score)`, best matches first.
+        """
+        self._flush()
+        tokens = _tokenize(query)
+        if not tokens:
+            return []
+
+        scores = None
+        n_pages = max(len(self._own), 1)
+        for token in set(tokens):
+            token_scores = {}
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + n_pages / len(postings))
+                boost = 1.0 if term == token else 0.5
+                for page, weight in postings.items():
+                    token_scores[page] = token_scores.get(page, 0) + weight * idf * boost
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {page: score + token_scores[page] for page, score in scores.items() if page in token_scores}
+            if not scores:
+                return []
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def callback(self, limit=len(DEFAULT_LINK_REACTS), jump=True, results_msg="Pages found for : {query}"):
+        """Create a callback searching the last message of the user, to be
+        used on a link with `user_input=True`.
+
+        If nothing is found, the page of the link is displayed as usual. If a
+        single page is found (or a page is much more relevant than the others)
+        and `jump` is `True`, this page is displayed directly. Otherwise, a page
+        listing the results is displayed.
+
+        Args:
+            limit (int, optional): Maximum number of results. Defaults to `9`.
+            jump (bool, optional): If `True`, display the best page directly
+                when it's clearly the best. Defaults to `True`.
+            results_msg (str, optional): Message of the page listing the
+                results. `{query}` is replaced by the query of the user.
+                Defaults to `Pages found for : {query}`.
+
+        Returns:
+            coroutine function: Callback to use on a link.
+        """
+        limit = min(limit, len(DEFAULT_LINK_REACTS))
+
+        async def search_callback(link, member, prev_input):
+            query = prev_input[-1].content if prev_input else ""
+            results = self.search(query, limit)
+            if not results:
+                return
+
+            if jump and (len(results) == 1 or results[0][1] >= 2 * results[1][1]):
+                link.redirect(results[0][0])
+            else:
+                fallback = link.pages[link.path].materialize()
+                link.redirect(_results_page(query, results, fallback, results_msg))
+
+        return search_callback
+
+    def link_search(self, page, no_results, description="🔍 Type some words to search the help", **kwargs):
+        """Let the user search the help from a page : create a link with
+        `user_input=True` on the page, searching what the user types.
+
+        Args:
+            page (Page): Page where the user can search.
+            no_results (Page): Page displayed when nothing is found. The page
+                listing the results uses the same parent and root links.
+            description (str, optional): Description of the link. Defaults to
+                `🔍 Type some words to search the help`.
+            **kwargs: Keywords arguments given to `callback()`.
+        """
+        page.link(no_results, description=description, callbacks=self.callback(**kwargs), user_input=True)
+
+    ############################## Private #####################################
+
+    def _mark_dirty(self, page):
+        """Private function.
+
+        Called when an indexed page changes : index it again on the next
+        search.
+
+        Args:
+            page (Page): Page that changed.
+        """
+        self._dirty.add(page)
+
+    def _flush(self):
+        """Private function.
+
+        Index again the pages that changed.
+        """
+        while self._dirty:
+            self._reindex(self._dirty.pop())
+
+    def _reindex(self, page):
+        """Private function.
+
+        Index a page : its own words, and the words it gives to the pages it
+        links to.
+
+        Args:
+            page (Page): Page to index.
+        """
+        title = page.embed_kwargs.get("title") or ""
+        self._own[page] = Counter(_tokenize("{} {}".format(title, page.msg)))
+
+        outgoing = {}
+        for link in _links(page):
+            text = getattr(link, "label", link.description)
+            if not text:
+                continue
+            words = Counter(_tokenize(text))
+            for target in link.pages:
+                if isinstance(target, Page):
+                    outgoing.setdefault(target, Counter()).update(words)
+
+        old_outgoing = self._outgoing[page]
+        for target in old_outgoing:
+            if target not in outgoing:
+                self._incoming[target].pop(page, None)
+        for target, words in outgoing.items():
+            self._incoming.setdefault(target, {})[page] = words
+        self._outgoing[page] = outgoing
+
+        for affected in {page, *old_outgoing, *outgoing}:
+            if affected in self._own:
+                self._refresh(affected)
+
+    def _refresh(self, page):
+        """Private function.
+
+        Update the postings of a page, from its own words and the words given
+        by the links leading to it.
+
+        Args:
+            page (Page): Page to update.
+        """
+        doc = {}
+        if page in self._own:
+            doc = dict(self._own[page])
+            for words in self._incoming.get(page, {}).values():
+                for term, count in words.items():
+                    doc[term] = doc.get(term, 0) + count * self.link_weight
+
+        for term in self._docs.get(page, {}):
+            if term not in doc:
+                postings = self._postings[term]
+                del postings[page]
+                if not postings:
+                    del self._postings[term]
+                    del self._terms[bisect.bisect_left(self._terms, term)]
+
+        for term, weight in doc.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[page] = weight
+
+        if doc:
+            self._docs[page] = doc
+        else:
+            self._docs.pop(page, None)
+
+    def _expand(self, token):
+        """Private function.
+
+        Find the indexed words starting with the given word.
+
+        Args:
+            token (str): Word of the query.
+
+        Returns:
+            list of str: Indexed words starting with `token`.
+        """
+        start = bisect.bisect_left(self._terms, token)
+        terms = []
+        for term in self._terms[start : start + self.max_expansions]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+
+def _tokenize(text):
+    """Private function.
+
+    Split a text into lowercase words.
+
+    Args:
+        text (str): Text to split.
+
+    Returns:
+        list of str: Words of the text.
+    """
+    return TOKEN_RE.findall(text.lower())
+
+
+def _links(page):
+    """Private function.
+
+    List the links of a page going down the tree (not the parent or root).
+
+    Args:
+        page (Page): Page.
+
+    Returns:
+        list of Link: Links of the page.
+    """
+    links = list(page.links)
+    if page.msg_link is not None:
+        links.append(page.msg_link)
+    return links
+
+
+def _title(page):
+    """Private function.
+
+    Find a short title for a page : its title, or the first line of its
+    message.
+
+    Args:
+        page (Page): Page.
+
+    Returns:
+        str: Title of the page.
+    """
+    title = page.embed_kwargs.get("title")
+    if not title:
+        lines = [line.strip() for line in page.msg.splitlines() if line.strip()]
+        title = lines[0] if lines else page.id or "Page"
+    if len(title) > MAX_TITLE_LENGTH:
+        title = title[: MAX_TITLE_LENGTH - 1] + "…"
+    return title
+
+
+def _results_page(query, results, fallback, results_msg):
+    """Private function.
+
+    Build a page listing the results of a search. It's built for a single
+    session, and has the same parent and root as the `fallback` page.
+
+    Args:
+        query (str): Query of the user.
+        results (list): List of `(page, score)`.
+        fallback (Page): Page displayed when nothing is found.
+        results_msg (str): Message of the page.
+
+    Returns:
+        Page: Page listing the results.
+    """
+    page = Page(results_msg.format(query=query), embed=fallback.type == PageType.EMBED)
+    for found, _ in results:
+        page.link(found, description=_title(found), is_parent=False)
+    page.parent = fallback.parent
+    page.root = fallback.root
+    return page
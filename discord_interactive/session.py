@@ -0,0 +1,568 @@
+"""Module containing the definition of the `Session` and `SessionManager`
+classes. A session represents one member navigating the help, and the
+`SessionManager` keeps track of all the live sessions of a `Help`.
+"""
+
+import asyncio
+import uuid
+from collections import deque, namedtuple
+
+
+class SessionLimitError(Exception):
+    """Exception raised when a new session can't be opened, because the
+    maximum number of concurrent sessions is reached.
+    """
+
+
+HistoryEntry = namedtuple("HistoryEntry", ["page", "kwargs", "reactions", "inputs"])
+HistoryEntry.__doc__ = """Page displayed in a session, kept so going back to it
+doesn't need to run its callbacks and render it again.
+
+Attributes:
+    page (SessionPage): Page displayed.
+    kwargs (dict): Keywords arguments used to send the message of the page.
+    reactions (tuple of str): Reactions added to the message.
+    inputs (tuple of Discord.Message): Messages previously sent by the member
+        when the page was displayed.
+"""
+
+
+class Session:
+    """Class representing a member navigating the help.
+
+    Attributes:
+        id (str): Unique identifier of the session.
+        member (Discord.Member): Member navigating the help.
+        task (asyncio.Task): Task running the session.
+        message (Discord.Message): Message currently displayed by the bot, or
+            `None` if no message is displayed.
+        reactions (tuple of str): Reactions currently on the message.
+        cancelled (bool): Whether the session was explicitly cancelled.
+        suspended (bool): Whether the session was suspended, to be resumed
+            later : its message is kept.
+        prev_input (collections.deque of Discord.Message): Messages previously
+            sent by the member in this session, oldest first. Only the most
+            recent messages are kept.
+        history (collections.deque of HistoryEntry): Last pages displayed in
+            this session, most recent last.
+        overrides (dict): Attributes of the links and pages of the tree,
+            modified by the callbacks for this session only.
+    """
+
+    def __init__(self, member, max_inputs=None, max_history=0):
+        """Session constructor.
+
+        Args:
+            member (Discord.Member): Member navigating the help.
+            max_inputs (int, optional): Maximum number of messages of the
+                member kept in `prev_input`. Defaults to `None` (no limit).
+            max_history (int, optional): Maximum number of pages kept in
+                `history`. Defaults to `0` (no history).
+        """
+        self.id = uuid.uuid4().hex
+        self.member = member
+        self.task = asyncio.current_task()
+        self.message = None
+        self.reactions = ()
+        self.cancelled = False
+        self.suspended = False
+        self.prev_input = deque(maxlen=max_inputs)
+        self.history = deque(maxlen=max_history)
+        self.overrides = {}
+        self._pending = set()
+
+    def bind(self, link):
+        """Bind a link of the help tree to this session.
+
+        Args:
+            link (Link): Link of the help tree.
+
+        Returns:
+            SessionLink: The link, as seen by this session.
+        """
+        # A redirection only lasts until the link is taken again
+        overrides = self.overrides.get(link)
+        if overrides is not None:
+            overrides.pop("redirected", None)
+        return SessionLink(link, self)
+
+    def track(self, future):
+        """Keep track of a pending future (for example a reaction being added),
+        so it can be cancelled when the session ends.
+
+        Args:
+            future (asyncio.Future): Future to keep track of.
+
+        Returns:
+            asyncio.Future: The same future.
+        """
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def cancel(self):
+        """Cancel the session. The task running the session will stop, and
+        its message will be cleaned.
+        """
+        self.cancelled = True
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+    def suspend(self):
+        """Suspend the session. The task running the session will stop, but
+        its message is kept, so the session can be resumed later.
+        """
+        self.suspended = True
+        self.cancel()
+
+    def cancel_pending(self):
+        """Cancel all pending futures of the session."""
+        for future in list(self._pending):
+            future.cancel()
+        self._pending.clear()
+
+
+class _SessionProxy:
+    """Private class.
+
+    Proxy around an object of the help tree (link or page), as seen by a
+    session. Reading an attribute returns the value set by this session if any,
+    or the value of the tree. Setting an attribute only affects this session,
+    so concurrent sessions never see each other's changes.
+    """
+
+    def __init__(self, target, session):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "session", session)
+
+    def __getattr__(self, name):
+        overrides = self.session.overrides.get(self._target)
+        if overrides is not None and name in overrides:
+            return overrides[name]
+        return getattr(self._target, name)
+
+    def __setattr__(self, name, value):
+        self.session.overrides.setdefault(self._target, {})[name] = value
+
+    def _overridden(self):
+        """Private function.
+
+        Check if this session changed the object.
+
+        Returns:
+            bool: `True` if some attributes were set by this session.
+        """
+        return bool(self.session.overrides.get(self._target))
+
+
+class SessionLink(_SessionProxy):
+    """Class representing a `Link` as seen by a session. This is the link
+    given to the callbacks.
+
+    It can be used exactly like the link it wraps, but changing its attributes
+    (like `path`) only affects the current session. The pages it returns are
+    wrapped as well.
+
+    Attributes:
+        session (Session): Session seeing this link.
+    """
+
+    def page(self):
+        """Return the page selected by the callbacks for this session.
+
+        Returns:
+            SessionPage: The page selected by callbacks (or default choice).
+        """
+        overrides = self.session.overrides.get(self._target)
+        if overrides is not None and "redirected" in overrides:
+            return SessionPage(overrides["redirected"].materialize(), self.session)
+        return SessionPage(self.pages[self.path].materialize(), self.session)
+
+    def redirect(self, page):
+        """Display another page than the pages of this link, for this session
+        only. The redirection only lasts until the link is taken again.
+
+        Args:
+            page (Page): Page to display.
+        """
+        self.redirected = page
+
+
+class SessionPage(_SessionProxy):
+    """Class representing a `Page` as seen by a session.
+
+    It can be used exactly like the page it wraps, but changing its attributes
+    (like `msg`) only affects the current session. If the session didn't change
+    anything, the cached renders of the page are used.
+
+    Attributes:
+        session (Session): Session seeing this page.
+    """
+
+    def get_message(self):
+        """See `Page.get_message()`.
+
+        Returns:
+            str: Content to display to user.
+        """
+        if not self._overridden():
+            return self._target.get_message()
+        return type(self._target).get_message(self)
+
+    def get_embed(self):
+        """See `Page.get_embed()`.
+
+        Returns:
+            Embed: Embed to display to user.
+        """
+        if not self._overridden():
+            return self._target.get_embed()
+        return type(self._target).get_embed(self)
+
+    def get_view(self, controls, quit_react, prefix=""):
+        """See `Page.get_view()`.
+
+        Returns:
+            View: View to display to user.
+        """
+        if not self._overridden():
+            return self._target.get_view(controls, quit_react, prefix)
+        return type(self._target).get_view(self, controls, quit_react, prefix)
+
+    def reactions(self):
+        """See `Page.reactions()`. The parent and root set by this session are
+        used.
+
+        Returns:
+            tuple of str: Reactions (str) that the user can use for this page.
+        """
+        if not self._overridden():
+            return self._target.reactions()
+        return tuple(self._index())
+
+    def next_link(self, reaction=None):
+        """See `Page.next_link()`. The parent and root set by this session are
+        used.
+
+        Returns:
+            Link or None: The next link to display.
+        """
+        if not self._overridden():
+            return self._target.next_link(reaction)
+        return type(self._target).next_link(self, reaction)
+
+    async def prepare(self, member):
+        """See `Page.prepare()`. The content is set for this session only.
+
+        Args:
+            member (Discord.Member): Member who will see the page.
+        """
+        await type(self._target).prepare(self, member)
+
+    def _cached(self, key, build, *deps):
+        """Private function.
+
+        Renders specific to a session are not cached.
+        """
+        return build()
+
+    def _build_message(self):
+        """Private function.
+
+        Build the content of the page, with the attributes of this session.
+        """
+        return type(self._target)._build_message(self)
+
+    def _index(self):
+        """Private function.
+
+        Build the links index of the page, with the attributes of this
+        session. It's built again each time, like the renders, and never
+        stored in the overrides of the session.
+        """
+        return type(self._target)._build_index(self)
+
+
+class SessionManager:
+    """Class keeping track of the live sessions, and of the members waiting
+    for a session when the maximum number of sessions is reached.
+
+    Attributes:
+        max_sessions (int): Maximum number of concurrent sessions, or `None`
+            for no limit.
+        max_sessions_per_user (int): Maximum number of concurrent sessions for
+            a single user, or `None` for no limit. When a user opens a session
+            over this limit, their oldest session is cancelled.
+        max_queue (int): Maximum number of members waiting for a session.
+        max_inputs (int): Maximum number of messages of the member kept by
+            each session, or `None` for no limit.
+        max_history (int): Maximum number of pages kept in the history of
+            each session.
+    """
+
+    def __init__(self, max_sessions=None, max_sessions_per_user=None, max_queue=0, max_inputs=None, max_history=0):
+        """SessionManager constructor.
+
+        Args:
+            max_sessions (int, optional): Maximum number of concurrent
+                sessions. Defaults to `None` (no limit).
+            max_sessions_per_user (int, optional): Maximum number of concurrent
+                sessions for a single user. Defaults to `None` (no limit).
+            max_queue (int, optional): Maximum number of members waiting for a
+                session, when the maximum number of concurrent sessions is
+                reached. Defaults to `0` (nobody waits).
+            max_inputs (int, optional): Maximum number of messages of the
+                member kept by each session. Defaults to `None` (no limit).
+            max_history (int, optional): Maximum number of pages kept in the
+                history of each session. Defaults to `0` (no history).
+        """
+        self.max_sessions = max_sessions
+        self.max_sessions_per_user = max_sessions_per_user
+        self.max_queue = max_queue
+        self.max_inputs = max_inputs
+        self.max_history = max_history
+        self._sessions = {}
+        self._queue = []
+        # Slots freed by a session, and given to a member of the queue who
+        # didn't open their session yet
+        self._reserved = 0
+
+    def __len__(self):
+        """Number of live sessions."""
+        return sum(len(sessions) for sessions in self._sessions.values())
+
+    def count(self, member=None):
+        """Count the live sessions.
+
+        Args:
+            member (Discord.Member, optional): If given, only count the sessions
+                of this member. Defaults to `None`.
+
+        Returns:
+            int: Number of live sessions.
+        """
+        if member is None:
+            return len(self)
+        return len(self._sessions.get(member.id, []))
+
+    def sessions(self, member=None):
+        """List the live sessions.
+
+        Args:
+            member (Discord.Member, optional): If given, only list the sessions
+                of this member. Defaults to `None`.
+
+        Returns:
+            list of Session: Live sessions, oldest first.
+        """
+        if member is None:
+            return [s for sessions in self._sessions.values() for s in sessions]
+        return list(self._sessions.get(member.id, []))
+
+    def waiting(self):
+        """Count the members waiting for a session.
+
+        Returns:
+            int: Number of members in the queue.
+        """
+        return len(self._queue)
+
+    def task(self, member):
+        """Find the task running the most recent session of a member, or
+        waiting for a session.
+
+        Args:
+            member (Discord.Member): Member.
+
+        Returns:
+            asyncio.Task: Task of the member, or `None` if the member has no
+                live session and isn't waiting.
+        """
+        sessions = self._sessions.get(member.id)
+        if sessions:
+            return sessions[-1].task
+        for ticket in self._queue:
+            if ticket.member.id == member.id:
+                return ticket.task
+        return None
+
+    def open(self, member):
+        """Open a new session for the given member, running in the current
+        task.
+
+        Args:
+            member (Discord.Member): Member navigating the help.
+
+        Throws:
+            SessionLimitError: The maximum number of concurrent sessions is
+                reached.
+
+        Returns:
+            Session: The new session.
+        """
+        user_sessions = self._sessions.get(member.id, [])
+        if self.max_sessions_per_user is not None:
+            # Make room by cancelling the oldest sessions of this user
+            for session in user_sessions[: self._replaced(member)]:
+                self._forget(session)
+                session.cancel()
+
+        if self.max_sessions is not None and len(self) + self._reserved >= self.max_sessions:
+            raise SessionLimitError("Too many concurrent sessions ({})".format(self.max_sessions))
+
+        session = Session(member, self.max_inputs, self.max_history)
+        self._sessions.setdefault(member.id, []).append(session)
+        return session
+
+    async def acquire(self, member, on_position=None):
+        """Open a new session for the given member, running in the current
+        task. If the maximum number of concurrent sessions is reached, wait in
+        the queue until a session ends. Members are admitted in the order they
+        arrived.
+
+        Args:
+            member (Discord.Member): Member navigating the help.
+            on_position (function, optional): Function called with the
+                position of the member in the queue (starting at `1`), each
+                time it changes. Defaults to `None`.
+
+        Throws:
+            SessionLimitError: The maximum number of concurrent sessions is
+                reached, and the queue is full.
+
+        Returns:
+            Session: The new session.
+        """
+        if not self._queue and self._free(member) > 0:
+            return self.open(member)
+        if len(self._queue) >= self.max_queue:
+            raise SessionLimitError("Too many concurrent sessions ({}) and waiting members".format(self.max_sessions))
+
+        ticket = _Ticket(member, on_position)
+        self._queue.append(ticket)
+        ticket.notify(len(self._queue))
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.cancelled():
+                # Still waiting : leave the queue
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+            else:
+                # Already admitted : give the slot to the next member
+                self._reserved -= 1
+            self._admit()
+            raise
+        self._reserved -= 1
+        return self.open(member)
+
+    def close(self, session):
+        """Forget about a session. It's called when the session ends. The slot
+        freed is given to the first member of the queue.
+
+        Args:
+            session (Session): Session to forget.
+        """
+        self._forget(session)
+        self._admit()
+
+    def cancel(self, member=None):
+        """Cancel live sessions.
+
+        Args:
+            member (Discord.Member, optional): If given, only cancel the
+                sessions of this member. Defaults to `None` (cancel all
+                sessions).
+        """
+        for session in self.sessions(member):
+            session.cancel()
+
+    ############################## Private #####################################
+
+    def _forget(self, session):
+        """Private function.
+
+        Forget about a session, without giving its slot to the queue.
+
+        Args:
+            session (Session): Session to forget.
+        """
+        user_sessions = self._sessions.get(session.member.id, [])
+        if session in user_sessions:
+            user_sessions.remove(session)
+        if not user_sessions:
+            self._sessions.pop(session.member.id, None)
+
+    def _replaced(self, member):
+        """Private function.
+
+        Count the sessions of a member cancelled when they open a new one,
+        because of `max_sessions_per_user`.
+
+        Args:
+            member (Discord.Member): Member opening a session.
+
+        Returns:
+            int: Number of sessions cancelled.
+        """
+        if self.max_sessions_per_user is None:
+            return 0
+        return max(self.count(member) - self.max_sessions_per_user + 1, 0)
+
+    def _free(self, member=None):
+        """Private function.
+
+        Count the sessions that can be opened without waiting.
+
+        Args:
+            member (Discord.Member, optional): If given, the sessions of this
+                member cancelled to open a new one are counted as free.
+                Defaults to `None`.
+
+        Returns:
+            int or float: Number of sessions that can be opened.
+        """
+        if self.max_sessions is None:
+            return float("inf")
+        replaced = self._replaced(member) if member is not None else 0
+        return self.max_sessions - len(self) - self._reserved + replaced
+
+    def _admit(self):
+        """Private function.
+
+        Admit the first members of the queue while there are free slots, and
+        tell the others their new position.
+        """
+        while self._queue and self._free() > 0:
+            ticket = self._queue.pop(0)
+            if not ticket.future.done():
+                ticket.future.set_result(None)
+                self._reserved += 1
+        for position, ticket in enumerate(self._queue, 1):
+            ticket.notify(position)
+
+
+class _Ticket:
+    """Private class.
+
+    Member waiting in the queue of the `SessionManager`, until a session is
+    available.
+    """
+
+    def __init__(self, member, on_position):
+        self.member = member
+        self.task = asyncio.current_task()
+        self.future = asyncio.get_running_loop().create_future()
+        self.position = None
+        self._on_position = on_position
+
+    def notify(self, position):
+        """Tell the member their position in the queue, if it changed.
+
+        Args:
+            position (int): Position in the queue, starting at `1`.
+        """
+        if position != self.position:
+            self.position = position
+            if self._on_position is not None:
+                self._on_position(position)
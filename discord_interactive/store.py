@@ -0,0 +1,234 @@
+"""Module containing the definition of the session stores. A session store
+keeps a checkpoint of each live session (who, which message, which page), so
+the sessions can be resumed after the bot restarts. `SessionStore` defines
+the interface used by the `Help`, and `SQLiteSessionStore` is an
+implementation saving the checkpoints in a SQLite database.
+"""
+
+import asyncio
+import json
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from discord_interactive.background import run_in_background
+
+
+Checkpoint = namedtuple("Checkpoint", ["session", "user", "channel", "message", "page", "inputs"])
+Checkpoint.__doc__ = """State of a session, saved at each hop.
+
+Attributes:
+    session (str): ID of the session.
+    user (int): ID of the user navigating the help.
+    channel (int): ID of the channel where the help is displayed.
+    message (int): ID of the message displaying the current page.
+    page (str): ID of the current page.
+    inputs (list of str): Content of the messages previously sent by the user
+        in this session.
+"""
+
+
+class SessionStore:
+    """Interface of a session store. All methods do nothing by default,
+    subclass it and override them to save the checkpoints where you need.
+
+    The `Help` calls `save()` after displaying each page, and `delete()` when
+    the session ends. These calls are on the path of every hop, so they should
+    return quickly (for example by buffering the writes).
+    """
+
+    async def load(self):
+        """Load the checkpoints of the sessions to resume.
+
+        Returns:
+            list of Checkpoint: Checkpoints saved.
+        """
+        return []
+
+    async def save(self, checkpoint):
+        """Save the checkpoint of a session, replacing the previous one.
+
+        Args:
+            checkpoint (Checkpoint): Checkpoint to save.
+        """
+
+    async def delete(self, session_id):
+        """Forget the checkpoint of a session.
+
+        Args:
+            session_id (str): ID of the session.
+        """
+
+    async def flush(self):
+        """Write the buffered checkpoints, if any."""
+
+    async def close(self):
+        """Write the buffered checkpoints, and release the resources of the
+        store.
+        """
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store saving the checkpoints in a SQLite database.
+
+    Writes are buffered, and written together in a single transaction every
+    `flush_interval` seconds (or as soon as `batch_size` sessions changed).
+    Only the last checkpoint of each session is written. The database is
+    accessed from a dedicated thread, so it never blocks the event loop.
+
+    Attributes:
+        path (str): Path of the database.
+        flush_interval (float): Maximum number of seconds a write is buffered.
+        batch_size (int): Number of buffered writes triggering a flush.
+    """
+
+    def __init__(self, path, flush_interval=1.0, batch_size=100):
+        """SQLiteSessionStore constructor.
+
+        Args:
+            path (str): Path of the database. It's created if it doesn't exist.
+            flush_interval (float, optional): Maximum number of seconds a write
+                is buffered. Defaults to `1`.
+            batch_size (int, optional): Number of buffered writes triggering a
+                flush. Defaults to `100`.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = {}
+        self._flusher = None
+
+    async def load(self):
+        """See `SessionStore.load()`.
+
+        Returns:
+            list of Checkpoint: Checkpoints saved.
+        """
+        await self.flush()
+        return await self._run(self._select)
+
+    async def save(self, checkpoint):
+        """See `SessionStore.save()`.
+
+        Args:
+            checkpoint (Checkpoint): Checkpoint to save.
+        """
+        self._pending[checkpoint.session] = checkpoint
+        await self._schedule()
+
+    async def delete(self, session_id):
+        """See `SessionStore.delete()`.
+
+        Args:
+            session_id (str): ID of the session.
+        """
+        self._pending[session_id] = None
+        await self._schedule()
+
+    async def flush(self):
+        """See `SessionStore.flush()`."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self._run(self._write, batch)
+        except BaseException:
+            # Keep the writes for the next flush, unless they were replaced
+            self._pending = {**batch, **self._pending}
+            raise
+
+    async def close(self):
+        """See `SessionStore.close()`."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    ############################## Private #####################################
+
+    async def _schedule(self):
+        """Private function.
+
+        Flush the buffered writes now if there are enough of them, or make
+        sure they are flushed after `flush_interval` seconds.
+        """
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flusher is None or self._flusher.done():
+            # Nobody waits for the flusher
+            self._flusher = run_in_background(self._flush_later(), "the flush of the session store")
+
+    async def _flush_later(self):
+        """Private function.
+
+        Flush the buffered writes after `flush_interval` seconds.
+        """
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def _run(self, func, *args):
+        """Private function.
+
+        Run a function accessing the database in the thread of the store.
+
+        Args:
+            func (function): Function to run.
+            *args: Arguments given to `func`.
+
+        Returns:
+            Result of `func`.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        """Private function.
+
+        Open the database (in the thread of the store), and create the table
+        if needed.
+
+        Returns:
+            sqlite3.Connection: Connection to the database.
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (session TEXT PRIMARY KEY, user INTEGER, channel INTEGER, "
+                "message INTEGER, page TEXT, inputs TEXT)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _select(self):
+        """Private function.
+
+        Read all checkpoints (in the thread of the store).
+
+        Returns:
+            list of Checkpoint: Checkpoints saved.
+        """
+        rows = self._connect().execute("SELECT session, user, channel, message, page, inputs FROM sessions")
+        return [Checkpoint(*row[:5], json.loads(row[5])) for row in rows]
+
+    def _write(self, batch):
+        """Private function.
+
+        Write a batch of checkpoints in a single transaction (in the thread of
+        the store).
+
+        Args:
+            batch (dict): Checkpoints to save by session ID, or `None` for the
+                sessions to forget.
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)",
+                [(*c[:5], json.dumps(c.inputs)) for c in batch.values() if c is not None],
+            )
+            conn.executemany("DELETE FROM sessions WHERE session = ?", [(s,) for s, c in batch.items() if c is None])
@@ -9,6 +9,8 @@ reqs = ["discord.py~=2.3"]
 extras_require = {
     "hook": ["pre-commit~=4.0"],
     "lint": ["black~=24.1", "ruff~=0.1"],
+    "yaml": ["PyYAML>=5.1"],
+    "toml": ['tomli>=1.1; python_version < "3.11"'],
     "docs": ["mkdocs-material~=9.0", "mkdocstrings[python]~=0.18", "mike~=2.0"],
 }
 extras_require["all"] = sum(extras_require.values(), [])
@@ -0,0 +1,37 @@
+"""Tests of the coroutines run in the background."""
+
+import asyncio
+import logging
+
+from discord_interactive.background import run_in_background
+
+
+def test_error_is_logged(caplog):
+    """The error of a coroutine nobody waits for is logged."""
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def run():
+        run_in_background(fail(), "the test")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    with caplog.at_level(logging.ERROR, logger="discord_interactive.background"):
+        asyncio.run(run())
+    assert caplog.records[0].getMessage() == "Error in the test"
+    assert isinstance(caplog.records[0].exc_info[1], RuntimeError)
+
+
+def test_cancellation_is_not_logged(caplog):
+    """A cancelled coroutine is not an error."""
+
+    async def run():
+        future = run_in_background(asyncio.sleep(1), "the test")
+        await asyncio.sleep(0)
+        future.cancel()
+        await asyncio.sleep(0)
+
+    with caplog.at_level(logging.ERROR, logger="discord_interactive.background"):
+        asyncio.run(run())
+    assert not caplog.records
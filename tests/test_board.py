@@ -0,0 +1,91 @@
+"""Tests of the help messages shared in a channel."""
+
+import asyncio
+
+from benchmarks.fake_discord import FakeClient, FakeDMChannel, FakeHTTP, FakeMember
+from discord_interactive import Help, Page
+
+
+async def settle():
+    """Let the help process the pending events."""
+    await asyncio.sleep(0.05)
+
+
+def make_tree(seen):
+    """Build a root with two pages, remembering who took the first link."""
+
+    async def remember(link, member, prev_input):
+        seen.append(member.id)
+
+    root = Page("root")
+    a, b = Page("page A"), Page("page B")
+    root.link(a, callbacks=[remember])
+    root.link(b)
+    a.link(Page("page A.A"))
+    root.root_of([a, b])
+    return root
+
+
+def test_each_member_navigates_alone():
+    """A click on the board shows the next page to this member only, in an
+    ephemeral message, which is then edited at each click.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        first, second = FakeMember(http), FakeMember(http)
+        seen = []
+        board = await Help(client, make_tree(seen)).post(FakeDMChannel(http))
+        assert board.message.view is not None
+
+        client.click(first, "1⃣", message=board.message, prefix=board.prefix)
+        client.click(second, "2⃣", message=board.message, prefix=board.prefix)
+        await settle()
+        assert first.ephemeral_channel.last_message.embed.description.startswith("page A")
+        assert second.ephemeral_channel.last_message.embed.description.startswith("page B")
+        assert seen == [first.id]
+        assert http.calls["followup"] == 2
+
+        ephemeral = first.ephemeral_channel.last_message
+        client.click(first, "1⃣", message=ephemeral, prefix=board.prefix)
+        await settle()
+        assert ephemeral.embed.description.startswith("page A.A")
+        assert http.calls["edit_original_response"] == 1
+        assert second.ephemeral_channel.last_message.embed.description.startswith("page B")
+        # Only the responses to the interactions : no message, no reaction
+        assert set(http.calls) == {"send", "interaction_response", "followup", "edit_original_response"}
+
+        await board.close()
+        assert board.message is None
+        assert http.calls["delete"] == 1
+
+    asyncio.run(run())
+
+
+def test_quit_and_click_the_board_again():
+    """Quitting deletes the ephemeral message, and clicking the board starts
+    again from the root.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+        board = await Help(client, make_tree([])).post(FakeDMChannel(http))
+
+        client.click(member, "1⃣", message=board.message, prefix=board.prefix)
+        await settle()
+        ephemeral = member.ephemeral_channel.last_message
+        client.click(member, "❌", message=ephemeral, prefix=board.prefix)
+        await settle()
+        assert ephemeral.deleted
+        assert member.id not in board.members
+
+        client.click(member, "2⃣", message=board.message, prefix=board.prefix)
+        await settle()
+        assert member.ephemeral_channel.last_message.embed.description.startswith("page B")
+
+        await board.close()
+
+    asyncio.run(run())
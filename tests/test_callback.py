@@ -0,0 +1,54 @@
+"""Tests of the callbacks of the links, run with a timeout and a fallback page."""
+
+import asyncio
+
+from benchmarks.fake_discord import FakeClient, FakeHTTP, FakeMember
+from discord_interactive import Callback, Help, Page
+
+
+async def settle():
+    """Let the help process the pending events."""
+    await asyncio.sleep(0.05)
+
+
+async def hang(link, member, prev_input):
+    """Callback which never returns in time."""
+    await asyncio.sleep(10)
+
+
+def test_navigate_back_from_fallback():
+    """When a callback times out, the fallback page is displayed, and the user
+    can go back to the page they came from.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+
+        root = Page("root")
+        a = Page("page A")
+        fallback = Page("unavailable")
+        root.link(a, callbacks=[Callback(hang, timeout=0.01, fallback=fallback)])
+
+        help = Help(client, root)
+        task = asyncio.ensure_future(help.display(member))
+        await settle()
+        channel = member.dm_channel
+
+        client.react(member, "1⃣")
+        await settle()
+        assert channel.last_message.embed.description.startswith("unavailable")
+        assert "🔙" in channel.last_message.reactions
+
+        client.react(member, "🔙")
+        await settle()
+        assert channel.last_message.embed.description.startswith("root")
+
+        client.react(member, "❌")
+        await asyncio.wait_for(task, 1)
+
+        # The shared fallback page is not changed
+        assert fallback.parent is None
+
+    asyncio.run(run())
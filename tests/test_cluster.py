@@ -0,0 +1,137 @@
+"""Tests of the cluster forwarding the events between the nodes."""
+
+import asyncio
+import types
+
+import discord
+
+from benchmarks.fake_discord import FakeClient, FakeDMChannel, FakeHTTP, FakeInteraction, FakeMember, FakeMessage
+from discord_interactive.cluster import (
+    Cluster,
+    LocalDirectory,
+    LocalTransport,
+    UnixSocketTransport,
+    _deserialize,
+    _serialize,
+)
+from discord_interactive.router import EventRouter
+
+
+def raw_reaction(member, message, guild_id=None):
+    """Build the payload of a raw reaction event."""
+    return types.SimpleNamespace(
+        emoji=discord.PartialEmoji(name="1⃣"),
+        user_id=member.id,
+        message_id=message.id,
+        channel_id=message.channel.id,
+        guild_id=guild_id,
+    )
+
+
+async def make_nodes(transport):
+    """Build two nodes sharing a directory and a transport, with their
+    routers.
+    """
+    http = FakeHTTP(rate=1000)
+    directory = LocalDirectory()
+    nodes = []
+    for name in ("a", "b"):
+        cluster = Cluster(name, directory, transport)
+        router = EventRouter(FakeClient(http), cluster)
+        await cluster.start(router)
+        nodes.append((cluster, router))
+    return http, nodes
+
+
+def test_serialize_round_trip():
+    """The events of direct messages are rebuilt with the attributes used by
+    the help, and the events of guilds are not forwarded.
+    """
+    http = FakeHTTP()
+    member = FakeMember(http)
+    message = FakeMessage(FakeDMChannel(http))
+
+    event, (reaction, user) = _deserialize(_serialize("raw_reaction_add", raw_reaction(member, message)))
+    assert event == "reaction_add"
+    assert (reaction.emoji, reaction.message.id, reaction.message.channel.id) == ("1⃣", message.id, message.channel.id)
+    assert user.id == member.id
+
+    said = FakeMessage(message.channel, "hello", author=member)
+    event, (received,) = _deserialize(_serialize("message", said))
+    assert event == "message"
+    assert (received.content, received.author.id, received.channel.id) == ("hello", member.id, message.channel.id)
+
+    click = FakeInteraction(member, message, {"custom_id": "select", "values": ["2⃣"]})
+    event, (reaction, _) = _deserialize(_serialize("interaction", click))
+    assert (event, reaction.emoji) == ("reaction_add", "2⃣")
+
+    assert _serialize("raw_reaction_add", raw_reaction(member, message, guild_id=1)) is None
+
+
+def test_events_forwarded_to_the_owner():
+    """An event received by a node for a session of another node is given to
+    the owner, and an interaction is acknowledged by the node receiving it.
+    """
+
+    async def run():
+        http, ((a, router_a), (b, router_b)) = await make_nodes(LocalTransport())
+        member = FakeMember(http)
+        message = FakeMessage(FakeDMChannel(http))
+        await a.claim(message)
+
+        waiter = asyncio.ensure_future(router_a.wait(member, message))
+        await asyncio.sleep(0)
+        router_b._handler("raw_reaction_add")(raw_reaction(member, message))
+        reaction, _ = await asyncio.wait_for(waiter, 1)
+        assert reaction.emoji == "1⃣"
+        assert (b.forwarded, a.received) == (1, 1)
+
+        waiter = asyncio.ensure_future(router_a.wait(member, message))
+        await asyncio.sleep(0)
+        router_b._handler("interaction")(FakeInteraction(member, message, {"custom_id": "2⃣"}))
+        reaction, _ = await asyncio.wait_for(waiter, 1)
+        assert reaction.emoji == "2⃣"
+        assert http.calls["interaction_response"] == 1
+
+        # Released messages are not forwarded anymore
+        await a.release(message)
+        router_b._handler("raw_reaction_add")(raw_reaction(member, message))
+        await asyncio.sleep(0.01)
+        assert b.forwarded == 2
+
+    asyncio.run(run())
+
+
+def test_events_of_the_bot_not_forwarded():
+    """The reactions added by the bot itself are never forwarded."""
+
+    async def run():
+        http, ((a, _), (b, router_b)) = await make_nodes(LocalTransport())
+        message = FakeMessage(FakeDMChannel(http))
+        await a.claim(message)
+        router_b._handler("raw_reaction_add")(raw_reaction(router_b.client.user, message))
+        await asyncio.sleep(0.01)
+        assert (b.forwarded, a.received) == (0, 0)
+
+    asyncio.run(run())
+
+
+def test_unix_socket_transport(tmp_path):
+    """The events are delivered between nodes through Unix sockets."""
+
+    async def run():
+        received = asyncio.Queue()
+        a, b = UnixSocketTransport(str(tmp_path)), UnixSocketTransport(str(tmp_path))
+        await a.start("a", received.put_nowait)
+        await b.start("b", lambda event: None)
+
+        await b.send("a", {"event": "message", "content": "hello"})
+        await b.send("a", {"event": "message", "content": "again"})
+        assert await asyncio.wait_for(received.get(), 1) == {"event": "message", "content": "hello"}
+        assert (await asyncio.wait_for(received.get(), 1))["content"] == "again"
+
+        await b.close()
+        await a.close()
+        assert not list(tmp_path.iterdir())
+
+    asyncio.run(run())
@@ -0,0 +1,33 @@
+"""Tests of the validation and the compilation of a help tree."""
+
+from discord_interactive import ListPage, Page, compile_pages, validate_tree
+
+
+def test_list_page_reaction_collision():
+    """A link using the reaction of the `◀` or `▶` link of a list page is a
+    collision.
+    """
+    root = Page("root")
+    items = ListPage(list(range(30)), "items")
+    root.link(items)
+    items.link(Page("other"), reaction="▶")
+
+    problems = validate_tree(root)
+    assert len(problems) == 1
+    assert "▶" in problems[0]
+
+
+def test_list_page_tables_match_reactions():
+    """The navigation tables of a list page list the same reactions as the
+    page.
+    """
+    root = Page("root")
+    items = ListPage(list(range(30)), "items")
+    root.link(items)
+    items.link(Page("other"))
+
+    tree = compile_pages(root, freeze=False)
+    number = tree.tables.ids.index(items.id)
+    reactions = tree.tables.reactions[number]
+    assert tuple(reaction for reaction, _ in reactions) == items.reactions()
+    assert reactions[0][1] == (number,)
@@ -0,0 +1,151 @@
+"""Tests of the navigation of the `Help`, and of the requests it sends."""
+
+import asyncio
+
+from benchmarks.fake_discord import FakeClient, FakeHTTP, FakeMember
+from discord_interactive import Controls, Help, Page
+
+
+async def settle():
+    """Let the help process the pending events."""
+    await asyncio.sleep(0.05)
+
+
+def test_edit_in_place_keeps_shared_reactions():
+    """Going back from a child to its parent keeps the reactions they share,
+    and only adds the links of the parent.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+
+        root = Page("root")
+        a = Page("page A")
+        root.link(a)
+        for name in ["A.A", "A.B", "A.C"]:
+            a.link(Page("page " + name))
+        root.root_of(a.links[0].pages)
+
+        task = asyncio.ensure_future(Help(client, root, edit_in_place=True).display(member))
+        await settle()
+        message = member.dm_channel.last_message
+        client.react(member, "1⃣")
+        await settle()
+        client.react(member, "1⃣")
+        await settle()
+        assert message.reactions == ["❌", "🔙", "🔝"]
+
+        http.calls.clear()
+        client.react(member, "🔙")
+        await settle()
+        assert member.dm_channel.last_message is message
+        assert message.embed.description.startswith("page A")
+        assert message.reactions == ["❌", "🔙", "1⃣", "2⃣", "3⃣"]
+        assert http.calls == {"edit": 1, "remove_reaction": 1, "add_reaction": 3}
+
+        client.react(member, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_edit_in_place_resends_when_cheaper():
+    """When most reactions change, a new message is sent instead."""
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+
+        root = Page("root")
+        for i in range(8):
+            root.link(Page("page {}".format(i)))
+
+        task = asyncio.ensure_future(Help(client, root, edit_in_place=True).display(member))
+        await settle()
+        message = member.dm_channel.last_message
+
+        http.calls.clear()
+        client.react(member, "1⃣")
+        await settle()
+        assert message.deleted
+        assert member.dm_channel.last_message.reactions == ["🔙", "❌"]
+        assert http.calls == {"delete": 1, "send": 1, "add_reaction": 2}
+
+        client.react(member, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_interaction_deferred_before_callbacks():
+    """With buttons, the interaction is acknowledged before running the
+    callbacks, and the page then edits the original response.
+    """
+
+    async def slow(link, member, prev_input):
+        await asyncio.sleep(0.2)
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+
+        root = Page("root")
+        root.link(Page("page A"), callbacks=[slow])
+
+        task = asyncio.ensure_future(Help(client, root, controls=Controls.BUTTONS).display(member))
+        await settle()
+        client.click(member, "1⃣")
+        await settle()
+        assert http.calls["interaction_response"] == 1
+        assert not member.dm_channel.last_message.embed.description.startswith("page A")
+
+        await asyncio.sleep(0.2)
+        assert http.calls["edit_original_response"] == 1
+        assert member.dm_channel.last_message.embed.description.startswith("page A")
+
+        client.click(member, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_reattach_sends_the_page_again():
+    """Calling `display()` again for a member with a live session sends its
+    current page again, instead of opening another session.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+
+        root = Page("root")
+        root.link(Page("page A"))
+
+        help = Help(client, root, reattach=True)
+        first = asyncio.ensure_future(help.display(member))
+        await settle()
+        client.react(member, "1⃣")
+        await settle()
+        message = member.dm_channel.last_message
+
+        second = asyncio.ensure_future(help.display(member))
+        await settle()
+        assert message.deleted
+        assert member.dm_channel.last_message is not message
+        assert member.dm_channel.last_message.embed.description.startswith("page A")
+        assert member.dm_channel.last_message.reactions == ["🔙", "❌"]
+        assert len(help.sessions) == 1
+
+        client.react(member, "🔙")
+        await settle()
+        assert member.dm_channel.last_message.embed.description.startswith("root")
+
+        client.react(member, "❌")
+        await asyncio.wait_for(asyncio.gather(first, second), 1)
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+"""Tests of the help trees loaded from a document."""
+
+import pytest
+
+from discord_interactive import TreeError, compile_tree
+
+
+def test_collision_with_root_reaction():
+    """A link using the reaction of the root link is rejected, like with
+    `validate_tree()`.
+    """
+    document = {
+        "root": "home",
+        "pages": {
+            "home": {"links": [{"to": "commands"}]},
+            "commands": {"links": [{"to": "guild", "reaction": "🔝"}]},
+            "guild": {},
+        },
+    }
+    with pytest.raises(TreeError, match="🔝 is used by several links of the page 'commands'"):
+        compile_tree(document)
+
+
+def test_invalid_color():
+    """A malformed color is reported with the page it's used in."""
+    with pytest.raises(TreeError, match="page 'home'"):
+        compile_tree({"pages": {"home": {"color": "#not a color"}}})
+
+
+def test_parent_as_a_list():
+    """A parent given as a list of one page is the page, and a parent with
+    several pages is rejected.
+    """
+    document = {"pages": {"home": {"links": [{"to": "guild"}]}, "guild": {"parent": ["home"]}}}
+    tree = compile_tree(document)
+    assert tree.pages["guild"].parent.pages == [tree.root]
+
+    document["pages"]["guild"]["parent"] = ["home", "guild"]
+    with pytest.raises(TreeError, match="parent of page 'guild' should be a single page"):
+        compile_tree(document)
+
+
+def test_msg_not_a_string():
+    """A message which is not a string, like `msg: null` in YAML, is
+    rejected.
+    """
+    with pytest.raises(TreeError, match="`msg` of page 'home' should be a string"):
+        compile_tree({"pages": {"home": {"msg": None}}})
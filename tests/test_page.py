@@ -0,0 +1,174 @@
+"""Tests of the pages : renders cache, links index, lazy and list pages."""
+
+import asyncio
+
+from benchmarks.fake_discord import FakeClient, FakeHTTP, FakeMember
+from discord_interactive import Help, LazyPage, ListPage, LRUCache, Page
+from discord_interactive.link import MsgLink, ReactLink
+from discord_interactive.session import Session, SessionPage
+
+
+async def settle():
+    """Let the help process the pending events."""
+    await asyncio.sleep(0.05)
+
+
+def test_render_and_index_follow_links_changes():
+    """Changing the links of a page after a render updates the render and the
+    reactions of the page.
+    """
+    page = Page("root")
+    child = Page("child")
+    assert page.get_embed().description == "root\n\n"
+    assert page.reactions() == ()
+
+    page.links = [ReactLink("1⃣", child, "go")]
+    assert "go" in page.get_embed().description
+    assert page.next_link("1⃣") is page.links[0]
+
+    page.links.append(ReactLink("2⃣", child, "again"))
+    assert "again" in page.get_message()
+    assert page.reactions() == ("1⃣", "2⃣")
+
+    del page.links[0]
+    assert page.next_link("1⃣") is None
+
+    page.msg_link = MsgLink(child, "type something")
+    assert "type something" in page.get_message()
+    assert page.next_link() is page.msg_link
+
+
+def test_session_index_not_stored_in_overrides():
+    """The links index of a page changed by a session is built with the
+    attributes of the session, but isn't stored in its overrides.
+    """
+
+    async def run():
+        page = Page("root")
+        page.link(Page("child"), "1⃣", "go")
+        page.freeze()
+        session = Session(member=None)
+        seen = SessionPage(page, session)
+        seen.parent = ReactLink("🔙", Page("parent"))
+
+        assert seen.reactions() == ("1⃣", "🔙")
+        assert seen.next_link("🔙") is seen.parent
+        assert set(session.overrides[page]) == {"parent"}
+        assert page.reactions() == ("1⃣",)
+
+    asyncio.run(run())
+
+
+def test_lazy_pages_built_on_navigation():
+    """A lazy page is built when a user navigates to it, gets its parent and
+    root, and is built again once evicted from its cache.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+        built = []
+
+        def provider(name):
+            def build():
+                built.append(name)
+                page = Page("page " + name)
+                page.link(Page("page {}.A".format(name)))
+                return page
+
+            return build
+
+        cache = LRUCache(1)
+        root = Page("root")
+        root.link(LazyPage(provider("A"), cache))
+        root.link(LazyPage(provider("B"), cache))
+        root.root_of(root.links[0].pages + root.links[1].pages)
+
+        task = asyncio.ensure_future(Help(client, root).display(member))
+        await settle()
+        assert built == []
+
+        for reaction in ["1⃣", "1⃣"]:
+            client.react(member, reaction)
+            await settle()
+        # The subtree gets the root of the lazy page
+        assert member.dm_channel.last_message.embed.description.startswith("page A.A")
+        assert set(member.dm_channel.last_message.reactions) == {"❌", "🔙", "🔝"}
+        assert built == ["A"]
+
+        for reaction in ["🔝", "2⃣", "🔙", "1⃣"]:
+            client.react(member, reaction)
+            await settle()
+        assert built == ["A", "B", "A"]
+        assert member.dm_channel.last_message.embed.description.startswith("page A")
+
+        client.react(member, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_list_pages_offset_per_session():
+    """Each member turns the pages of a list on their own, and the offset
+    stays in the list.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        first, second = FakeMember(http), FakeMember(http)
+        help = Help(client, ListPage(range(25), "Items", per_page=10))
+
+        tasks = [asyncio.ensure_future(help.display(member)) for member in (first, second)]
+        await settle()
+        assert set(first.dm_channel.last_message.reactions) == {"◀", "▶", "❌"}
+
+        for reaction in ["▶", "▶", "▶"]:
+            client.react(first, reaction)
+            await settle()
+        assert first.dm_channel.last_message.embed.description.endswith("24\n(21-25 / 25)")
+        assert second.dm_channel.last_message.embed.description.endswith("9\n(1-10 / 25)")
+
+        client.react(first, "◀")
+        client.react(second, "◀")
+        await settle()
+        assert first.dm_channel.last_message.embed.description.endswith("(11-20 / 25)")
+        assert second.dm_channel.last_message.embed.description.endswith("(1-10 / 25)")
+
+        for member in (first, second):
+            client.react(member, "❌")
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+
+    asyncio.run(run())
+
+
+def test_list_pages_fetched():
+    """The items can be fetched by slices, and going past the end of the list
+    goes back to the last items.
+    """
+
+    async def run():
+        fetched = []
+
+        async def fetch(offset, limit):
+            fetched.append(offset)
+            for i in range(offset, min(offset + limit, 15)):
+                yield i
+
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+        task = asyncio.ensure_future(Help(client, ListPage(fetch, "Items", per_page=10)).display(member))
+        await settle()
+        client.react(member, "▶")
+        await settle()
+        client.react(member, "▶")
+        await settle()
+        assert fetched == [0, 10, 20, 10]
+        assert member.dm_channel.last_message.embed.description.endswith("\n14")
+
+        client.react(member, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
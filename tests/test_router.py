@@ -0,0 +1,140 @@
+"""Tests of the router dispatching the Discord events to the sessions."""
+
+import asyncio
+import types
+
+import discord
+
+from benchmarks.fake_discord import FakeClient, FakeDMChannel, FakeHTTP, FakeInteraction, FakeMember, FakeMessage
+from discord_interactive.router import EventRouter
+
+
+def raw_reaction(member, message, emoji="1⃣"):
+    """Build the payload of a raw reaction event."""
+    return types.SimpleNamespace(
+        emoji=discord.PartialEmoji(name=emoji),
+        user_id=member.id,
+        message_id=message.id,
+        channel_id=message.channel.id,
+        guild_id=None,
+    )
+
+
+def make_router():
+    """Build a router, a member and the message shown to the member."""
+    http = FakeHTTP(rate=1000)
+    member = FakeMember(http)
+    message = FakeMessage(FakeDMChannel(http))
+    return EventRouter(FakeClient(http)), member, message
+
+
+def test_reactions_routed_by_user_and_message():
+    """A reaction is given to the session waiting for this user on this
+    message only, even if the message is not cached.
+    """
+
+    async def run():
+        router, member, message = make_router()
+        other = FakeMember(member.http)
+        waiter = asyncio.ensure_future(router.wait(member, message))
+        await asyncio.sleep(0)
+
+        assert not router.on_raw_reaction_add(raw_reaction(other, message))
+        assert not router.on_raw_reaction_add(raw_reaction(member, FakeMessage(message.channel)))
+        assert router.on_raw_reaction_add(raw_reaction(member, message, "2⃣"))
+        reaction, user_message = await waiter
+        assert reaction.emoji == "2⃣" and reaction.message.id == message.id
+        assert user_message is None
+        assert not router._reaction_waiters
+
+    asyncio.run(run())
+
+
+def test_unreact_and_messages_only_when_asked():
+    """Removing a reaction and sending a message are inputs only if the
+    session asked for them.
+    """
+
+    async def run():
+        router, member, message = make_router()
+        waiter = asyncio.ensure_future(router.wait(member, message))
+        await asyncio.sleep(0)
+        assert not router.on_raw_reaction_remove(raw_reaction(member, message))
+        assert not router.on_message(FakeMessage(message.channel, "hello", author=member))
+        waiter.cancel()
+
+        waiter = asyncio.ensure_future(router.wait(member, message, need_input=True, accept_unreact=True))
+        await asyncio.sleep(0)
+        assert router.on_raw_reaction_remove(raw_reaction(member, message))
+        await waiter
+
+        waiter = asyncio.ensure_future(router.wait(member, message, need_input=True))
+        await asyncio.sleep(0)
+        said = FakeMessage(message.channel, "hello", author=member)
+        assert router.on_message(said)
+        assert await waiter == (None, said)
+        assert not router._message_waiters
+
+    asyncio.run(run())
+
+
+def test_interrupt():
+    """An interrupted session receives `(None, None)`."""
+
+    async def run():
+        router, member, message = make_router()
+        assert not router.interrupt(member, message)
+        waiter = asyncio.ensure_future(router.wait(member, message))
+        await asyncio.sleep(0)
+        assert router.interrupt(member, message)
+        assert await waiter == (None, None)
+
+    asyncio.run(run())
+
+
+def test_board_interactions_routed_by_prefix():
+    """The interactions with the components of a board go to its handler,
+    whatever the user and the message, and the others to the sessions.
+    """
+
+    async def run():
+        router, member, message = make_router()
+        clicks = []
+        router.add_board("board1:", clicks.append)
+        waiter = asyncio.ensure_future(router.wait(member, message))
+        await asyncio.sleep(0)
+
+        click = FakeInteraction(FakeMember(member.http), FakeMessage(message.channel), {"custom_id": "board1:2⃣"})
+        assert router.on_interaction(click)
+        assert clicks == [click]
+        assert not waiter.done()
+
+        click = FakeInteraction(member, message, {"custom_id": "2⃣"})
+        assert router.on_interaction(click)
+        assert await waiter == (click, None)
+
+        router.remove_board("board1:")
+        click = FakeInteraction(member, message, {"custom_id": "board1:2⃣"})
+        assert not router.on_interaction(click)
+        assert len(clicks) == 1
+
+    asyncio.run(run())
+
+
+def test_events_of_the_client_are_routed():
+    """The router listens to the client once, and keeps listening after
+    routing an event.
+    """
+
+    async def run():
+        router, member, message = make_router()
+        for _ in range(2):
+            waiter = asyncio.ensure_future(router.wait(member, message))
+            # The listeners of the client are registered on the next turns
+            await asyncio.sleep(0.01)
+            router.client.dispatch("raw_reaction_add", raw_reaction(member, message))
+            reaction, _ = await waiter
+            assert reaction.emoji == "1⃣"
+        assert len(router.client._listeners["raw_reaction_add"]) == 1
+
+    asyncio.run(run())
@@ -0,0 +1,181 @@
+"""Tests of the `RequestScheduler`, against simulated rate limits."""
+
+import asyncio
+import types
+
+import discord
+
+from benchmarks.fake_discord import FakeClient, FakeHTTP, FakeMember
+from discord_interactive import Help, Page
+from discord_interactive.scheduler import Priority, RequestScheduler
+
+
+def rate_limited(retry_after, is_global=False):
+    """Build the error raised by discord.py for a 429.
+
+    Args:
+        retry_after (float): Number of seconds to wait.
+        is_global (bool, optional): Whether the global rate limit was hit.
+            Defaults to `False`.
+
+    Returns:
+        discord.HTTPException: Error.
+    """
+    headers = {"Retry-After": str(retry_after), "X-RateLimit-Global": str(is_global).lower()}
+    response = types.SimpleNamespace(status=429, reason="Too Many Requests", headers=headers)
+    return discord.HTTPException(response, "You are being rate limited.")
+
+
+class FakeEndpoint:
+    """Endpoint recording the time of each call, and answering with a 429 to
+    the first calls.
+    """
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    async def __call__(self, name):
+        """Call the endpoint."""
+        self.calls.append((name, asyncio.get_running_loop().time()))
+        if self.errors:
+            raise self.errors.pop(0)
+        return name
+
+
+def test_retry_after_429():
+    """A rate limited request is sent again after the time given by Discord."""
+
+    async def run():
+        endpoint = FakeEndpoint([rate_limited(0.2)])
+        scheduler = RequestScheduler()
+        result = await scheduler.submit(endpoint, "a", channel=1)
+        assert result == "a"
+        assert len(endpoint.calls) == 2
+        assert endpoint.calls[1][1] - endpoint.calls[0][1] >= 0.2
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_channel_429_does_not_pause_other_channels():
+    """A 429 on a channel only pauses this channel, while a global 429 pauses
+    all channels.
+    """
+
+    async def run():
+        endpoint = FakeEndpoint([rate_limited(0.3)])
+        scheduler = RequestScheduler()
+        first = scheduler.submit(endpoint, "a", channel=1)
+        await asyncio.sleep(0.05)
+        start = asyncio.get_running_loop().time()
+        await scheduler.submit(endpoint, "b", channel=2)
+        assert asyncio.get_running_loop().time() - start < 0.1
+        await first
+
+        endpoint = FakeEndpoint([rate_limited(0.3, is_global=True)])
+        first = scheduler.submit(endpoint, "a", channel=1)
+        await asyncio.sleep(0.05)
+        start = asyncio.get_running_loop().time()
+        await scheduler.submit(endpoint, "b", channel=2)
+        assert asyncio.get_running_loop().time() - start >= 0.2
+        await first
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_requests_without_channel_share_the_global_bucket_only():
+    """Requests without channel are not limited like a single channel."""
+
+    async def run():
+        endpoint = FakeEndpoint()
+        scheduler = RequestScheduler(channel_rate=5, global_rate=50)
+        start = asyncio.get_running_loop().time()
+        await asyncio.gather(*[scheduler.submit(endpoint, i) for i in range(40)])
+        assert asyncio.get_running_loop().time() - start < 0.5
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_messages_before_reactions():
+    """When a channel is rate limited, the messages queued are sent before the
+    reactions, even if the reactions were queued first.
+    """
+
+    async def run():
+        endpoint = FakeEndpoint()
+        scheduler = RequestScheduler(channel_rate=1, channel_per=0.1)
+        futures = [scheduler.submit(endpoint, "reaction", channel=1, priority=Priority.REACTION) for _ in range(3)]
+        futures.append(scheduler.submit(endpoint, "message", channel=1, priority=Priority.MESSAGE))
+        await asyncio.gather(*futures)
+        assert [name for name, _ in endpoint.calls] == ["message", "reaction", "reaction", "reaction"]
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_discard_drops_requests_of_deleted_message():
+    """Requests still queued for a deleted message are dropped."""
+
+    async def run():
+        endpoint = FakeEndpoint()
+        scheduler = RequestScheduler(channel_rate=1, channel_per=0.1)
+        sent = scheduler.submit(endpoint, "send", channel=1)
+        dropped = [scheduler.submit(endpoint, "react", channel=1, message=42) for _ in range(3)]
+        kept = scheduler.submit(endpoint, "other", channel=1, message=43)
+        scheduler.discard(42)
+        await asyncio.gather(sent, kept)
+        assert all(future.cancelled() for future in dropped)
+        assert [name for name, _ in endpoint.calls] == ["send", "other"]
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_429_without_channel_only_delays_the_request():
+    """A request without channel rate limited is sent again later, without
+    delaying the other requests.
+    """
+
+    async def run():
+        endpoint = FakeEndpoint([rate_limited(0.3)])
+        scheduler = RequestScheduler()
+        first = scheduler.submit(endpoint, "a")
+        await asyncio.sleep(0.05)
+        start = asyncio.get_running_loop().time()
+        await scheduler.submit(endpoint, "b")
+        assert asyncio.get_running_loop().time() - start < 0.1
+        assert await first == "a"
+        assert endpoint.calls[-1][1] - endpoint.calls[0][1] >= 0.3
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_warm_up_does_not_delay_sessions():
+    """With a scheduler, warming up DM channels runs in the background : the
+    page of a member opening the help is sent first.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        scheduler = RequestScheduler(global_rate=10)
+        help = Help(client, Page("root"), scheduler=scheduler)
+
+        warm_up = asyncio.ensure_future(help.warm_up([FakeMember(http) for _ in range(30)]))
+        await asyncio.sleep(0.05)
+        member = FakeMember(http)
+        session = asyncio.ensure_future(help.display(member))
+        await asyncio.sleep(0.3)
+        assert member.dm_channel.last_message.embed.description == "root\n\n"
+        assert not warm_up.done()
+
+        client.react(member, "❌")
+        await asyncio.wait_for(session, 1)
+        assert await warm_up == 30
+        await scheduler.close()
+
+    asyncio.run(run())
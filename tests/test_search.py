@@ -0,0 +1,97 @@
+"""Tests of the full-text search over the pages of the help."""
+
+import asyncio
+
+from benchmarks.fake_discord import FakeClient, FakeHTTP, FakeMember
+from discord_interactive import Help, Page, SearchIndex
+
+
+async def settle():
+    """Let the help process the pending events."""
+    await asyncio.sleep(0.05)
+
+
+def make_tree():
+    """Build a small help about moderation and music."""
+    root = Page("Welcome")
+    moderation = Page("Ban, kick and mute the members", title="Moderation")
+    music = Page("Play music in a voice channel", title="Music")
+    modes = Page("Slow mode of the channels")
+    root.link(moderation, description="Moderation commands")
+    root.link(music, description="Music commands")
+    root.link(modes)
+    root.root_of([moderation, music, modes])
+    return root, moderation, music, modes
+
+
+def test_search_by_prefix_and_relevance():
+    """Words are matched by prefix, all the words of the query must match,
+    and the words of the links leading to a page count.
+    """
+    root, moderation, music, modes = make_tree()
+    index = SearchIndex()
+    index.add_tree(root)
+    assert len(index) == 4
+
+    assert [page for page, _ in index.search("mod")] == [moderation, modes]
+    assert [page for page, _ in index.search("ban")] == [moderation]
+    assert [page for page, _ in index.search("slow")] == [modes]
+    assert index.search("voice channel")[0][0] is music
+    assert index.search("music ban") == []
+    assert index.search("") == []
+
+
+def test_index_follows_changes():
+    """A page is indexed again when it changes, and a removed page is not
+    found anymore.
+    """
+    root, moderation, music, _ = make_tree()
+    index = SearchIndex([root, moderation, music])
+
+    music.msg = "Radio and playlists"
+    assert [page for page, _ in index.search("playlist")] == [music]
+    assert index.search("voice") == []
+
+    index.remove(moderation)
+    assert moderation not in index
+    assert index.search("ban") == []
+    root.links[0].description = "Moderation and bans"
+    assert index.search("ban") == []
+
+
+def test_search_from_the_help():
+    """The text typed by the user jumps to the best page, or lists the
+    results, with the parent and root of the page for no results.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        member = FakeMember(http)
+        root, _, _, _ = make_tree()
+        index = SearchIndex()
+        index.add_tree(root)
+        no_results = Page("Nothing found")
+        index.link_search(root, no_results)
+        root.root_of(no_results)
+
+        task = asyncio.ensure_future(Help(client, root).display(member))
+        await settle()
+        client.say(member, "ban")
+        await settle()
+        assert member.dm_channel.last_message.embed.description.startswith("Ban, kick")
+
+        client.react(member, "🔝")
+        await settle()
+        client.say(member, "commands")
+        await settle()
+        results = member.dm_channel.last_message
+        assert results.embed.description.startswith("Pages found for : commands")
+        assert "Moderation" in results.embed.description
+        assert "Music" in results.embed.description
+        assert set(results.reactions) == {"❌", "1⃣", "2⃣", "🔙", "🔝"}
+
+        client.react(member, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
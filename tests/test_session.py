@@ -0,0 +1,116 @@
+"""Tests of the live sessions : limits, queue and busy message."""
+
+import asyncio
+
+import pytest
+
+from benchmarks.fake_discord import FakeClient, FakeHTTP, FakeMember
+from discord_interactive import Help, InMemoryMetrics, Page, SessionLimitError
+from discord_interactive.help import DEFAULT_BUSY_MSG
+
+
+async def settle():
+    """Let the help process the pending events."""
+    await asyncio.sleep(0.05)
+
+
+def test_busy_message_by_default():
+    """Over the limit, the member is told the help is busy, and `display()`
+    doesn't raise.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        help = Help(client, Page("root"), max_sessions=1)
+        first, second = FakeMember(http), FakeMember(http)
+
+        task = asyncio.ensure_future(help.display(first))
+        await settle()
+        await asyncio.wait_for(help.display(second), 1)
+        assert second.dm_channel.last_message.content == DEFAULT_BUSY_MSG
+
+        client.react(first, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_no_busy_message_raises():
+    """With `busy_msg=None`, `display()` raises over the limit."""
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        help = Help(client, Page("root"), max_sessions=1, busy_msg=None)
+        first = FakeMember(http)
+
+        task = asyncio.ensure_future(help.display(first))
+        await settle()
+        with pytest.raises(SessionLimitError):
+            await help.display(FakeMember(http))
+
+        client.react(first, "❌")
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+
+
+def test_queued_member_admitted_when_a_session_ends():
+    """A member waiting in the queue is told their position, and gets a
+    session as soon as one ends.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        help = Help(client, Page("root"), max_sessions=1, max_queue=1)
+        first, second = FakeMember(http), FakeMember(http)
+
+        task = asyncio.ensure_future(help.display(first))
+        await settle()
+        waiting = asyncio.ensure_future(help.display(second))
+        await settle()
+        assert help.sessions.waiting() == 1
+        assert "number 1" in second.dm_channel.last_message.content
+
+        client.react(first, "❌")
+        await asyncio.wait_for(task, 1)
+        await settle()
+        assert help.sessions.waiting() == 0
+        assert second.dm_channel.last_message.embed.description == "root\n\n"
+
+        client.react(second, "❌")
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(run())
+
+
+def test_only_input_timeout_closes_the_session_silently():
+    """The session ends silently when the user doesn't answer, but a timeout
+    raised by a callback is not mistaken for it.
+    """
+
+    async def fail(link, member, prev_input):
+        raise asyncio.TimeoutError()
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        metrics = InMemoryMetrics()
+        root = Page("root")
+        root.link(Page("page A"), callbacks=[fail])
+        help = Help(client, root, timeout=0.1, metrics=metrics)
+
+        await asyncio.wait_for(help.display(FakeMember(http)), 1)
+        assert metrics.counters[("sessions_timed_out_total", ())] == 1
+
+        member = FakeMember(http)
+        task = asyncio.ensure_future(help.display(member))
+        await settle()
+        client.react(member, "1⃣")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(task, 1)
+        assert metrics.counters[("sessions_timed_out_total", ())] == 1
+
+    asyncio.run(run())
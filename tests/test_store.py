@@ -0,0 +1,96 @@
+"""Tests of the sessions saved in a store, and resumed after a restart."""
+
+import asyncio
+
+from benchmarks.fake_discord import FakeClient, FakeHTTP, FakeMember
+from discord_interactive import Help, Page, SQLiteSessionStore
+from discord_interactive.store import Checkpoint
+
+
+def build_tree():
+    """Build a small help tree : root -> A -> A.A.
+
+    Returns:
+        Page: Root of the tree.
+    """
+    root = Page("root")
+    a = Page("page A")
+    root.link(a)
+    a.link(Page("page A.A"))
+    return root
+
+
+async def settle():
+    """Let the help process the pending events."""
+    await asyncio.sleep(0.05)
+
+
+def test_resumed_session_navigates_with_reactions(tmp_path):
+    """A resumed session is attached to a message which is not cached : the
+    reactions of the user still reach it.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        member = FakeMember(http)
+        channel = await member.create_dm()
+        message = await channel.send("page A")
+
+        # After the restart, the client knows the user and the channel, but
+        # the message is not in its cache
+        client = FakeClient(http)
+        client.users[member.id] = member
+        client.channels[channel.id] = channel
+
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        await store.save(Checkpoint("session", member.id, channel.id, message.id, "0/0", []))
+        await store.flush()
+
+        help = Help(client, build_tree(), store=store)
+        tasks = await help.resume()
+        await settle()
+        assert len(help.sessions) == 1
+
+        client.react(member, "1⃣")
+        await settle()
+        assert channel.last_message.embed.description.startswith("page A.A")
+
+        client.react(member, "❌")
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        assert len(help.sessions) == 0
+        await store.close()
+
+    asyncio.run(run())
+
+
+def test_resume_over_the_limit_forgets_the_session(tmp_path):
+    """Checkpoints over the maximum number of sessions are forgotten : their
+    message and their checkpoint are deleted, so they are not resumed again on
+    the next restart.
+    """
+
+    async def run():
+        http = FakeHTTP(rate=10000)
+        client = FakeClient(http)
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        for i in range(2):
+            member = FakeMember(http)
+            channel = await member.create_dm()
+            message = await channel.send("page A")
+            client.users[member.id] = member
+            client.channels[channel.id] = channel
+            await store.save(Checkpoint("session {}".format(i), member.id, channel.id, message.id, "0/0", []))
+        await store.flush()
+
+        help = Help(client, build_tree(), store=store, max_sessions=1)
+        tasks = await help.resume()
+        await settle()
+        assert len(help.sessions) == 1
+        assert http.calls["delete"] == 1
+        assert len(await store.load()) == 1
+
+        help.sessions.sessions()[0].cancel()
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        await store.close()
+
+    asyncio.run(run())